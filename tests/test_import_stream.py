@@ -0,0 +1,42 @@
+"""
+tests/test_import_stream.py
+
+Chunk-boundary checks for the streaming snapshot parser in
+tools/import_stream.py: the same document must parse identically whatever
+the read size, including numbers split inside their fraction or exponent.
+
+    python -m unittest discover -s tests
+"""
+
+import io
+import json
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+
+from import_stream import iter_json_array  # noqa: E402
+
+DOCUMENT = (
+    '{"meta": {"mode": "preview", "ratio": 0.125}, "version": 12.5, "count": 1e-05,'
+    ' "big": -3.25E+10, "flag": true, "none": null,'
+    ' "skills": [{"id": "skill.a", "cost": 2700.5}, 17, -0.5, 6.02e23, "x", [1.5, 2e-3], false],'
+    ' "tail": 1E2}'
+)
+
+
+class ChunkBoundaryTest(unittest.TestCase):
+    def test_every_chunk_size_matches_json_loads(self) -> None:
+        expected = json.loads(DOCUMENT)
+        expected_rows = expected.pop("skills")
+        for chunk_size in range(1, len(DOCUMENT) + 1):
+            with self.subTest(chunk_size=chunk_size):
+                others: dict = {}
+                rows = list(iter_json_array(io.StringIO(DOCUMENT), "skills", others, chunk_size=chunk_size))
+                self.assertEqual(rows, expected_rows)
+                self.assertEqual(others, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
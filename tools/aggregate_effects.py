@@ -20,7 +20,9 @@ Each effect instance includes at least:
 import json
 import os
 import sys
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
+
+import id_registry
 
 
 # ---------- Helpers ----------
@@ -38,6 +40,7 @@ def load_all_data(repo_root: str) -> Dict[str, Any]:
         "effects": load_json(os.path.join(data_dir, "effects.json")),
         "sets": load_json(os.path.join(data_dir, "sets.json")),
         "cp_stars": load_json(os.path.join(data_dir, "cp-stars.json")),
+        "id_aliases": id_registry.load_registry_file(data_dir),
     }
 
 
@@ -72,13 +75,21 @@ def unwrap_containers(data: Dict[str, Any]) -> Dict[str, Any]:
 
 
 def index_by_id(items: List[Dict[str, Any]], id_field: str = "id") -> Dict[str, Dict[str, Any]]:
+    # Versioned data (tools/data_versions.py) comes indexed by id already.
+    by_id = getattr(items, "by_id", None)
+    if by_id is not None and id_field == "id":
+        return by_id
     return {item[id_field]: item for item in items if id_field in item}
 
 
 # ---------- Core aggregation ----------
 
 
-def aggregate_effects(build: Dict[str, Any], data: Dict[str, Any]) -> List[Dict[str, Any]]:
+def aggregate_effects(
+    build: Dict[str, Any],
+    data: Dict[str, Any],
+    resolver: Optional[id_registry.IdResolver] = None,
+) -> List[Dict[str, Any]]:
     """
     Collect all active effect instances from skills, sets, and CP stars.
     """
@@ -87,10 +98,15 @@ def aggregate_effects(build: Dict[str, Any], data: Dict[str, Any]) -> List[Dict[
     sets_index = index_by_id(unwrapped["sets"])
     cp_index = index_by_id(unwrapped["cp_stars"])
 
+    # Legacy / external IDs are resolved through the alias registry, which is
+    # only compiled if some reference misses the canonical indexes.
+    if resolver is None:
+        resolver = id_registry.IdResolver(lambda: id_registry.IdRegistry.from_data(data))
+
     effects: List[Dict[str, Any]] = []
-    effects += collect_skill_effects(build, skills_index)
-    effects += collect_set_effects(build, sets_index)
-    effects += collect_cp_effects(build, cp_index)
+    effects += collect_skill_effects(build, skills_index, resolver)
+    effects += collect_set_effects(build, sets_index, resolver)
+    effects += collect_cp_effects(build, cp_index, resolver)
     return effects
 
 
@@ -100,6 +116,7 @@ def aggregate_effects(build: Dict[str, Any], data: Dict[str, Any]) -> List[Dict[
 def collect_skill_effects(
     build: Dict[str, Any],
     skills_index: Dict[str, Dict[str, Any]],
+    resolver: Optional[id_registry.IdResolver] = None,
 ) -> List[Dict[str, Any]]:
     results: List[Dict[str, Any]] = []
     bars = build.get("bars", {})
@@ -111,6 +128,9 @@ def collect_skill_effects(
             if not skill_id:
                 continue
             skill = skills_index.get(skill_id)
+            if not skill and resolver is not None:
+                skill_id = resolver.resolve("skill", skill_id) or skill_id
+                skill = skills_index.get(skill_id)
             if not skill:
                 continue
 
@@ -160,6 +180,7 @@ def compute_set_piece_counts(build: Dict[str, Any]) -> Dict[str, int]:
 def collect_set_effects(
     build: Dict[str, Any],
     sets_index: Dict[str, Dict[str, Any]],
+    resolver: Optional[id_registry.IdResolver] = None,
 ) -> List[Dict[str, Any]]:
     """
     v1: sets[*].bonuses[*].effects is a list of effect ID strings.
@@ -167,6 +188,15 @@ def collect_set_effects(
     results: List[Dict[str, Any]] = []
     piece_counts = compute_set_piece_counts(build)
 
+    if resolver is not None and any(set_id not in sets_index for set_id in piece_counts):
+        # Pieces listed under a legacy ID count towards the canonical set.
+        canonical_counts: Dict[str, int] = {}
+        for set_id, count in piece_counts.items():
+            if set_id not in sets_index:
+                set_id = resolver.resolve("set", set_id) or set_id
+            canonical_counts[set_id] = canonical_counts.get(set_id, 0) + count
+        piece_counts = canonical_counts
+
     for set_id, count in piece_counts.items():
         set_record = sets_index.get(set_id)
         if not set_record:
@@ -214,6 +244,7 @@ def collect_set_effects(
 def collect_cp_effects(
     build: Dict[str, Any],
     cp_index: Dict[str, Dict[str, Any]],
+    resolver: Optional[id_registry.IdResolver] = None,
 ) -> List[Dict[str, Any]]:
     """
     v1: build.cp_slotted.{warfare,fitness,craft} holds CP IDs.
@@ -227,6 +258,9 @@ def collect_cp_effects(
             if not cp_id:
                 continue
             star = cp_index.get(cp_id)
+            if not star and resolver is not None:
+                cp_id = resolver.resolve("cp", cp_id) or cp_id
+                star = cp_index.get(cp_id)
             if not star:
                 continue
 
@@ -264,6 +298,18 @@ def collect_cp_effects(
 # ---------- CLI ----------
 
 
+def report_unresolved(resolver: id_registry.IdResolver) -> None:
+    """
+    Warn on stderr about references that match no canonical or alias ID;
+    they contribute no effects, so results for the build are incomplete.
+    """
+    if resolver.unresolved:
+        print(
+            json.dumps({"warning": "Unknown IDs skipped", "unresolved_ids": resolver.unresolved}),
+            file=sys.stderr,
+        )
+
+
 def main(argv: List[str]) -> int:
     if len(argv) != 2:
         print(
@@ -277,7 +323,9 @@ def main(argv: List[str]) -> int:
 
     data = load_all_data(repo_root)
     build = load_json(build_path)
-    effects = aggregate_effects(build, data)
+    resolver = id_registry.IdResolver(lambda: id_registry.IdRegistry.from_data(data))
+    effects = aggregate_effects(build, data, resolver)
+    report_unresolved(resolver)
 
     json.dump(effects, sys.stdout, indent=2, sort_keys=True)
     print()
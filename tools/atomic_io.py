@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+tools/atomic_io.py
+
+Atomic file replacement shared by every tool that rewrites data, previews,
+manifests, artifacts or caches.
+
+Content is written to a temporary file next to the target and renamed onto
+it, so readers see either the old or the new file, never a partial one.
+tempfile.mkstemp() creates the temporary file with mode 0600 and
+os.replace() carries that mode onto the target, so before the rename the
+file gets the target's current mode, or 0666 minus the umask for a new file
+(what open() would have created).
+
+    with atomic_write(path) as f:
+        f.write(text)
+
+Streaming writers that keep the temporary file open across calls
+(import_stream.PreviewWriter) use create_temp() and replace() directly.
+"""
+
+import os
+import stat
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Iterator, Optional, Tuple
+
+
+def target_mode(path: Path) -> int:
+    """
+    Permission bits for a file about to replace `path`.
+    """
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def create_temp(
+    path: Path,
+    mode: str = "w",
+    encoding: Optional[str] = "utf-8",
+    newline: Optional[str] = None,
+) -> Tuple[IO, Path]:
+    """
+    Open a new temporary file next to `path`; returns (file, temp path).
+    """
+    fd, tmp_name = tempfile.mkstemp(dir=str(path.parent), prefix=path.name + ".", suffix=".tmp")
+    try:
+        if "b" in mode:
+            return os.fdopen(fd, mode), Path(tmp_name)
+        return os.fdopen(fd, mode, encoding=encoding, newline=newline), Path(tmp_name)
+    except BaseException:
+        os.close(fd)
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def replace(tmp_path: Path, path: Path) -> None:
+    """
+    Give the (closed) temporary file the target's mode and rename it onto `path`.
+    """
+    os.chmod(tmp_path, target_mode(path))
+    os.replace(tmp_path, path)
+
+
+@contextmanager
+def atomic_write(
+    path: Path,
+    mode: str = "w",
+    encoding: Optional[str] = "utf-8",
+    newline: Optional[str] = None,
+) -> Iterator[IO]:
+    """
+    Write `path` atomically; the temporary file is removed if the block raises.
+    """
+    f, tmp_path = create_temp(path, mode, encoding, newline)
+    try:
+        with f:
+            yield f
+        replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+tools/batch_pool.py
+
+Preforking batch executor with warm, copy-on-write data for pillar jobs.
+
+Spawning workers that each import the tools and load data/*.json is slow,
+so batch jobs spend their first seconds warming up. This executor does the
+warm-up once, in the parent:
+
+1. Load the data center and compile it into a data-center image
+   (tools/shared_data_center.py), creating the read-only view workers use.
+2. Freeze the garbage collector (gc.freeze) so the warm objects move to the
+   permanent generation. Collections in the children then never touch, and
+   so never copy, the pages holding that state; the compiled image itself is
+   a single bytes object, so refcount traffic only dirties its header.
+3. Fork the workers. They inherit the warm state copy-on-write and can
+   evaluate builds immediately: no imports, no JSON parsing, no indexing.
+
+Builds are dispatched in chunks and results come back in input order.
+Optionally a fraction of builds is re-checked against the reference oracle
+(tools/oracle_check.py) inside the workers.
+
+Requires the "fork" start method (Linux/macOS).
+
+Usage:
+
+    python tools/batch_pool.py builds/permafrost-marshal.json --workers 4
+    python tools/batch_pool.py --synthetic 10000 --scale 100 --workers 8 --summary
+    python tools/batch_pool.py --synthetic 10000 --oracle-rate 0.001 --summary
+"""
+
+import argparse
+import gc
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import compute_pillars
+import oracle_check
+import shared_data_center
+import synthetic_data
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+# Warm state inherited by forked workers. Set only in the parent, before fork.
+_WARM: Dict[str, Any] = {}
+
+
+# ---------- Worker side ----------
+
+
+def _evaluate_chunk(builds: List[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]]:
+    view = _WARM["view"]
+    rate = _WARM["oracle_rate"]
+    rng = _WARM.get("rng")
+    if rate > 0 and rng is None:
+        # Per-process stream; children must not share the parent's draws.
+        rng = _WARM["rng"] = random.Random(os.getpid() ^ time.perf_counter_ns())
+
+    out: List[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]] = []
+    for build in builds:
+        result = shared_data_center.compute_pillars_view(build, view)
+        divergence = None
+        if rate > 0 and rng.random() < rate:
+            expected = oracle_check.REFERENCES["pillars"](build, _WARM["data"])
+            divergence = oracle_check.first_divergence(expected, result) or {}
+            divergence = dict(divergence, build_id=build.get("id")) if divergence else {}
+        out.append((result, divergence))
+    return out
+
+
+# ---------- Executor ----------
+
+
+class WarmBatchExecutor:
+    """
+    Load and index the data center once, then fork warm workers.
+
+        with WarmBatchExecutor(data, workers=8) as pool:
+            results = pool.map(builds)
+
+    Divergences found by oracle sampling are collected in .oracle_stats.
+    """
+
+    def __init__(self, data: Dict[str, Any], workers: int, oracle_rate: float = 0.0) -> None:
+        if "fork" not in multiprocessing.get_all_start_methods():
+            raise RuntimeError("WarmBatchExecutor requires the 'fork' start method.")
+
+        image = shared_data_center.compile_data_center(data)
+        _WARM.clear()
+        _WARM["image"] = image
+        _WARM["view"] = shared_data_center.DataCenterView(image)
+        _WARM["data"] = data
+        _WARM["oracle_rate"] = oracle_rate
+
+        self.workers = max(1, workers)
+        self.oracle_stats: Dict[str, Any] = {
+            "rate": oracle_rate,
+            "checked": 0,
+            "divergence_count": 0,
+            "divergences": [],
+        }
+
+        # Move everything allocated so far out of the collector's reach so
+        # child collections do not write to (and copy) the shared pages.
+        gc.collect()
+        gc.freeze()
+        try:
+            self._pool = multiprocessing.get_context("fork").Pool(processes=self.workers)
+        finally:
+            gc.unfreeze()
+
+    def map(self, builds: List[Dict[str, Any]], chunksize: int = 32) -> List[Dict[str, Any]]:
+        chunks = [builds[i:i + chunksize] for i in range(0, len(builds), chunksize)]
+        results: List[Dict[str, Any]] = []
+        for chunk_results in self._pool.imap(_evaluate_chunk, chunks):
+            for result, divergence in chunk_results:
+                results.append(result)
+                if divergence is None:
+                    continue
+                self.oracle_stats["checked"] += 1
+                if divergence:
+                    self.oracle_stats["divergence_count"] += 1
+                    if len(self.oracle_stats["divergences"]) < 100:
+                        self.oracle_stats["divergences"].append(divergence)
+        return results
+
+    def close(self) -> None:
+        self._pool.close()
+        self._pool.join()
+
+    def __enter__(self) -> "WarmBatchExecutor":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+# ---------- CLI ----------
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Compute pillars for many builds with a preforked, warm worker pool."
+    )
+    parser.add_argument("build_paths", nargs="*", help="Build JSON files.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunksize", type=int, default=32, help="Builds per dispatched task.")
+    parser.add_argument("--synthetic", type=int, default=0, help="Evaluate N generated builds instead.")
+    parser.add_argument("--scale", type=int, default=1, help="Synthetic data-center scale.")
+    parser.add_argument("--seed", type=int, default=0, help="Synthetic generator seed.")
+    parser.add_argument("--oracle-rate", type=float, default=0.0, help="Fraction of builds re-checked by the oracle.")
+    parser.add_argument("--summary", action="store_true", help="Print timings and counts instead of results.")
+    args = parser.parse_args()
+
+    if args.synthetic > 0:
+        data = synthetic_data.generate_data_center(args.scale, args.seed)
+        builds = synthetic_data.generate_builds(data, args.synthetic, args.seed)
+    else:
+        if not args.build_paths:
+            parser.error("give build paths or --synthetic N")
+        data = compute_pillars.load_all_data(str(REPO_ROOT))
+        builds = [compute_pillars.load_json(p) for p in args.build_paths]
+
+    start = time.perf_counter()
+    with WarmBatchExecutor(data, args.workers, args.oracle_rate) as pool:
+        ready = time.perf_counter()
+        results = pool.map(builds, args.chunksize)
+        done = time.perf_counter()
+        oracle_stats = pool.oracle_stats
+
+    if args.summary:
+        elapsed = done - ready
+        print(
+            json.dumps(
+                {
+                    "status": "OK" if not oracle_stats["divergence_count"] else "ERROR",
+                    "builds": len(results),
+                    "workers": args.workers,
+                    "startup_seconds": ready - start,
+                    "evaluate_seconds": elapsed,
+                    "builds_per_second": len(results) / elapsed if elapsed > 0 else None,
+                    "oracle": oracle_stats,
+                },
+                indent=2,
+            )
+        )
+    else:
+        json.dump(results, sys.stdout, indent=2, sort_keys=True)
+        print()
+    return 0 if not oracle_stats["divergence_count"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+tools/benchmark_engine.py
+
+One-command benchmark suite for the ESO Build Engine tools.
+
+- Generates deterministic synthetic data centers with tools/synthetic_data.py
+  at several multiples of the canonical data size (default 1x/10x/100x/1000x).
+- Generates random builds that pass tools/validate_build.py.
+- Times the core tools on that data:
+  - load            compute_pillars.load_all_data()        (records/s)
+  - aggregate       aggregate_effects.aggregate_effects()  (builds/s)
+  - pillars         compute_pillars.compute_pillars()      (builds/s)
+  - validate_data   validate_data_integrity()              (records/s)
+  - validate_build  validate_build.validate_build()        (builds/s)
+  - import          build_*_record() over a snapshot       (rows/s)
+  - export          export_build_md.export_build_md()      (builds/s)
+- Reports throughput per scale plus a scaling exponent per benchmark
+  (slope of log(time per item) over log(scale): ~0 means the per-item cost
+  does not depend on catalog size, ~1 means it grows linearly with it).
+
+Usage:
+
+    python tools/benchmark_engine.py
+    python tools/benchmark_engine.py --scales 1,10,100 --builds 20 --repeat 5
+    python tools/benchmark_engine.py --only pillars,aggregate --output bench.json
+
+Output is a JSON report on stdout (and optionally --output).
+"""
+
+import argparse
+import json
+import math
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import aggregate_effects
+import compute_pillars
+import export_build_md
+import import_cp_from_uesp
+import import_sets_from_uesp
+import import_skills_from_uesp
+import synthetic_data
+import validate_build
+import validate_data_integrity
+
+BENCHMARKS = [
+    "load",
+    "aggregate",
+    "pillars",
+    "validate_data",
+    "validate_build",
+    "import",
+    "export",
+]
+
+DEFAULT_SCALES = [1, 10, 100, 1000]
+
+
+# ---------- Timing helpers ----------
+
+
+def time_call(fn: Callable[[], Any], repeat: int) -> List[float]:
+    """
+    Run fn `repeat` times and return the wall-clock seconds of each run.
+    """
+    timings: List[float] = []
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def summarize(name: str, scale: int, items: int, unit: str, timings: List[float]) -> Dict[str, Any]:
+    median = statistics.median(timings)
+    best = min(timings)
+    return {
+        "benchmark": name,
+        "scale": scale,
+        "items": items,
+        "unit": unit,
+        "runs": len(timings),
+        "timings_seconds": timings,
+        "median_seconds": median,
+        "best_seconds": best,
+        "throughput_per_second": (items / median) if median > 0 else None,
+    }
+
+
+def scaling_exponent(points: List[Dict[str, Any]]) -> Optional[float]:
+    """
+    Least-squares slope of log(seconds per item) against log(scale).
+    """
+    xs: List[float] = []
+    ys: List[float] = []
+    for point in points:
+        if point["items"] <= 0 or point["median_seconds"] <= 0:
+            continue
+        xs.append(math.log(point["scale"]))
+        ys.append(math.log(point["median_seconds"] / point["items"]))
+    if len(xs) < 2:
+        return None
+
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    denom = sum((x - mean_x) ** 2 for x in xs)
+    if denom == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / denom
+
+
+# ---------- Fixture ----------
+
+
+class Fixture:
+    """
+    A synthetic data center plus builds, written to a temporary directory.
+    """
+
+    def __init__(self, root: Path, scale: int, seed: int, build_count: int) -> None:
+        self.root = root
+        self.scale = scale
+        self.data = synthetic_data.generate_data_center(scale, seed)
+        self.data_dir = synthetic_data.write_data_center(self.data, root)
+        self.builds = synthetic_data.generate_builds(self.data, build_count, seed)
+        self.build_paths = synthetic_data.write_builds(self.builds, root)
+        self.record_count = sum(
+            len(self.data[key][inner])
+            for key, inner in (
+                ("skills", "skills"),
+                ("effects", "effects"),
+                ("sets", "sets"),
+                ("cp_stars", "cp_stars"),
+            )
+        )
+        self.snapshots = {
+            kind: synthetic_data.generate_snapshot(
+                kind, synthetic_data.scaled_count(kind, scale), seed
+            )[kind]
+            for kind in ("skills", "sets", "cp_stars")
+        }
+
+
+# ---------- Benchmarks ----------
+
+
+def bench_load(fx: Fixture, repeat: int) -> Dict[str, Any]:
+    timings = time_call(lambda: compute_pillars.load_all_data(str(fx.root)), repeat)
+    return summarize("load", fx.scale, fx.record_count, "records", timings)
+
+
+def bench_aggregate(fx: Fixture, repeat: int) -> Dict[str, Any]:
+    def run() -> None:
+        for build in fx.builds:
+            aggregate_effects.aggregate_effects(build, fx.data)
+
+    return summarize("aggregate", fx.scale, len(fx.builds), "builds", time_call(run, repeat))
+
+
+def bench_pillars(fx: Fixture, repeat: int) -> Dict[str, Any]:
+    def run() -> None:
+        for build in fx.builds:
+            compute_pillars.compute_pillars(build, fx.data)
+
+    return summarize("pillars", fx.scale, len(fx.builds), "builds", time_call(run, repeat))
+
+
+def bench_validate_data(fx: Fixture, repeat: int) -> Dict[str, Any]:
+    def run() -> None:
+        result = validate_data_integrity.validate_data_integrity(fx.data_dir)
+        if result["status"] != "OK":
+            raise RuntimeError(f"Synthetic data failed integrity checks: {result['errors'][:3]}")
+
+    return summarize("validate_data", fx.scale, fx.record_count, "records", time_call(run, repeat))
+
+
+def bench_validate_build(fx: Fixture, repeat: int) -> Dict[str, Any]:
+    def run() -> None:
+        for path in fx.build_paths:
+            result = validate_build.validate_build(path, fx.data_dir)
+            if result["status"] != "OK":
+                raise RuntimeError(f"Synthetic build failed validation: {result['errors'][:3]}")
+
+    return summarize(
+        "validate_build", fx.scale, len(fx.build_paths), "builds", time_call(run, repeat)
+    )
+
+
+def bench_import(fx: Fixture, repeat: int) -> Dict[str, Any]:
+    builders = (
+        ("skills", import_skills_from_uesp.build_skill_record),
+        ("sets", import_sets_from_uesp.build_set_record),
+        ("cp_stars", import_cp_from_uesp.build_cp_star_record),
+    )
+    rows = sum(len(fx.snapshots[kind]) for kind, _ in builders)
+
+    def run() -> None:
+        for kind, builder in builders:
+            records = [builder(row) for row in fx.snapshots[kind]]
+            json.dumps({kind: records}, indent=2, ensure_ascii=False)
+
+    return summarize("import", fx.scale, rows, "rows", time_call(run, repeat))
+
+
+def bench_export(fx: Fixture, repeat: int) -> Dict[str, Any]:
+    out_dir = fx.root / "export"
+    out_dir.mkdir(exist_ok=True)
+
+    def run() -> None:
+        for path in fx.build_paths:
+            export_build_md.export_build_md(path, out_dir / (path.stem + ".md"), fx.data_dir)
+
+    return summarize("export", fx.scale, len(fx.build_paths), "builds", time_call(run, repeat))
+
+
+BENCHMARK_FUNCS: Dict[str, Callable[[Fixture, int], Dict[str, Any]]] = {
+    "load": bench_load,
+    "aggregate": bench_aggregate,
+    "pillars": bench_pillars,
+    "validate_data": bench_validate_data,
+    "validate_build": bench_validate_build,
+    "import": bench_import,
+    "export": bench_export,
+}
+
+
+# ---------- Runner ----------
+
+
+def run_benchmarks(
+    scales: List[int],
+    names: List[str],
+    seed: int = 0,
+    build_count: int = 10,
+    repeat: int = 3,
+) -> Dict[str, Any]:
+    results: List[Dict[str, Any]] = []
+
+    for scale in scales:
+        with tempfile.TemporaryDirectory(prefix=f"eso-bench-{scale}x-") as tmp:
+            fx = Fixture(Path(tmp), scale, seed, build_count)
+            for name in names:
+                results.append(BENCHMARK_FUNCS[name](fx, repeat))
+
+    curves: Dict[str, Any] = {}
+    for name in names:
+        points = [r for r in results if r["benchmark"] == name]
+        curves[name] = {
+            "scaling_exponent": scaling_exponent(points),
+            "throughput_by_scale": {
+                str(p["scale"]): p["throughput_per_second"] for p in points
+            },
+        }
+
+    return {
+        "meta": {
+            "tool": "tools/benchmark_engine.py",
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": seed,
+            "builds": build_count,
+            "repeat": repeat,
+            "scales": scales,
+        },
+        "results": results,
+        "curves": curves,
+    }
+
+
+def parse_csv_list(value: str) -> List[str]:
+    return [part.strip() for part in value.split(",") if part.strip()]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the ESO Build Engine tools on synthetic data at several scales."
+    )
+    parser.add_argument(
+        "--scales",
+        type=str,
+        default=",".join(str(s) for s in DEFAULT_SCALES),
+        help="Comma-separated multiples of the canonical data size (default: 1,10,100,1000).",
+    )
+    parser.add_argument(
+        "--only",
+        type=str,
+        default=",".join(BENCHMARKS),
+        help=f"Comma-separated benchmarks to run (default: all of {','.join(BENCHMARKS)}).",
+    )
+    parser.add_argument("--builds", type=int, default=10, help="Random builds per scale.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark.")
+    parser.add_argument("--seed", type=int, default=0, help="Generator seed.")
+    parser.add_argument("--output", type=str, default=None, help="Also write the report to this path.")
+    args = parser.parse_args()
+
+    names = parse_csv_list(args.only)
+    unknown = [n for n in names if n not in BENCHMARK_FUNCS]
+    if unknown:
+        print(f"Unknown benchmarks: {unknown}; expected some of {BENCHMARKS}", file=sys.stderr)
+        return 1
+    scales = [int(s) for s in parse_csv_list(args.scales)]
+
+    report = run_benchmarks(scales, names, args.seed, args.builds, args.repeat)
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
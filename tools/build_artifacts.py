@@ -0,0 +1,455 @@
+#!/usr/bin/env python3
+"""
+tools/build_artifacts.py
+
+Dependency tracking and incremental regeneration for the derived build
+artifacts under builds/:
+
+- <build>-effects.json   aggregate_effects()   (tools/aggregate_effects.py)
+- <build>-pillars.json   compute_pillars()     (tools/compute_pillars.py)
+- <build>.md             export_build_md()     (tools/export_build_md.py;
+                         tools/export_build_test_md.py for test-dummy)
+
+Each artifact gets a dependency manifest, builds/.deps/<artifact>.json:
+
+{
+  "schema_version": 1,
+  "artifact": "builds/permafrost-marshal-pillars.json",
+  "kind": "pillars",
+  "build": { "path": "builds/permafrost-marshal.json", "hash": "..." },
+  "generator": "...",                 # hash of the generator's source files
+  "records": {                        # exactly the data records read
+    "skills": { "skill.deep_fissure": "<record hash>", ... },
+    "sets": {...}, "cp_stars": {...},
+    "effects": { "buff.major_resolve": "...", "buff.gone": null }
+  },
+  "resolved": { "skill": { "skill.deepfissure": "skill.deep_fissure" } },
+  "output": "<artifact hash>"
+}
+
+Records are the ones the generator looks up for this build: the skills,
+sets and CP stars it slots (canonicalized through the alias registry for
+effects/pillars, as those tools do) and, for pillars, the effects it
+aggregates. A record that was looked up but missing is recorded as null,
+so adding it later makes the artifact stale too.
+
+An artifact is stale when it or its manifest is missing, the build, the
+generator source or any recorded data record changed, a legacy ID resolves
+differently, or the artifact was edited by hand.
+
+`rebuild` regenerates only stale artifacts, in parallel worker processes
+(--jobs), and rewrites their manifests. Which kinds a build has is decided
+by the files on disk; --create also generates missing kinds.
+
+Usage:
+
+    python tools/build_artifacts.py status
+    python tools/build_artifacts.py rebuild --jobs 4
+    python tools/build_artifacts.py rebuild builds/permafrost-marshal.json --force
+    python tools/build_artifacts.py rebuild --create --dry-run
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import aggregate_effects
+import build_rules
+import compute_pillars
+import export_build_md
+import export_build_test_md
+import id_registry
+from atomic_io import atomic_write
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DATA_DIR = REPO_ROOT / "data"
+BUILDS_DIR = REPO_ROOT / "builds"
+TOOLS_DIR = REPO_ROOT / "tools"
+DEPS_DIRNAME = ".deps"
+
+MANIFEST_SCHEMA_VERSION = 1
+
+# Artifact kind -> (file suffix after the build stem, generator sources).
+ARTIFACT_KINDS: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "effects": ("-effects.json", ("aggregate_effects.py", "id_registry.py")),
+    "pillars": ("-pillars.json", ("compute_pillars.py", "id_registry.py")),
+    "md": (".md", ("export_build_md.py",)),
+}
+
+# Builds whose Markdown comes from a dedicated exporter.
+MD_EXPORTERS: Dict[str, Tuple[str, ...]] = {
+    "test-dummy": ("export_build_test_md.py",),
+}
+
+# Data key -> (container key, id_registry kind).
+RECORD_KINDS: Dict[str, Tuple[str, str]] = {
+    "skills": ("skills", "skill"),
+    "sets": ("sets", "set"),
+    "cp_stars": ("cp_stars", "cp"),
+    "effects": ("effects", "effect"),
+}
+
+
+def load_json(path: Path) -> Any:
+    with path.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def relative(path: Path) -> str:
+    try:
+        return path.resolve().relative_to(REPO_ROOT).as_posix()
+    except ValueError:
+        return str(path)
+
+
+def _hash_bytes(raw: bytes) -> str:
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+def record_hash(record: Any) -> str:
+    text = json.dumps(record, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return _hash_bytes(text.encode("utf-8"))
+
+
+def generator_sources(kind: str, build_stem: str) -> Tuple[str, ...]:
+    if kind == "md" and build_stem in MD_EXPORTERS:
+        return MD_EXPORTERS[build_stem]
+    return ARTIFACT_KINDS[kind][1]
+
+
+def generator_hash(kind: str, build_stem: str) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for file_name in generator_sources(kind, build_stem):
+        digest.update(file_name.encode("utf-8") + b"\0")
+        digest.update((TOOLS_DIR / file_name).read_bytes())
+    return digest.hexdigest()
+
+
+# ---------- Data ----------
+
+
+class DataRecords:
+    """
+    One loaded data center: id -> record per kind, with lazily computed
+    record hashes and alias registry.
+    """
+
+    def __init__(self, data_dir: Path = DATA_DIR) -> None:
+        self.data_dir = data_dir
+        self.data: Dict[str, Any] = {
+            "skills": load_json(data_dir / "skills.json"),
+            "effects": load_json(data_dir / "effects.json"),
+            "sets": load_json(data_dir / "sets.json"),
+            "cp_stars": load_json(data_dir / "cp-stars.json"),
+            "id_aliases": id_registry.load_registry_file(str(data_dir)),
+        }
+        self.index: Dict[str, Dict[str, Any]] = {}
+        for data_key, (container_key, _) in RECORD_KINDS.items():
+            container = self.data[data_key]
+            items = container.get(container_key, []) if isinstance(container, dict) else container
+            self.index[data_key] = {
+                item["id"]: item for item in items or [] if isinstance(item, dict) and "id" in item
+            }
+        self._hashes: Dict[Tuple[str, str], Optional[str]] = {}
+        self._registry: Optional[id_registry.IdRegistry] = None
+
+    def record_hash(self, data_key: str, _id: str) -> Optional[str]:
+        key = (data_key, _id)
+        if key not in self._hashes:
+            record = self.index[data_key].get(_id)
+            self._hashes[key] = None if record is None else record_hash(record)
+        return self._hashes[key]
+
+    def resolve(self, kind: str, ref: Any) -> Optional[str]:
+        if self._registry is None:
+            self._registry = id_registry.IdRegistry.from_data(self.data)
+        return self._registry.resolve(kind, ref)
+
+
+# ---------- Dependencies ----------
+
+
+def _build_refs(build: Dict[str, Any]) -> Dict[str, List[Any]]:
+    """
+    Raw skill / set / CP references of a build, by data key: string IDs and
+    integer external IDs (build_rules.is_id), which the registry resolves.
+    """
+    refs: Dict[str, List[Any]] = {"skills": [], "sets": [], "cp_stars": []}
+    bars = build.get("bars") or {}
+    if isinstance(bars, dict):
+        for bar_slots in bars.values():
+            for slot in bar_slots if isinstance(bar_slots, list) else []:
+                if isinstance(slot, dict) and build_rules.is_id(slot.get("skill_id")):
+                    refs["skills"].append(slot["skill_id"])
+    gear = build.get("gear") or []
+    for item in gear if isinstance(gear, list) else []:
+        if isinstance(item, dict) and build_rules.is_id(item.get("set_id")):
+            refs["sets"].append(item["set_id"])
+    cp_slotted = build.get("cp_slotted") or {}
+    if isinstance(cp_slotted, dict):
+        for stars in cp_slotted.values():
+            for cp_id in stars if isinstance(stars, list) else []:
+                if build_rules.is_id(cp_id):
+                    refs["cp_stars"].append(cp_id)
+    return refs
+
+
+def artifact_dependencies(
+    kind: str,
+    build: Dict[str, Any],
+    records: DataRecords,
+    effects: Optional[List[Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
+    """
+    The "records" and "resolved" parts of a manifest. For pillars, pass the
+    aggregated effect instances to record the effects they read.
+    """
+    deps: Dict[str, Dict[str, Optional[str]]] = {data_key: {} for data_key in RECORD_KINDS}
+    resolved: Dict[str, Dict[str, Optional[str]]] = {}
+    for data_key, refs in _build_refs(build).items():
+        registry_kind = RECORD_KINDS[data_key][1]
+        for ref in refs:
+            _id = ref
+            if kind != "md" and ref not in records.index[data_key]:
+                # effects/pillars resolve legacy IDs through the alias registry.
+                canonical = records.resolve(registry_kind, ref)
+                # JSON object keys are strings; stale_reason() matches on str(ref).
+                resolved.setdefault(registry_kind, {})[str(ref)] = canonical
+                _id = canonical or ref
+            deps[data_key][str(_id)] = records.record_hash(data_key, _id)
+    for eff in effects or []:
+        effect_id = eff.get("effect_id")
+        if isinstance(effect_id, str):
+            deps["effects"][effect_id] = records.record_hash("effects", effect_id)
+    return {"records": deps, "resolved": resolved}
+
+
+# ---------- Artifacts ----------
+
+
+class Artifact:
+    def __init__(self, kind: str, build_path: Path) -> None:
+        self.kind = kind
+        self.build_path = build_path
+        stem = build_path.name[: -len(".json")]
+        self.build_stem = stem
+        self.path = build_path.with_name(stem + ARTIFACT_KINDS[kind][0])
+        self.manifest_path = build_path.parent / DEPS_DIRNAME / (self.path.name + ".json")
+
+    @property
+    def name(self) -> str:
+        return relative(self.path)
+
+
+def list_build_files(builds_dir: Path = BUILDS_DIR) -> List[Path]:
+    """
+    Build definitions under builds/ (derived -effects/-pillars files are skipped).
+    """
+    paths: List[Path] = []
+    for path in sorted(builds_dir.glob("*.json")):
+        build = load_json(path)
+        if isinstance(build, dict) and "bars" in build:
+            paths.append(path)
+    return paths
+
+
+def list_artifacts(build_paths: List[Path], create: bool = False) -> List[Artifact]:
+    artifacts: List[Artifact] = []
+    for build_path in build_paths:
+        for kind in ARTIFACT_KINDS:
+            artifact = Artifact(kind, build_path)
+            if create or artifact.path.exists() or artifact.manifest_path.exists():
+                artifacts.append(artifact)
+    return artifacts
+
+
+def stale_reason(artifact: Artifact, records: DataRecords) -> Optional[str]:
+    """
+    Why an artifact must be regenerated, or None when it is up to date.
+    """
+    if not artifact.path.exists():
+        return "artifact missing"
+    try:
+        manifest = load_json(artifact.manifest_path)
+    except (OSError, json.JSONDecodeError):
+        return "no dependency manifest"
+    if manifest.get("schema_version") != MANIFEST_SCHEMA_VERSION:
+        return "manifest schema changed"
+    build_bytes = artifact.build_path.read_bytes()
+    if manifest["build"]["hash"] != _hash_bytes(build_bytes):
+        return "build changed"
+    if manifest["generator"] != generator_hash(artifact.kind, artifact.build_stem):
+        return "generator changed"
+    if manifest["output"] != _hash_bytes(artifact.path.read_bytes()):
+        return "artifact edited"
+    for data_key, deps in manifest["records"].items():
+        for _id, expected in deps.items():
+            if records.record_hash(data_key, _id) != expected:
+                return f"{_id} changed"
+    if any(manifest["resolved"].values()):
+        # Re-resolve the build's own refs: an integer external ID is a string
+        # key in the manifest, and resolving that string could differ.
+        build = json.loads(build_bytes)
+        for data_key, refs in _build_refs(build).items():
+            registry_kind = RECORD_KINDS[data_key][1]
+            expected_refs = manifest["resolved"].get(registry_kind, {})
+            for ref in refs:
+                key = str(ref)
+                if key in expected_refs and records.resolve(registry_kind, ref) != expected_refs[key]:
+                    return f"{ref} resolves differently"
+    return None
+
+
+def render_artifact(artifact: Artifact, records: DataRecords) -> Tuple[str, Dict[str, Any]]:
+    """
+    The artifact text exactly as its CLI writes it, plus its dependencies.
+    """
+    build = load_json(artifact.build_path)
+    if artifact.kind == "effects":
+        effects = aggregate_effects.aggregate_effects(build, records.data)
+        text = json.dumps(effects, indent=2, sort_keys=True) + "\n"
+        return text, artifact_dependencies("effects", build, records)
+    if artifact.kind == "pillars":
+        pillars = compute_pillars.compute_pillars(build, records.data)
+        effects = compute_pillars.aggregate_effects(build, records.data)
+        text = json.dumps(pillars, indent=2, sort_keys=True) + "\n"
+        return text, artifact_dependencies("pillars", build, records, effects)
+
+    if artifact.build_stem in MD_EXPORTERS:
+        text = export_build_test_md.render_build_markdown(
+            build, records.index["skills"], records.index["sets"], records.index["cp_stars"]
+        )
+    else:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            out_path = Path(tmp_dir) / artifact.path.name
+            export_build_md.export_build_md(artifact.build_path, out_path, records.data_dir)
+            text = out_path.read_text(encoding="utf-8")
+    return text, artifact_dependencies("md", build, records)
+
+
+def _write_text(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with atomic_write(path, newline="") as f:
+        f.write(text)
+
+
+def regenerate(artifact: Artifact, records: DataRecords) -> None:
+    text, deps = render_artifact(artifact, records)
+    _write_text(artifact.path, text)
+    manifest = {
+        "schema_version": MANIFEST_SCHEMA_VERSION,
+        "artifact": artifact.name,
+        "kind": artifact.kind,
+        "build": {
+            "path": relative(artifact.build_path),
+            "hash": _hash_bytes(artifact.build_path.read_bytes()),
+        },
+        "generator": generator_hash(artifact.kind, artifact.build_stem),
+        **deps,
+        "output": _hash_bytes(artifact.path.read_bytes()),
+    }
+    _write_text(artifact.manifest_path, json.dumps(manifest, indent=2, sort_keys=True) + "\n")
+
+
+# ---------- Workers ----------
+
+# Data loaded once per worker process.
+_WORKER_RECORDS: Dict[str, DataRecords] = {}
+
+
+def _init_worker(data_dir: str) -> None:
+    _WORKER_RECORDS["records"] = DataRecords(Path(data_dir))
+
+
+def _regenerate_in_worker(kind: str, build_path: str) -> Optional[str]:
+    try:
+        regenerate(Artifact(kind, Path(build_path)), _WORKER_RECORDS["records"])
+    except Exception as exc:  # noqa: BLE001 - reported per artifact
+        return f"{type(exc).__name__}: {exc}"
+    return None
+
+
+def rebuild(
+    artifacts: List[Artifact],
+    data_dir: Path = DATA_DIR,
+    jobs: int = 1,
+    force: bool = False,
+    dry_run: bool = False,
+) -> List[Dict[str, Any]]:
+    records = DataRecords(data_dir)
+    results: List[Dict[str, Any]] = []
+    stale: List[Tuple[Artifact, Dict[str, Any]]] = []
+    for artifact in artifacts:
+        reason = "forced" if force else stale_reason(artifact, records)
+        entry: Dict[str, Any] = {"artifact": artifact.name, "kind": artifact.kind}
+        if reason is None:
+            entry["status"] = "fresh"
+        else:
+            entry["status"] = "stale" if dry_run else "rebuilt"
+            entry["reason"] = reason
+            stale.append((artifact, entry))
+        results.append(entry)
+
+    if dry_run or not stale:
+        return results
+
+    if jobs > 1 and len(stale) > 1:
+        with ProcessPoolExecutor(
+            max_workers=min(jobs, len(stale)),
+            initializer=_init_worker,
+            initargs=(str(data_dir),),
+        ) as pool:
+            errors = list(
+                pool.map(
+                    _regenerate_in_worker,
+                    [artifact.kind for artifact, _ in stale],
+                    [str(artifact.build_path) for artifact, _ in stale],
+                )
+            )
+    else:
+        _WORKER_RECORDS["records"] = records
+        errors = [_regenerate_in_worker(artifact.kind, str(artifact.build_path)) for artifact, _ in stale]
+
+    for (_, entry), error in zip(stale, errors):
+        if error is not None:
+            entry["status"] = "failed"
+            entry["error"] = error
+    return results
+
+
+# ---------- CLI ----------
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Track and regenerate derived build artifacts.")
+    parser.add_argument("command", choices=["status", "rebuild"], help="Report staleness, or regenerate stale artifacts.")
+    parser.add_argument("builds", nargs="*", help="Build JSON files (default: every build under builds/).")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Parallel worker processes.")
+    parser.add_argument("--force", action="store_true", help="Regenerate even fresh artifacts.")
+    parser.add_argument("--create", action="store_true", help="Also generate artifact kinds a build does not have yet.")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would be regenerated.")
+    args = parser.parse_args()
+
+    build_paths = [Path(p).resolve() for p in args.builds] or list_build_files()
+    artifacts = list_artifacts(build_paths, args.create)
+    results = rebuild(
+        artifacts,
+        jobs=args.jobs,
+        force=args.force,
+        dry_run=args.dry_run or args.command == "status",
+    )
+
+    failed = [entry for entry in results if entry["status"] == "failed"]
+    stale = [entry for entry in results if entry["status"] in ("stale", "rebuilt")]
+    status = "ERROR" if failed else ("STALE" if args.command == "status" and stale else "OK")
+    print(json.dumps({"status": status, "artifacts": results}, indent=2))
+    return 1 if failed or status == "STALE" else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
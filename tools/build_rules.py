@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+tools/build_rules.py
+
+The build Global Rules (docs/ESO-Build-Engine-Global-Rules.md v1) as one
+declarative rule set, and a compiler that turns it into a single-traversal
+build validator.
+
+GLOBAL_RULES lists what a build must contain: required top-level fields,
+the bars (bar names, allowed slots, skill references), gear (required
+slots, armor slots and weights, set references) and the CP layout (trees,
+stars per tree, CP references). tools/validate_build.py and
+tools/validate_build_test.py both read their rules from here.
+
+compile_build_validator() specializes the rule set to one data center
+(the known skill/set/CP IDs) and returns a function that walks a build once,
+doing structure and reference checks together:
+
+    validator = compile_build_validator(GLOBAL_RULES, known_ids(skills, sets, cp_stars))
+    structure_errors, reference_errors = validator(build, resolver)
+
+Errors are {field, message} dicts in the order and wording of the original
+two-pass validate_build_structure() + validate_references(). Shapes those
+crashed on (the build, bars or cp_slotted not an object, bar or gear entries not
+objects, references that are not string/integer IDs) are structure errors
+instead. Compiling only
+builds the ID sets, so a compiled validator is meant to be reused across a
+corpus of builds (validate_build.py caches one per data hash).
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import id_registry
+
+Errors = List[Dict[str, Any]]
+# (build, structure errors, reference errors, resolve) -> None
+SectionCheck = Callable[[Dict[str, Any], Errors, Errors, Callable[[str, Any], bool]], None]
+BuildValidator = Callable[..., Tuple[Errors, Errors]]
+
+ARMOR_SLOTS = ("head", "shoulder", "chest", "hands", "waist", "legs", "feet")
+
+GLOBAL_RULES: Dict[str, Any] = {
+    "required": ("id", "name"),
+    "bars": {
+        "names": ("front", "back"),
+        # v1 slots are strings; integer slots are read as their string form.
+        "slots": ("1", "2", "3", "4", "5", "ULT"),
+        "reference": ("skill_id", "skill"),
+    },
+    "gear": {
+        "slots": ARMOR_SLOTS + ("neck", "ring1", "ring2", "front_weapon", "back_weapon"),
+        "armor_slots": ARMOR_SLOTS,
+        "armor_weights": ("light", "medium", "heavy"),
+        "reference": ("set_id", "set"),
+    },
+    "cp_slotted": {
+        "trees": ("warfare", "fitness", "craft"),
+        "max_per_tree": 4,
+        "reference": "cp",
+    },
+}
+
+
+def normalize_bar_slot(raw_slot: Any) -> str:
+    """
+    Bar slots as v1 strings: 1 and "1" are the same slot.
+    """
+    return str(raw_slot)
+
+
+def is_id(ref: Any) -> bool:
+    """
+    IDs are strings or integers (external IDs); bool is not an ID even
+    though it is an int, and anything else (lists, objects) is malformed.
+    """
+    return isinstance(ref, (str, int)) and not isinstance(ref, bool)
+
+
+def known_ids(
+    skills: Iterable[Any],
+    sets: Iterable[Any],
+    cp_stars: Iterable[Any],
+) -> Dict[str, Set[str]]:
+    """
+    Reference kind -> canonical IDs, for compile_build_validator().
+    """
+    return {
+        kind: {item["id"] for item in items if isinstance(item, dict) and "id" in item}
+        for kind, items in (("skill", skills), ("set", sets), ("cp", cp_stars))
+    }
+
+
+# ---------- Section compilers ----------
+
+
+def _compile_required(fields: Iterable[str]) -> SectionCheck:
+    fields = tuple(fields)
+
+    def check(build: Dict[str, Any], structure: Errors, references: Errors, resolve: Any) -> None:
+        for field in fields:
+            if field not in build:
+                structure.append({"field": field, "message": f"Missing build.{field}"})
+
+    return check
+
+
+def _compile_bars(rules: Dict[str, Any]) -> SectionCheck:
+    bar_names = tuple(rules["names"])
+    allowed = frozenset(rules["slots"])
+    ref_field, ref_kind = rules["reference"]
+
+    def check(build: Dict[str, Any], structure: Errors, references: Errors, resolve: Any) -> None:
+        bars = build.get("bars")
+        if bars is None:
+            structure.append({"field": "bars", "message": "Missing build.bars"})
+            return
+        if not isinstance(bars, dict):
+            structure.append({"field": "bars", "message": "build.bars must be an object of bars"})
+            return
+
+        for bar_name in bar_names:
+            if bar_name not in bars:
+                structure.append({"field": f"bars.{bar_name}", "message": f"Missing {bar_name} bar"})
+                continue
+
+            bar_slots = bars[bar_name]
+            if not isinstance(bar_slots, list):
+                structure.append(
+                    {
+                        "field": f"bars.{bar_name}",
+                        "message": f"Expected list of slots for bar '{bar_name}'",
+                    }
+                )
+                continue
+
+            seen_slots = set()
+            for idx, slot in enumerate(bar_slots):
+                field_prefix = f"bars.{bar_name}[{idx}]"
+                if not isinstance(slot, dict):
+                    structure.append({"field": field_prefix, "message": "Bar entry must be an object"})
+                    continue
+
+                raw_slot = slot.get("slot")
+                if raw_slot is None:
+                    structure.append({"field": f"{field_prefix}.slot", "message": "Missing slot on bar entry"})
+                else:
+                    slot_str = normalize_bar_slot(raw_slot)
+                    if slot_str not in allowed:
+                        structure.append(
+                            {
+                                "field": f"{field_prefix}.slot",
+                                "message": f"Invalid slot '{slot_str}', expected '1'-'5' or 'ULT'",
+                            }
+                        )
+                    if slot_str in seen_slots:
+                        structure.append(
+                            {
+                                "field": f"{field_prefix}.slot",
+                                "message": f"Duplicate slot '{slot_str}' on bar '{bar_name}'",
+                            }
+                        )
+                    seen_slots.add(slot_str)
+
+                    if ref_field not in slot:
+                        structure.append(
+                            {"field": f"{field_prefix}.{ref_field}", "message": "Missing skill_id on bar slot"}
+                        )
+
+                ref = slot.get(ref_field)
+                if ref is not None and not is_id(ref):
+                    structure.append(
+                        {"field": f"{field_prefix}.{ref_field}", "message": f"Invalid skill_id '{ref}', expected a string or integer ID"}
+                    )
+                elif ref is not None and not resolve(ref_kind, ref):
+                    references.append(
+                        {"field": f"{field_prefix}.{ref_field}", "message": f"Unknown skill_id '{ref}'"}
+                    )
+
+    return check
+
+
+def _compile_gear(rules: Dict[str, Any]) -> SectionCheck:
+    required_slots = frozenset(rules["slots"])
+    armor_slots = frozenset(rules["armor_slots"])
+    armor_weights = frozenset(rules["armor_weights"])
+    ref_field, ref_kind = rules["reference"]
+
+    def check(build: Dict[str, Any], structure: Errors, references: Errors, resolve: Any) -> None:
+        gear = build.get("gear")
+        if gear is None:
+            structure.append({"field": "gear", "message": "Missing build.gear"})
+            return
+        if not isinstance(gear, list):
+            structure.append({"field": "gear", "message": "build.gear must be a list of items"})
+            return
+
+        seen_gear_slots = set()
+        for idx, item in enumerate(gear):
+            if not isinstance(item, dict):
+                structure.append({"field": f"gear[{idx}]", "message": "Gear item must be an object"})
+                continue
+
+            slot_name = item.get("slot")
+            if slot_name is None:
+                structure.append({"field": f"gear[{idx}].slot", "message": "Missing gear.slot"})
+            elif isinstance(slot_name, (list, dict)):
+                # Unhashable, so it cannot be looked up in the slot sets.
+                structure.append({"field": f"gear[{idx}].slot", "message": f"Unexpected gear slot '{slot_name}'"})
+            else:
+                if slot_name not in required_slots:
+                    structure.append(
+                        {"field": f"gear[{idx}].slot", "message": f"Unexpected gear slot '{slot_name}'"}
+                    )
+                if slot_name in seen_gear_slots:
+                    structure.append(
+                        {"field": f"gear[{idx}].slot", "message": f"Duplicate gear slot '{slot_name}'"}
+                    )
+                seen_gear_slots.add(slot_name)
+
+                if slot_name in armor_slots:
+                    weight = item.get("weight")
+                    if not isinstance(weight, str) or weight not in armor_weights:
+                        structure.append(
+                            {
+                                "field": f"gear[{idx}].weight",
+                                "message": f"Invalid armor weight '{weight}', expected 'light', 'medium', or 'heavy'",
+                            }
+                        )
+
+            ref = item.get(ref_field)
+            if ref is not None and not is_id(ref):
+                structure.append(
+                    {"field": f"gear[{idx}].{ref_field}", "message": f"Invalid set_id '{ref}', expected a string or integer ID"}
+                )
+            elif ref is not None and not resolve(ref_kind, ref):
+                references.append(
+                    {
+                        "field": f"gear[{idx}].{ref_field}",
+                        "message": f"Unknown set_id '{ref}' on slot '{item.get('slot', '?')}'",
+                    }
+                )
+
+        for slot_name in sorted(required_slots - seen_gear_slots):
+            structure.append(
+                {
+                    "field": f"gear.{slot_name}",
+                    "message": f"Missing gear item for required slot '{slot_name}'",
+                }
+            )
+
+    return check
+
+
+def _compile_cp(rules: Dict[str, Any]) -> SectionCheck:
+    trees = tuple(rules["trees"])
+    max_per_tree = rules["max_per_tree"]
+    ref_kind = rules["reference"]
+
+    def check(build: Dict[str, Any], structure: Errors, references: Errors, resolve: Any) -> None:
+        cp_slotted = build.get("cp_slotted")
+        if cp_slotted is None:
+            structure.append({"field": "cp_slotted", "message": "Missing build.cp_slotted"})
+            return
+        if not isinstance(cp_slotted, dict):
+            structure.append({"field": "cp_slotted", "message": "build.cp_slotted must be an object of CP trees"})
+            return
+
+        # One pass over the slotted trees. Structure errors are reported in
+        # rule order (warfare, fitness, craft), references in build order,
+        # including trees the rules do not know.
+        per_tree: Dict[str, Errors] = {}
+        for tree_name, stars in cp_slotted.items():
+            if not isinstance(stars, list):
+                continue
+            tree_errors: Errors = []
+            per_tree[tree_name] = tree_errors
+            if len(stars) > max_per_tree:
+                tree_errors.append(
+                    {"field": f"cp_slotted.{tree_name}", "message": f"More than {max_per_tree} CP stars slotted in tree"}
+                )
+            seen_cp_ids = set()
+            for idx, cp_id in enumerate(stars):
+                if cp_id is None:
+                    continue
+                if not is_id(cp_id):
+                    tree_errors.append(
+                        {
+                            "field": f"cp_slotted.{tree_name}[{idx}]",
+                            "message": f"Invalid CP id '{cp_id}' in tree '{tree_name}', expected a string or integer ID",
+                        }
+                    )
+                    continue
+                if cp_id in seen_cp_ids:
+                    tree_errors.append(
+                        {
+                            "field": f"cp_slotted.{tree_name}[{idx}]",
+                            "message": f"Duplicate CP id '{cp_id}' in tree '{tree_name}'",
+                        }
+                    )
+                seen_cp_ids.add(cp_id)
+                if not resolve(ref_kind, cp_id):
+                    references.append(
+                        {
+                            "field": f"cp_slotted.{tree_name}[{idx}]",
+                            "message": f"Unknown CP id '{cp_id}' in tree '{tree_name}'",
+                        }
+                    )
+
+        for tree_name in trees:
+            stars = cp_slotted.get(tree_name)
+            if stars is None:
+                structure.append({"field": f"cp_slotted.{tree_name}", "message": f"Missing CP tree '{tree_name}'"})
+            elif not isinstance(stars, list):
+                structure.append(
+                    {
+                        "field": f"cp_slotted.{tree_name}",
+                        "message": f"Expected list of CP IDs for tree '{tree_name}'",
+                    }
+                )
+            else:
+                structure.extend(per_tree[tree_name])
+
+    return check
+
+
+# ---------- Compiler ----------
+
+
+def compile_build_validator(
+    rules: Dict[str, Any],
+    known: Optional[Dict[str, Set[str]]] = None,
+) -> BuildValidator:
+    """
+    Compile `rules` against `known` (reference kind -> canonical IDs) into
+
+        validator(build, resolver=None) -> (structure_errors, reference_errors)
+
+    Without `known`, reference checks are skipped (structure only). With a
+    resolver (id_registry.IdResolver), non-canonical IDs that resolve through
+    the alias registry are accepted and recorded in resolver.resolved.
+    """
+    sections: List[SectionCheck] = [
+        _compile_required(rules["required"]),
+        _compile_bars(rules["bars"]),
+        _compile_gear(rules["gear"]),
+        _compile_cp(rules["cp_slotted"]),
+    ]
+
+    def validator(
+        build: Dict[str, Any],
+        resolver: Optional[id_registry.IdResolver] = None,
+    ) -> Tuple[Errors, Errors]:
+        structure: Errors = []
+        references: Errors = []
+
+        if known is None:
+            def resolve(kind: str, ref: Any) -> bool:
+                return True
+        else:
+            def resolve(kind: str, ref: Any) -> bool:
+                if ref in known[kind]:
+                    return True
+                return resolver is not None and resolver.resolve(kind, ref) is not None
+
+        if not isinstance(build, dict):
+            structure.append({"field": "build", "message": "Build must be a JSON object"})
+            return structure, references
+        for check in sections:
+            check(build, structure, references, resolve)
+        return structure, references
+
+    return validator
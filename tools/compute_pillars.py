@@ -36,7 +36,9 @@ No legacy aliases (skillid/setid/effectid/durationseconds/etc.) are accepted.
 import json
 import os
 import sys
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
+
+import id_registry
 
 
 # ---------- Shared loading helpers ----------
@@ -57,6 +59,7 @@ def load_all_data(repo_root: str) -> Dict[str, Any]:
         "effects": load_json(os.path.join(data_dir, "effects.json")),
         "sets": load_json(os.path.join(data_dir, "sets.json")),
         "cp_stars": load_json(os.path.join(data_dir, "cp-stars.json")),
+        "id_aliases": id_registry.load_registry_file(data_dir),
     }
 
 
@@ -95,18 +98,25 @@ def unwrap_containers(data: Dict[str, Any]) -> Dict[str, Any]:
 
 
 def index_by_id(items: List[Dict[str, Any]], id_field: str = "id") -> Dict[str, Dict[str, Any]]:
+    # Versioned data (tools/data_versions.py) comes indexed by id already.
+    by_id = getattr(items, "by_id", None)
+    if by_id is not None and id_field == "id":
+        return by_id
     return {item[id_field]: item for item in items if isinstance(item, dict) and id_field in item}
 
 
 def index_effects_by_id(effects_data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
-    items = effects_data.get("effects", [])
-    return {e["id"]: e for e in items if isinstance(e, dict) and "id" in e}
+    return index_by_id(effects_data.get("effects", []))
 
 
 # ---------- Shared aggregate_effects implementation (mirrors tools/aggregate_effects.py) ----------
 
 
-def aggregate_effects(build: Dict[str, Any], data: Dict[str, Any]) -> List[Dict[str, Any]]:
+def aggregate_effects(
+    build: Dict[str, Any],
+    data: Dict[str, Any],
+    resolver: Optional[id_registry.IdResolver] = None,
+) -> List[Dict[str, Any]]:
     """
     Collect all active effect instances from skills, sets, and CP stars.
 
@@ -117,10 +127,15 @@ def aggregate_effects(build: Dict[str, Any], data: Dict[str, Any]) -> List[Dict[
     sets_index = index_by_id(unwrapped["sets"])
     cp_index = index_by_id(unwrapped["cp_stars"])
 
+    # Legacy / external IDs are resolved through the alias registry, which is
+    # only compiled if some reference misses the canonical indexes.
+    if resolver is None:
+        resolver = id_registry.IdResolver(lambda: id_registry.IdRegistry.from_data(data))
+
     effects: List[Dict[str, Any]] = []
-    effects += collect_skill_effects(build, skills_index)
-    effects += collect_set_effects(build, sets_index)
-    effects += collect_cp_effects(build, cp_index)
+    effects += collect_skill_effects(build, skills_index, resolver)
+    effects += collect_set_effects(build, sets_index, resolver)
+    effects += collect_cp_effects(build, cp_index, resolver)
     return effects
 
 
@@ -130,6 +145,7 @@ def aggregate_effects(build: Dict[str, Any], data: Dict[str, Any]) -> List[Dict[
 def collect_skill_effects(
     build: Dict[str, Any],
     skills_index: Dict[str, Dict[str, Any]],
+    resolver: Optional[id_registry.IdResolver] = None,
 ) -> List[Dict[str, Any]]:
     results: List[Dict[str, Any]] = []
     bars = build.get("bars", {}) or {}
@@ -143,6 +159,9 @@ def collect_skill_effects(
             if not skill_id:
                 continue
             skill = skills_index.get(skill_id)
+            if not skill and resolver is not None:
+                skill_id = resolver.resolve("skill", skill_id) or skill_id
+                skill = skills_index.get(skill_id)
             if not skill:
                 continue
 
@@ -194,6 +213,7 @@ def compute_set_piece_counts(build: Dict[str, Any]) -> Dict[str, int]:
 def collect_set_effects(
     build: Dict[str, Any],
     sets_index: Dict[str, Dict[str, Any]],
+    resolver: Optional[id_registry.IdResolver] = None,
 ) -> List[Dict[str, Any]]:
     """
     v1: sets[*].bonuses[*].effects is a list of effect IDs or richer objects.
@@ -201,6 +221,15 @@ def collect_set_effects(
     results: List[Dict[str, Any]] = []
     piece_counts = compute_set_piece_counts(build)
 
+    if resolver is not None and any(set_id not in sets_index for set_id in piece_counts):
+        # Pieces listed under a legacy ID count towards the canonical set.
+        canonical_counts: Dict[str, int] = {}
+        for set_id, count in piece_counts.items():
+            if set_id not in sets_index:
+                set_id = resolver.resolve("set", set_id) or set_id
+            canonical_counts[set_id] = canonical_counts.get(set_id, 0) + count
+        piece_counts = canonical_counts
+
     for set_id, count in piece_counts.items():
         set_record = sets_index.get(set_id)
         if not set_record:
@@ -250,6 +279,7 @@ def collect_set_effects(
 def collect_cp_effects(
     build: Dict[str, Any],
     cp_index: Dict[str, Dict[str, Any]],
+    resolver: Optional[id_registry.IdResolver] = None,
 ) -> List[Dict[str, Any]]:
     """
     v1: build.cp_slotted.{warfare,fitness,craft} holds CP IDs.
@@ -263,6 +293,9 @@ def collect_cp_effects(
             if not cp_id:
                 continue
             star = cp_index.get(cp_id)
+            if not star and resolver is not None:
+                cp_id = resolver.resolve("cp", cp_id) or cp_id
+                star = cp_index.get(cp_id)
             if not star:
                 continue
 
@@ -313,7 +346,7 @@ def _resolve_effect_meta(
     return effects_index.get(effect_id, {})
 
 
-def _get_magnitude(meta: Dict[str, Any]) -> float:
+def get_magnitude(meta: Dict[str, Any]) -> float:
     """
     Resolve a scalar magnitude from an effect metadata record.
 
@@ -350,7 +383,7 @@ def evaluate_resist_pillar(
         if stat not in ("resistance_flat", "resist", "healthmax_resist"):
             continue
 
-        magnitude = _get_magnitude(meta)
+        magnitude = get_magnitude(meta)
         if magnitude == 0:
             continue
 
@@ -398,7 +431,7 @@ def evaluate_health_pillar(
         if stat not in ("maxhealth", "healthmax"):
             continue
 
-        magnitude = _get_magnitude(meta)
+        magnitude = get_magnitude(meta)
         if magnitude == 0:
             continue
 
@@ -446,7 +479,7 @@ def evaluate_speed_pillar(
         ):
             continue
 
-        magnitude = _get_magnitude(meta)
+        magnitude = get_magnitude(meta)
         speed_effects.append(
             {
                 "effect_id": eff["effect_id"],
@@ -607,19 +640,35 @@ def split_active_inactive(
     }
 
 
-def compute_pillars(build: Dict[str, Any], data: Dict[str, Any]) -> Dict[str, Any]:
+def compute_pillars(
+    build: Dict[str, Any],
+    data: Dict[str, Any],
+    resolver: Optional[id_registry.IdResolver] = None,
+) -> Dict[str, Any]:
     """
     Compute pillar statuses for a build given canonical data.
+
+    Pass an IdResolver to see which legacy IDs were resolved and which
+    references are unknown (and contribute nothing).
     """
     # Aggregate effect instances using shared logic.
-    all_effects = aggregate_effects(build, data)
+    all_effects = aggregate_effects(build, data, resolver)
+    return evaluate_pillars(build, all_effects, index_effects_by_id(data["effects"]))
+
+
+def evaluate_pillars(
+    build: Dict[str, Any],
+    all_effects: List[Dict[str, Any]],
+    effects_index: Dict[str, Dict[str, Any]],
+) -> Dict[str, Any]:
+    """
+    Pillar statuses for a build from its aggregated effect instances.
+    """
     split = split_active_inactive(all_effects)
 
     inactive_effects = split["inactive"]
     active_effects = split["active"]
 
-    effects_index = index_effects_by_id(data["effects"])
-
     pillars_cfg = build.get("pillars", {}) or {}
 
     # Inactive state pillars.
@@ -690,6 +739,18 @@ def compute_pillars(build: Dict[str, Any], data: Dict[str, Any]) -> Dict[str, An
 # ---------- CLI ----------
 
 
+def report_unresolved(resolver: id_registry.IdResolver) -> None:
+    """
+    Warn on stderr about references that match no canonical or alias ID;
+    they contribute no effects, so results for the build are incomplete.
+    """
+    if resolver.unresolved:
+        print(
+            json.dumps({"warning": "Unknown IDs skipped", "unresolved_ids": resolver.unresolved}),
+            file=sys.stderr,
+        )
+
+
 def main(argv: List[str]) -> int:
     if len(argv) != 2:
         print(
@@ -704,7 +765,9 @@ def main(argv: List[str]) -> int:
     data = load_all_data(repo_root)
     build = load_json(build_path)
 
-    result = compute_pillars(build, data)
+    resolver = id_registry.IdResolver(lambda: id_registry.IdRegistry.from_data(data))
+    result = compute_pillars(build, data, resolver)
+    report_unresolved(resolver)
 
     json.dump(result, sys.stdout, indent=2, sort_keys=True)
     print()
@@ -0,0 +1,649 @@
+#!/usr/bin/env python3
+"""
+tools/data_versions.py
+
+Versioned data center: several game patches' data in memory at once, at
+the cost of their differences.
+
+A store has one base version (data/ at a git revision, or a data directory)
+and named versions, each a set of per-record changes over a parent version:
+
+{
+  "schema_version": 1,
+  "base": { "revision": "<commit>" },          # or { "dir": "...", "hash": "..." }
+  "versions": [
+    {
+      "name": "u43",
+      "parent": "base",
+      "changes": {
+        "effects": { "buff.major_resolve": {...record...} },
+        "skills": { "skill.removed": null },    # null: record deleted
+        "id_aliases": {...}                     # only when the registry changed
+      }
+    }
+  ]
+}
+
+In memory every version holds one PersistentMap (tools/persistent_map.py)
+per data kind, derived from its parent's by applying its changes, so all
+unchanged records and trie nodes are shared between versions.
+data_at(version) returns a data dict in the load_all_data() shape whose
+containers iterate like the JSON lists and carry the shared maps as their
+id index (see compute_pillars.index_by_id), so
+
+    compute_pillars(build, versions.data_at("u43"))
+
+works for any stored version without copying the catalog. Records a
+version adds iterate after its parent's records.
+
+The store lives in data-versions/versions.json (--store to override).
+
+Usage:
+
+    python tools/data_versions.py init --base HEAD
+    python tools/data_versions.py add u43 --dir /tmp/u43-data
+    python tools/data_versions.py add u44 --rev patch-44 --parent u43
+    python tools/data_versions.py list
+    python tools/data_versions.py pillars builds/permafrost-marshal.json base u43 u44
+    python tools/data_versions.py matrix builds/permafrost-marshal.json
+"""
+
+import argparse
+import hashlib
+import json
+import subprocess
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+import compute_pillars
+import id_registry
+import impact
+from atomic_io import atomic_write
+from persistent_map import PersistentMap, iter_nodes
+
+REPO_ROOT = impact.REPO_ROOT
+# Outside data/ so the store is never picked up as a data file.
+STORE_PATH = REPO_ROOT / "data-versions" / "versions.json"
+
+STORE_SCHEMA_VERSION = 1
+BASE = "base"
+
+# Data key -> container key.
+RECORD_KINDS: Dict[str, str] = {
+    "skills": "skills",
+    "effects": "effects",
+    "sets": "sets",
+    "cp_stars": "cp_stars",
+}
+
+
+class VersionError(Exception):
+    """
+    Raised for unknown or duplicate versions and unusable stores.
+    """
+
+
+# ---------- Versions ----------
+
+
+class RecordList:
+    """
+    The records of one kind in one version. Iterates like the container's
+    list; `by_id` is the version's (shared) id -> record map.
+    """
+
+    __slots__ = ("by_id", "order")
+
+    def __init__(self, by_id: PersistentMap, order: PersistentMap) -> None:
+        self.by_id = by_id
+        self.order = order
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        by_id = self.by_id
+        for _id, _ in sorted(self.order.items(), key=lambda item: item[1]):
+            yield by_id[_id]
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+
+class _Version:
+    __slots__ = ("records", "order", "id_aliases")
+
+    def __init__(
+        self,
+        records: Dict[str, PersistentMap],
+        order: Dict[str, PersistentMap],
+        id_aliases: Optional[Dict[str, Any]],
+    ) -> None:
+        self.records = records
+        self.order = order
+        self.id_aliases = id_aliases
+
+
+class DataVersions:
+    """
+    Base data plus named versions of per-record changes; see the module docstring.
+
+        versions = DataVersions(load_data(...))
+        versions.add("u43", {"effects": {"buff.major_resolve": record}})
+        versions.add_data("u44", impact.load_data_at("patch-44"), parent="u43")
+        data = versions.data_at("u44")
+    """
+
+    def __init__(self, base: Dict[str, Any]) -> None:
+        records: Dict[str, PersistentMap] = {}
+        order: Dict[str, PersistentMap] = {}
+        self._seq = 0
+        for data_key, container_key in RECORD_KINDS.items():
+            by_id: Dict[str, Any] = {}
+            seqs: Dict[str, int] = {}
+            for record in impact.items_of(base[data_key], container_key):
+                if isinstance(record, dict) and isinstance(record.get("id"), str):
+                    # Last record wins for duplicate IDs, as in index_by_id.
+                    by_id[record["id"]] = record
+                    seqs.setdefault(record["id"], self._next_seq())
+            records[data_key] = PersistentMap.from_items(by_id.items())
+            order[data_key] = PersistentMap.from_items(seqs.items())
+        self._versions: Dict[str, _Version] = {BASE: _Version(records, order, base.get("id_aliases"))}
+        self._parents: Dict[str, Optional[str]] = {BASE: None}
+        self._changes: Dict[str, Dict[str, Any]] = {BASE: {}}
+
+    def _next_seq(self) -> int:
+        self._seq += 1
+        return self._seq
+
+    def _version(self, name: str) -> _Version:
+        try:
+            return self._versions[name]
+        except KeyError:
+            raise VersionError(f"Unknown data version {name!r}") from None
+
+    def names(self) -> List[str]:
+        return list(self._versions)
+
+    def parent(self, name: str) -> Optional[str]:
+        self._version(name)
+        return self._parents[name]
+
+    def changes(self, name: str) -> Dict[str, Any]:
+        """
+        The changes `name` applies over its parent.
+        """
+        self._version(name)
+        return self._changes[name]
+
+    def add(self, name: str, changes: Dict[str, Any], parent: Optional[str] = None) -> None:
+        """
+        Add version `name`: `changes` ({data key: {id: record or None}},
+        optionally "id_aliases": payload) over `parent` (default: the most
+        recently added version).
+        """
+        if name in self._versions:
+            raise VersionError(f"Data version {name!r} already exists")
+        parent = parent if parent is not None else self.names()[-1]
+        source = self._version(parent)
+
+        records = dict(source.records)
+        order = dict(source.order)
+        for data_key, record_changes in changes.items():
+            if data_key == "id_aliases":
+                continue
+            if data_key not in RECORD_KINDS:
+                raise VersionError(f"Unknown data kind {data_key!r} in version {name!r}")
+            by_id = records[data_key]
+            seqs = order[data_key]
+            for _id, record in record_changes.items():
+                if record is None:
+                    by_id = by_id.delete(_id)
+                    seqs = seqs.delete(_id)
+                    continue
+                if _id not in seqs:
+                    seqs = seqs.set(_id, self._next_seq())
+                by_id = by_id.set(_id, record)
+            records[data_key] = by_id
+            order[data_key] = seqs
+
+        id_aliases = changes["id_aliases"] if "id_aliases" in changes else source.id_aliases
+        self._versions[name] = _Version(records, order, id_aliases)
+        self._parents[name] = parent
+        self._changes[name] = changes
+
+    def diff(self, data: Dict[str, Any], parent: str) -> Dict[str, Any]:
+        """
+        The changes that turn version `parent` into `data` (a loaded data dict).
+        """
+        source = self._version(parent)
+        changes: Dict[str, Any] = {}
+        for data_key, container_key in RECORD_KINDS.items():
+            old = source.records[data_key]
+            new: Dict[str, Any] = {}
+            for record in impact.items_of(data[data_key], container_key):
+                if isinstance(record, dict) and isinstance(record.get("id"), str):
+                    new[record["id"]] = record
+            kind_changes: Dict[str, Any] = {
+                _id: record for _id, record in new.items() if old.get(_id) != record
+            }
+            for _id in old:
+                if _id not in new:
+                    kind_changes[_id] = None
+            if kind_changes:
+                changes[data_key] = kind_changes
+        if (data.get("id_aliases") or None) != (source.id_aliases or None):
+            changes["id_aliases"] = data.get("id_aliases")
+        return changes
+
+    def add_data(self, name: str, data: Dict[str, Any], parent: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Add version `name` as the difference between `data` and `parent`.
+        """
+        parent = parent if parent is not None else self.names()[-1]
+        changes = self.diff(data, parent)
+        self.add(name, changes, parent)
+        return changes
+
+    def records_at(self, name: str, data_key: str) -> PersistentMap:
+        """
+        id -> record map of one data kind in a version.
+        """
+        return self._version(name).records[data_key]
+
+    def data_at(self, name: str) -> Dict[str, Any]:
+        """
+        Data dict of a version, in the compute_pillars.load_all_data() shape.
+        """
+        version = self._version(name)
+        data: Dict[str, Any] = {
+            data_key: {container_key: RecordList(version.records[data_key], version.order[data_key])}
+            for data_key, container_key in RECORD_KINDS.items()
+        }
+        data["id_aliases"] = version.id_aliases
+        return data
+
+    def sharing(self) -> Dict[str, Any]:
+        """
+        Trie nodes held by all versions together vs. one copy per version.
+        """
+        unique = set()
+        total = 0
+        for version in self._versions.values():
+            for maps in (version.records, version.order):
+                for persistent in maps.values():
+                    for node in iter_nodes(persistent.root):
+                        unique.add(id(node))
+                        total += 1
+        return {"versions": len(self._versions), "nodes_unshared": total, "nodes_held": len(unique)}
+
+
+# ---------- Pillars across versions ----------
+
+# Pillar -> headline number of its compute_pillars() state result.
+PILLAR_TOTALS: Dict[str, Optional[str]] = {
+    "resist": "computed_resist_shown",
+    "health": "total_health_bonus",
+    "speed": None,
+    "hots": "active_hots",
+    "shield": "active_shields",
+    "core_combo": None,
+}
+
+_NO_EFFECTS: List[Dict[str, Any]] = []
+
+
+def _build_components(build: Dict[str, Any]) -> Tuple[List[Any], Dict[str, int], List[Any]]:
+    """
+    Raw skill refs, set piece counts and CP refs, in compute_pillars order.
+    """
+    skill_refs: List[Any] = []
+    bars = build.get("bars", {}) or {}
+    for bar_name in ("front", "back"):
+        for slot in bars.get(bar_name, []):
+            if isinstance(slot, dict) and slot.get("skill_id"):
+                skill_refs.append(slot["skill_id"])
+    cp_refs: List[Any] = []
+    cp_slotted = build.get("cp_slotted", {}) or {}
+    for tree_name in ("warfare", "fitness", "craft"):
+        cp_refs.extend(cp_id for cp_id in cp_slotted.get(tree_name, []) if cp_id)
+    return skill_refs, compute_pillars.compute_set_piece_counts(build), cp_refs
+
+
+def _collect(kind: str, _id: str, count: int, record: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Effect instances of one build component, via the compute_pillars collectors.
+    """
+    index = {_id: record}
+    if kind == "skill":
+        return compute_pillars.collect_skill_effects({"bars": {"front": [{"skill_id": _id}]}}, index)
+    if kind == "set":
+        return compute_pillars.collect_set_effects({"gear": [{"set_id": _id}] * count}, index)
+    return compute_pillars.collect_cp_effects({"cp_slotted": {"warfare": [_id]}}, index)
+
+
+def pillar_matrix_row(result: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    "resist.active" -> {"value": headline number, "meets_target": ...} for one
+    compute_pillars() result; single-state pillars (core_combo) by name.
+    """
+    row: Dict[str, Dict[str, Any]] = {}
+    for pillar, body in result["pillars"].items():
+        total = PILLAR_TOTALS.get(pillar)
+        states = {pillar: body} if "meets_target" in body else {f"{pillar}.{state}": sub for state, sub in body.items()}
+        for column, state_result in states.items():
+            row[column] = {
+                "value": state_result.get(total) if total else None,
+                "meets_target": state_result.get("meets_target"),
+            }
+    return row
+
+
+class _Evaluation:
+    """
+    One version's result and what it read: entity IDs looked up (raw and
+    canonical), effect IDs, and whether the alias registry was consulted.
+    """
+
+    __slots__ = ("result", "ids", "effect_ids", "resolved")
+
+    def __init__(self, result: Dict[str, Any], ids: Set[str], effect_ids: Set[str], resolved: bool) -> None:
+        self.result = result
+        self.ids = ids
+        self.effect_ids = effect_ids
+        self.resolved = resolved
+
+    def touched_by(self, changes: Dict[str, Any]) -> bool:
+        """
+        Whether a version's changes over this one can change the result.
+        """
+        if self.resolved and (
+            "id_aliases" in changes or any(changes.get(data_key) for data_key in ("skills", "sets", "cp_stars"))
+        ):
+            # Legacy references may resolve through any record's external IDs.
+            return True
+        for data_key, record_changes in changes.items():
+            if data_key == "id_aliases":
+                continue
+            read = self.effect_ids if data_key == "effects" else self.ids
+            if any(_id in read for _id in record_changes):
+                return True
+        return False
+
+
+def compute_pillars_across_versions(
+    build: Dict[str, Any],
+    versions: DataVersions,
+    names: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """
+    compute_pillars(build, versions.data_at(name)) for every version in
+    `names` (default: all), in one pass.
+
+    The build's components (slotted skills, set piece counts, CP stars) are
+    listed once. A version whose parent was evaluated in the same pass only
+    has its own changes checked against what the parent's evaluation read;
+    if none of them matter, the parent's result is reused as is. Otherwise
+    a component's effect instances are collected again only when the
+    version holds a different record for it than any version seen so far
+    (records are shared between versions, so this is an identity check),
+    and pillars are evaluated again only when the contributions or the
+    effect records they read differ. Legacy IDs are resolved per version;
+    the alias registry is compiled only when a reference misses and reused
+    across versions with the same entity records and registry file.
+
+    Returns the version x pillar matrix (see pillar_matrix_row) plus the
+    full results; versions with identical inputs share one result object.
+    """
+    names = list(names) if names is not None else versions.names()
+    skill_refs, piece_counts, cp_refs = _build_components(build)
+
+    contributions: Dict[Tuple[str, str, int, int], Tuple[Any, List[Dict[str, Any]]]] = {}
+    registries: Dict[Tuple[int, ...], Tuple[Any, id_registry.IdRegistry]] = {}
+    evaluations: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+    collected = 0
+
+    def contribution(kind: str, _id: str, count: int, record: Any) -> List[Dict[str, Any]]:
+        nonlocal collected
+        if not record:
+            return _NO_EFFECTS
+        key = (kind, _id, count, id(record))
+        cached = contributions.get(key)
+        if cached is None or cached[0] is not record:
+            cached = (record, _collect(kind, _id, count, record))
+            contributions[key] = cached
+            collected += 1
+        return cached[1]
+
+    def evaluate(name: str) -> _Evaluation:
+        skills = versions.records_at(name, "skills")
+        sets = versions.records_at(name, "sets")
+        cp_stars = versions.records_at(name, "cp_stars")
+        effects = versions.records_at(name, "effects")
+        registry: List[id_registry.IdRegistry] = []
+        ids: Set[str] = set()
+
+        def resolve(kind: str, ref: Any) -> Optional[str]:
+            if not registry:
+                data = versions.data_at(name)
+                owners = (data["id_aliases"], skills, sets, cp_stars)
+                key = tuple(id(owner) for owner in owners)
+                if key not in registries:
+                    registries[key] = (owners, id_registry.IdRegistry.from_data(data))
+                registry.append(registries[key][1])
+            canonical = registry[0].resolve(kind, ref)
+            if canonical is not None:
+                ids.add(canonical)
+            return canonical
+
+        parts: List[List[Dict[str, Any]]] = []
+        for ref in skill_refs:
+            ids.add(ref)
+            skill_id, skill = ref, skills.get(ref)
+            if not skill:
+                skill_id = resolve("skill", ref) or ref
+                skill = skills.get(skill_id)
+            parts.append(contribution("skill", skill_id, 0, skill))
+
+        counts = piece_counts
+        ids.update(counts)
+        if any(set_id not in sets for set_id in counts):
+            # Pieces listed under a legacy ID count towards the canonical set.
+            counts = {}
+            for set_id, count in piece_counts.items():
+                if set_id not in sets:
+                    set_id = resolve("set", set_id) or set_id
+                counts[set_id] = counts.get(set_id, 0) + count
+        for set_id, count in counts.items():
+            parts.append(contribution("set", set_id, count, sets.get(set_id)))
+
+        for ref in cp_refs:
+            ids.add(ref)
+            cp_id, star = ref, cp_stars.get(ref)
+            if not star:
+                cp_id = resolve("cp", ref) or ref
+                star = cp_stars.get(cp_id)
+            parts.append(contribution("cp", cp_id, 0, star))
+
+        all_effects = [eff for part in parts for eff in part]
+        effect_ids = list(dict.fromkeys(eff["effect_id"] for eff in all_effects))
+        key = (tuple(id(part) for part in parts), tuple(id(effects.get(effect_id)) for effect_id in effect_ids))
+        result = evaluations.get(key)
+        if result is None:
+            result = compute_pillars.evaluate_pillars(build, all_effects, effects)
+            evaluations[key] = result
+        return _Evaluation(result, ids, set(effect_ids), bool(registry))
+
+    done: Dict[str, _Evaluation] = {}
+    for name in names:
+        parent = versions.parent(name)
+        if parent in done and not done[parent].touched_by(versions.changes(name)):
+            done[name] = done[parent]
+        else:
+            done[name] = evaluate(name)
+
+    results = {name: done[name].result for name in names}
+    rows = [pillar_matrix_row(results[name]) for name in names]
+    columns = list(rows[0]) if rows else []
+    return {
+        "build_id": build.get("id"),
+        "versions": names,
+        "pillars": columns,
+        "matrix": [[row[column] for column in columns] for row in rows],
+        "results": results,
+        "collected_components": collected,
+        "evaluations": len(evaluations),
+    }
+
+
+# ---------- Store ----------
+
+
+def git_rev_parse(revision: str) -> str:
+    proc = subprocess.run(
+        ["git", "rev-parse", "--verify", f"{revision}^{{commit}}"],
+        cwd=str(REPO_ROOT),
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise VersionError(f"Unknown git revision {revision!r}")
+    return proc.stdout.strip()
+
+
+def data_dir_hash(data_dir: Path) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for file_name in list(impact.DATA_FILES.values()) + [id_registry.ALIASES_FILE]:
+        path = data_dir / file_name
+        digest.update(file_name.encode("utf-8") + b"\0")
+        if path.exists():
+            digest.update(path.read_bytes())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def base_spec(revision: Optional[str], data_dir: Optional[Path]) -> Dict[str, Any]:
+    if data_dir is not None:
+        return {"dir": str(data_dir.resolve()), "hash": data_dir_hash(data_dir)}
+    return {"revision": git_rev_parse(revision or "HEAD")}
+
+
+def load_base(spec: Dict[str, Any]) -> Dict[str, Any]:
+    if "revision" in spec:
+        return impact.load_data_at(spec["revision"])
+    data_dir = Path(spec["dir"])
+    if data_dir_hash(data_dir) != spec["hash"]:
+        raise VersionError(f"Base data in {data_dir} changed since the store was created")
+    return impact.load_data(data_dir)
+
+
+def load_store(path: Path = STORE_PATH) -> Tuple[DataVersions, Dict[str, Any]]:
+    """
+    (DataVersions with the base and every version of a store file, base spec).
+    """
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            store = json.load(f)
+    except (OSError, json.JSONDecodeError) as exc:
+        raise VersionError(f"Unreadable data version store {path} ({exc})") from exc
+    if store.get("schema_version") != STORE_SCHEMA_VERSION:
+        raise VersionError(f"Unsupported data version store schema in {path}")
+    versions = DataVersions(load_base(store["base"]))
+    for entry in store["versions"]:
+        versions.add(entry["name"], entry["changes"], entry["parent"])
+    return versions, store["base"]
+
+
+def save_store(versions: DataVersions, base: Dict[str, Any], path: Path = STORE_PATH) -> None:
+    store = {
+        "schema_version": STORE_SCHEMA_VERSION,
+        "base": base,
+        "versions": [
+            {"name": name, "parent": versions.parent(name), "changes": versions.changes(name)}
+            for name in versions.names()
+            if name != BASE
+        ],
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with atomic_write(path) as f:
+        f.write(json.dumps(store, indent=2, ensure_ascii=False) + "\n")
+
+
+# ---------- CLI ----------
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Versioned data center with structural sharing.")
+    parser.add_argument("--store", type=str, default=str(STORE_PATH), help="Version store file.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    init_parser = sub.add_parser("init", help="Create a store over a base data version.")
+    base_group = init_parser.add_mutually_exclusive_group()
+    base_group.add_argument("--base", type=str, default=None, help="Git revision of the base data (default: HEAD).")
+    base_group.add_argument("--base-dir", type=str, default=None, help="Directory with the base data instead.")
+    init_parser.add_argument("--force", action="store_true", help="Replace an existing store.")
+
+    add_parser = sub.add_parser("add", help="Add a version as its changes over a parent version.")
+    add_parser.add_argument("name", help="Version name.")
+    source_group = add_parser.add_mutually_exclusive_group(required=True)
+    source_group.add_argument("--rev", type=str, help="Git revision with the version's data/.")
+    source_group.add_argument("--dir", type=str, help="Directory with the version's data.")
+    add_parser.add_argument("--parent", type=str, default=None, help="Parent version (default: the last one).")
+
+    sub.add_parser("list", help="List versions, their change counts and node sharing.")
+
+    pillars_parser = sub.add_parser("pillars", help="Compute pillars for a build under versions.")
+    pillars_parser.add_argument("build", help="Build JSON file.")
+    pillars_parser.add_argument("versions", nargs="+", help="Version names.")
+
+    matrix_parser = sub.add_parser("matrix", help="Version x pillar matrix for a build.")
+    matrix_parser.add_argument("build", help="Build JSON file.")
+    matrix_parser.add_argument("versions", nargs="*", help="Version names (default: all).")
+    args = parser.parse_args()
+
+    store_path = Path(args.store)
+    try:
+        if args.command == "init":
+            if store_path.exists() and not args.force:
+                raise VersionError(f"{store_path} already exists (use --force to replace it)")
+            spec = base_spec(args.base, Path(args.base_dir) if args.base_dir else None)
+            save_store(DataVersions(load_base(spec)), spec, store_path)
+            print(json.dumps({"status": "OK", "store": str(store_path), "base": spec}, indent=2))
+            return 0
+
+        versions, spec = load_store(store_path)
+        if args.command == "add":
+            data = impact.load_data(Path(args.dir)) if args.dir else impact.load_data_at(args.rev)
+            changes = versions.add_data(args.name, data, args.parent)
+            save_store(versions, spec, store_path)
+            counts = {key: (len(value) if key != "id_aliases" else True) for key, value in changes.items()}
+            print(json.dumps({"status": "OK", "version": args.name, "changes": counts}, indent=2))
+            return 0
+
+        if args.command == "list":
+            entries = [
+                {
+                    "name": name,
+                    "parent": versions.parent(name),
+                    "changes": {
+                        key: (len(value) if key != "id_aliases" else True)
+                        for key, value in versions.changes(name).items()
+                    },
+                }
+                for name in versions.names()
+            ]
+            print(json.dumps({"status": "OK", "versions": entries, "sharing": versions.sharing()}, indent=2))
+            return 0
+
+        build = impact.load_json(Path(args.build))
+        across = compute_pillars_across_versions(build, versions, args.versions or None)
+        if args.command == "pillars":
+            print(json.dumps({"status": "OK", "results": across["results"]}, indent=2, sort_keys=True))
+            return 0
+        del across["results"]
+        print(json.dumps({"status": "OK", **across}, indent=2))
+        return 0
+    except (VersionError, ValueError, OSError) as exc:
+        print(json.dumps({"status": "ERROR", "message": str(exc)}, indent=2))
+        return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
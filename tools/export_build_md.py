@@ -155,10 +155,10 @@ def render_cp_md(
     return "\n".join(lines)
 
 
-def export_build_md(build_path: Path, out_path: Path) -> None:
-    skills_data = load_json(DATA_DIR / "skills.json")
-    sets_data = load_json(DATA_DIR / "sets.json")
-    cp_data = load_json(DATA_DIR / "cp-stars.json")
+def export_build_md(build_path: Path, out_path: Path, data_dir: Path = DATA_DIR) -> None:
+    skills_data = load_json(data_dir / "skills.json")
+    sets_data = load_json(data_dir / "sets.json")
+    cp_data = load_json(data_dir / "cp-stars.json")
 
     # v1 containers
     skills_idx = index_by_id(skills_data.get("skills", skills_data))
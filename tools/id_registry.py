@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+tools/id_registry.py
+
+Alias / ID registry: maps legacy and alternate IDs to canonical IDs.
+
+Sources:
+
+- data/id-aliases.json, the reviewed registry:
+
+    {
+      "aliases": {
+        "skill.deepfissure": "skill.deep_fissure",
+        ...
+      },
+      "external_ids": {
+        "abilityId": { "61345": "skill.deep_fissure" },
+        "setId":     { ... },
+        "cpId":      { ... }
+      }
+    }
+
+  New entries usually start as proposals from tools/reconcile_ids.py.
+
+- The external IDs already stored on canonical records (skills ability_id /
+  external_ids.uesp.abilityId, sets set_id / external_ids.eso_sets_api.setId,
+  CP stars external_ids.uesp_cp.cpId).
+
+Everything is compiled into one hash index per kind (skill, set, cp), so a
+lookup is a single dict access. Numeric external IDs are
+per kind (abilityId 1 and cpId 1 are different things) and match both as
+numbers and as digit strings.
+
+Only build references are resolved. Effect IDs are referenced from data
+records, which validate_data_integrity.py keeps canonical, so the registry
+has no effect section (effect aliases in the file are ignored).
+
+Consumers (validate_build, aggregate_effects, compute_pillars) keep using
+their own id -> record indexes and only ask the registry on a miss, through
+an IdResolver that compiles the registry on first use. Builds that only use
+canonical IDs never pay for it.
+
+Usage:
+
+    python tools/id_registry.py skill.deepfissure cp.steed_s_blessing
+    python tools/id_registry.py --kind skill 61345
+"""
+
+import argparse
+import json
+import os
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+ALIASES_FILE = "id-aliases.json"
+
+KIND_PREFIXES: Dict[str, tuple] = {
+    "skill": ("skill.",),
+    "set": ("set.",),
+    "cp": ("cp.",),
+    "effect": ("buff.", "debuff.", "shield.", "hot."),
+}
+
+# Kinds the registry resolves (build references).
+RESOLVED_KINDS = ("skill", "set", "cp")
+
+# External ID field name -> kind.
+EXTERNAL_KEYS: Dict[str, str] = {
+    "abilityId": "skill",
+    "setId": "set",
+    "cpId": "cp",
+}
+
+
+def kind_of(_id: Any) -> Optional[str]:
+    if not isinstance(_id, str):
+        return None
+    for kind, prefixes in KIND_PREFIXES.items():
+        if _id.startswith(prefixes):
+            return kind
+    return None
+
+
+def _items(container: Any, key: str) -> List[Any]:
+    if isinstance(container, dict):
+        return container.get(key, [])
+    return container or []
+
+
+def _nested(record: Dict[str, Any], source: str, field: str) -> Any:
+    block = (record.get("external_ids") or {}).get(source)
+    return block.get(field) if isinstance(block, dict) else None
+
+
+class IdRegistry:
+    """
+    Compiled alias index.
+
+        registry = IdRegistry.from_data(data)
+        registry.resolve("skill", "skill.deepfissure")   # "skill.deep_fissure"
+        registry.resolve("skill", 61345)                 # "skill.deep_fissure"
+    """
+
+    def __init__(self) -> None:
+        self._index: Dict[str, Dict[Any, str]] = {kind: {} for kind in RESOLVED_KINDS}
+
+    def add_alias(self, alias: str, canonical: str) -> None:
+        kind = kind_of(canonical)
+        if kind not in self._index or alias == canonical:
+            return
+        self._index[kind][alias] = canonical
+
+    def add_external(self, kind: str, external_id: Any, canonical: Any) -> None:
+        if external_id is None or isinstance(external_id, bool) or not isinstance(canonical, str):
+            return
+        index = self._index[kind]
+        if isinstance(external_id, float) and external_id.is_integer():
+            external_id = int(external_id)
+        index.setdefault(external_id, canonical)
+        index.setdefault(str(external_id), canonical)
+        if isinstance(external_id, str) and external_id.isdigit():
+            index.setdefault(int(external_id), canonical)
+
+    def add_registry_file(self, payload: Dict[str, Any]) -> None:
+        for alias, canonical in (payload.get("aliases") or {}).items():
+            self.add_alias(alias, canonical)
+        for field, mapping in (payload.get("external_ids") or {}).items():
+            kind = EXTERNAL_KEYS.get(field)
+            if kind is None or not isinstance(mapping, dict):
+                continue
+            for external_id, canonical in mapping.items():
+                self.add_external(kind, external_id, canonical)
+        self._collapse_chains()
+
+    def add_records(self, skills: Iterable[Any], sets: Iterable[Any], cp_stars: Iterable[Any]) -> None:
+        for skill in skills:
+            if isinstance(skill, dict):
+                self.add_external("skill", skill.get("ability_id"), skill.get("id"))
+                self.add_external("skill", _nested(skill, "uesp", "abilityId"), skill.get("id"))
+        for set_rec in sets:
+            if isinstance(set_rec, dict):
+                self.add_external("set", set_rec.get("set_id"), set_rec.get("id"))
+                self.add_external("set", _nested(set_rec, "eso_sets_api", "setId"), set_rec.get("id"))
+        for star in cp_stars:
+            if isinstance(star, dict):
+                self.add_external("cp", _nested(star, "uesp_cp", "cpId"), star.get("id"))
+
+    def _collapse_chains(self) -> None:
+        # "a -> b" and "b -> c" become "a -> c" so lookups stay one step.
+        for index in self._index.values():
+            for alias in list(index):
+                target = index[alias]
+                seen = {alias}
+                while target in index and target not in seen:
+                    seen.add(target)
+                    target = index[target]
+                index[alias] = target
+
+    def resolve(self, kind: str, ref: Any) -> Optional[str]:
+        # Only strings and integers are IDs. bool is an int (True == 1), and
+        # unhashable refs would raise, so both are unknown rather than looked up.
+        index = self._index.get(kind)
+        if index is None or isinstance(ref, bool) or not isinstance(ref, (str, int)):
+            return None
+        return index.get(ref)
+
+    def entries(self, kind: str) -> Iterable[Tuple[Any, str]]:
+        """
+        (alias or external ID, canonical ID) pairs of one kind.
+        """
+        return self._index.get(kind, {}).items()
+
+    def __len__(self) -> int:
+        return sum(len(index) for index in self._index.values())
+
+    @classmethod
+    def from_data(cls, data: Dict[str, Any]) -> "IdRegistry":
+        """
+        Compile from a loaded data dict (skills, sets, cp_stars and, when
+        load_all_data found one, the "id_aliases" registry payload).
+        """
+        registry = cls()
+        if isinstance(data.get("id_aliases"), dict):
+            registry.add_registry_file(data["id_aliases"])
+        registry.add_records(
+            _items(data.get("skills"), "skills"),
+            _items(data.get("sets"), "sets"),
+            _items(data.get("cp_stars"), "cp_stars") or _items(data.get("cp_stars"), "cpstars"),
+        )
+        return registry
+
+
+def load_registry_file(data_dir: str) -> Optional[Dict[str, Any]]:
+    """
+    data/id-aliases.json, or None when the registry file does not exist.
+    """
+    path = os.path.join(data_dir, ALIASES_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class IdResolver:
+    """
+    On-miss resolution for lookups against canonical indexes.
+
+        resolver = IdResolver(lambda: IdRegistry.from_data(data))
+        record = index.get(ref) or index.get(resolver.resolve("skill", ref))
+
+    The registry is compiled on the first miss only. Every lookup is
+    recorded in .resolved ({kind, id, canonical}) or .unresolved ({kind, id})
+    so callers can report legacy IDs and truly unknown ones.
+    """
+
+    def __init__(self, build_registry: Callable[[], IdRegistry]) -> None:
+        self._build_registry = build_registry
+        self._registry: Optional[IdRegistry] = None
+        self.resolved: List[Dict[str, Any]] = []
+        self.unresolved: List[Dict[str, Any]] = []
+
+    @property
+    def registry(self) -> IdRegistry:
+        if self._registry is None:
+            self._registry = self._build_registry()
+        return self._registry
+
+    def resolve(self, kind: str, ref: Any) -> Optional[str]:
+        canonical = self.registry.resolve(kind, ref)
+        if canonical is None:
+            self.unresolved.append({"kind": kind, "id": ref})
+        else:
+            self.resolved.append({"kind": kind, "id": ref, "canonical": canonical})
+        return canonical
+
+
+# ---------- CLI ----------
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Resolve legacy or external IDs to canonical IDs.")
+    parser.add_argument("ids", nargs="+", help="IDs to resolve.")
+    parser.add_argument(
+        "--kind",
+        choices=sorted(RESOLVED_KINDS),
+        default=None,
+        help="Kind for external numeric IDs (default: from the ID prefix).",
+    )
+    args = parser.parse_args()
+
+    import compute_pillars
+
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    registry = IdRegistry.from_data(compute_pillars.load_all_data(repo_root))
+
+    results = []
+    for ref in args.ids:
+        kind = args.kind or kind_of(ref)
+        canonical = registry.resolve(kind, ref) if kind else None
+        results.append({"id": ref, "kind": kind, "canonical": canonical})
+    print(json.dumps(results, indent=2))
+    return 0 if all(r["canonical"] for r in results) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,596 @@
+#!/usr/bin/env python3
+"""
+tools/impact.py
+
+Reverse-reference index and impact analysis for data changes.
+
+The index answers "who uses this ID?" without scanning data/ and builds/:
+
+- effect ID -> the skills, sets and CP stars whose effects reference it
+  (skills[*].effects[*].effect_id, sets[*].bonuses[*].effects[*],
+  cp_stars[*].effects[*]);
+- skill / set / CP ID -> the build definitions under builds/ that slot it
+  (bars, gear, cp_slotted). Legacy and external IDs in builds are
+  canonicalized through the alias registry (tools/id_registry.py).
+
+It is kept in .cache/reference-index.json and maintained incrementally:
+a data file or build is only re-read when its size/mtime changed and its
+content hash differs; deleted builds drop out.
+
+`impact` compares two data versions (default: data/ at git HEAD against
+the working tree data/) and lists exactly the builds whose pillar results
+can change:
+
+- a skill, set or CP star that was added, removed or modified affects the
+  builds that slot it (by canonical ID, or by the raw ID for builds that
+  referenced it before it existed / after it was removed);
+- an effect that was added, removed or modified affects the entities that
+  reference it in the new data, and through them their builds (entities
+  that stopped referencing it were modified, so they are covered above);
+- a legacy/external build reference that resolves differently in the two
+  versions (id-aliases.json or external IDs changed) affects that build.
+
+Builds that are not listed get identical compute_pillars() results in both
+versions. With --verify, pillars are recomputed for the listed builds only,
+under both versions, and each entry reports whether the result changed.
+
+Usage:
+
+    python tools/impact.py uses buff.major_resolve
+    python tools/impact.py uses skill.deep_fissure set.nibenay
+    python tools/impact.py impact
+    python tools/impact.py impact --base HEAD~3 --verify
+    python tools/impact.py impact --base-dir /tmp/old-data --data-dir data
+"""
+
+import argparse
+import hashlib
+import json
+import subprocess
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import compute_pillars
+import id_registry
+from atomic_io import atomic_write
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DATA_DIR = REPO_ROOT / "data"
+BUILDS_DIR = REPO_ROOT / "builds"
+INDEX_PATH = REPO_ROOT / ".cache" / "reference-index.json"
+
+INDEX_SCHEMA_VERSION = 1
+
+# Data key (as in compute_pillars.load_all_data) -> file under data/.
+DATA_FILES: Dict[str, str] = {
+    "skills": "skills.json",
+    "effects": "effects.json",
+    "sets": "sets.json",
+    "cp_stars": "cp-stars.json",
+}
+
+# Entity data key -> (id_registry kind, container key).
+ENTITY_KINDS: Dict[str, Tuple[str, str]] = {
+    "skills": ("skill", "skills"),
+    "sets": ("set", "sets"),
+    "cp_stars": ("cp", "cp_stars"),
+}
+
+
+def load_json(path: Path) -> Any:
+    with path.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def relative(path: Path) -> str:
+    try:
+        return path.resolve().relative_to(REPO_ROOT).as_posix()
+    except ValueError:
+        return str(path)
+
+
+def items_of(container: Any, key: str) -> List[Any]:
+    if isinstance(container, dict):
+        return container.get(key) or (container.get("cpstars", []) if key == "cp_stars" else [])
+    return container or []
+
+
+# ---------- Data versions ----------
+
+
+def load_data(data_dir: Path = DATA_DIR) -> Dict[str, Any]:
+    """
+    A data version from a directory, in the compute_pillars.load_all_data shape.
+    """
+    data: Dict[str, Any] = {key: load_json(data_dir / file_name) for key, file_name in DATA_FILES.items()}
+    data["id_aliases"] = id_registry.load_registry_file(str(data_dir))
+    return data
+
+
+def git_show(revision: str, rel_path: str) -> Optional[str]:
+    """
+    Content of a repo file at a git revision, or None when it does not exist there.
+    """
+    proc = subprocess.run(
+        ["git", "show", f"{revision}:{rel_path}"],
+        cwd=str(REPO_ROOT),
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+    )
+    if proc.returncode != 0:
+        return None
+    return proc.stdout
+
+
+def load_data_at(revision: str, data_dir: str = "data") -> Dict[str, Any]:
+    """
+    A data version from git: data/*.json as of `revision` (any git revision).
+    Raises ValueError when a required data file is missing there.
+    """
+    data: Dict[str, Any] = {}
+    for key, file_name in DATA_FILES.items():
+        text = git_show(revision, f"{data_dir}/{file_name}")
+        if text is None:
+            raise ValueError(f"{data_dir}/{file_name} does not exist at revision {revision!r}")
+        data[key] = json.loads(text)
+    aliases = git_show(revision, f"{data_dir}/{id_registry.ALIASES_FILE}")
+    data["id_aliases"] = json.loads(aliases) if aliases is not None else None
+    return data
+
+
+# ---------- Reference extraction ----------
+
+
+def entity_effect_refs(data_key: str, record: Any) -> Set[str]:
+    """
+    Effect IDs referenced by one skill, set or CP star record.
+    """
+    refs: Set[str] = set()
+    if not isinstance(record, dict):
+        return refs
+    if data_key == "sets":
+        effect_lists = [bonus.get("effects") for bonus in record.get("bonuses") or [] if isinstance(bonus, dict)]
+    else:
+        effect_lists = [record.get("effects")]
+    for effects in effect_lists:
+        if not isinstance(effects, list):
+            continue
+        for eff in effects:
+            effect_id = eff.get("effect_id") if isinstance(eff, dict) else eff
+            if isinstance(effect_id, str) and effect_id:
+                refs.add(effect_id)
+    return refs
+
+
+def build_refs(build: Dict[str, Any]) -> Dict[str, List[Any]]:
+    """
+    Raw skill / set / CP references of a build definition, by registry kind.
+    """
+    refs: Dict[str, List[Any]] = {"skill": [], "set": [], "cp": []}
+    bars = build.get("bars") or {}
+    if isinstance(bars, dict):
+        for bar_name in ("front", "back"):
+            for slot in bars.get(bar_name) or []:
+                if isinstance(slot, dict) and slot.get("skill_id"):
+                    refs["skill"].append(slot["skill_id"])
+    gear = build.get("gear") or []
+    if isinstance(gear, list):
+        for item in gear:
+            if isinstance(item, dict) and item.get("set_id"):
+                refs["set"].append(item["set_id"])
+    cp_slotted = build.get("cp_slotted") or {}
+    if isinstance(cp_slotted, dict):
+        for tree_name in ("warfare", "fitness", "craft"):
+            stars = cp_slotted.get(tree_name)
+            if isinstance(stars, list):
+                refs["cp"].extend(cp_id for cp_id in stars if cp_id)
+    for kind in refs:
+        unique: List[Any] = []
+        for ref in refs[kind]:
+            if ref not in unique:
+                unique.append(ref)
+        refs[kind] = unique
+    return refs
+
+
+# ---------- Incremental index ----------
+
+
+def _file_hash(raw: bytes) -> str:
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+def _stamp(path: Path) -> List[Any]:
+    stat = path.stat()
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+class ReferenceIndex:
+    """
+    Reverse-reference index over data/ and builds/; see the module docstring.
+
+        index = ReferenceIndex.load()          # refreshes only what changed
+        index.effect_users("buff.major_resolve")
+        # {"skills": [...], "sets": [...], "cp_stars": [...]}
+        index.entity_builds("skill.deep_fissure")
+        # ["builds/permafrost-marshal.json"]
+    """
+
+    def __init__(
+        self,
+        data_dir: Path = DATA_DIR,
+        builds_dir: Path = BUILDS_DIR,
+        index_path: Path = INDEX_PATH,
+    ) -> None:
+        self.data_dir = data_dir
+        self.builds_dir = builds_dir
+        self.index_path = index_path
+        self.state: Dict[str, Any] = {"schema_version": INDEX_SCHEMA_VERSION, "data": {}, "builds": {}}
+        self.refreshed: List[str] = []
+        self._effects: Optional[Dict[str, Dict[str, List[str]]]] = None
+        self._builds: Optional[Dict[str, List[str]]] = None
+
+    @classmethod
+    def load(
+        cls,
+        data_dir: Path = DATA_DIR,
+        builds_dir: Path = BUILDS_DIR,
+        index_path: Path = INDEX_PATH,
+    ) -> "ReferenceIndex":
+        index = cls(data_dir, builds_dir, index_path)
+        try:
+            state = load_json(index_path)
+        except (OSError, json.JSONDecodeError):
+            state = None
+        if (
+            isinstance(state, dict)
+            and state.get("schema_version") == INDEX_SCHEMA_VERSION
+            and state.get("data_dir") == str(data_dir.resolve())
+            and state.get("builds_dir") == str(builds_dir.resolve())
+        ):
+            index.state = state
+        index.refresh()
+        return index
+
+    def _refresh_file(self, entries: Dict[str, Any], name: str, path: Path, parse: Callable[[Any], Any]) -> bool:
+        """
+        Re-read path into entries[name] if it changed; True if it did.
+        """
+        stamp = _stamp(path)
+        entry = entries.get(name)
+        if entry is not None and entry["stamp"] == stamp:
+            return False
+        raw = path.read_bytes()
+        digest = _file_hash(raw)
+        if entry is not None and entry["hash"] == digest:
+            entry["stamp"] = stamp
+            return False
+        entries[name] = {"stamp": stamp, "hash": digest, **parse(json.loads(raw.decode("utf-8")))}
+        self.refreshed.append(relative(path))
+        return True
+
+    def refresh(self) -> None:
+        """
+        Bring the index up to date with data/ and builds/ and save it.
+        """
+        data_entries: Dict[str, Any] = self.state["data"]
+        known: Dict[str, Set[str]] = {}
+        for data_key, (kind, container_key) in ENTITY_KINDS.items():
+
+            def parse_entities(container: Any, data_key: str = data_key, container_key: str = container_key) -> Any:
+                refs: Dict[str, List[str]] = {}
+                for record in items_of(container, container_key):
+                    if isinstance(record, dict) and isinstance(record.get("id"), str):
+                        refs[record["id"]] = sorted(entity_effect_refs(data_key, record))
+                return {"refs": refs}
+
+            self._refresh_file(data_entries, data_key, self.data_dir / DATA_FILES[data_key], parse_entities)
+            known[kind] = set(data_entries[data_key]["refs"])
+
+        aliases_path = self.data_dir / id_registry.ALIASES_FILE
+        aliases_changed = False
+        if aliases_path.exists():
+            aliases_changed = self._refresh_file(data_entries, "id_aliases", aliases_path, lambda payload: {})
+        elif data_entries.pop("id_aliases", None) is not None:
+            aliases_changed = True
+
+        build_entries: Dict[str, Any] = self.state["builds"]
+        present: Set[str] = set()
+        for path in sorted(self.builds_dir.glob("*.json")):
+            rel_path = relative(path)
+            present.add(rel_path)
+
+            def parse_build(build: Any) -> Any:
+                # Derived -effects/-pillars outputs are recorded as non-builds.
+                if not isinstance(build, dict) or "bars" not in build:
+                    return {"build_id": None, "refs": None}
+                return {"build_id": build.get("id"), "refs": build_refs(build)}
+
+            self._refresh_file(build_entries, rel_path, path, parse_build)
+        for rel_path in set(build_entries) - present:
+            del build_entries[rel_path]
+            self.refreshed.append(rel_path)
+
+        # Canonical IDs of build references depend on the data: redo them
+        # (cheap, registry only compiled on a miss) when anything changed.
+        if self.refreshed or aliases_changed or "canonical" not in self.state:
+            self._canonicalize(known)
+            self._save()
+
+    def _canonicalize(self, known: Dict[str, Set[str]]) -> None:
+        resolver = id_registry.IdResolver(lambda: id_registry.IdRegistry.from_data(load_data(self.data_dir)))
+        canonical: Dict[str, List[str]] = {}
+        for rel_path, entry in self.state["builds"].items():
+            if entry["refs"] is None:
+                continue
+            ids: Set[str] = set()
+            for kind, refs in entry["refs"].items():
+                for ref in refs:
+                    if ref in known[kind]:
+                        ids.add(ref)
+                    else:
+                        ids.add(resolver.resolve(kind, ref) or str(ref))
+            canonical[rel_path] = sorted(ids)
+        self.state["canonical"] = canonical
+        self.state["data_dir"] = str(self.data_dir.resolve())
+        self.state["builds_dir"] = str(self.builds_dir.resolve())
+        self._effects = None
+        self._builds = None
+
+    def _save(self) -> None:
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_write(self.index_path) as f:
+            f.write(json.dumps(self.state, separators=(",", ":"), ensure_ascii=False))
+
+    # ----- queries -----
+
+    def _effect_index(self) -> Dict[str, Dict[str, List[str]]]:
+        if self._effects is None:
+            effects: Dict[str, Dict[str, List[str]]] = {}
+            for data_key in ENTITY_KINDS:
+                for entity_id, effect_ids in self.state["data"][data_key]["refs"].items():
+                    for effect_id in effect_ids:
+                        effects.setdefault(effect_id, {}).setdefault(data_key, []).append(entity_id)
+            self._effects = effects
+        return self._effects
+
+    def _build_index(self) -> Dict[str, List[str]]:
+        if self._builds is None:
+            builds: Dict[str, List[str]] = {}
+            for rel_path, ids in self.state["canonical"].items():
+                for entity_id in ids:
+                    builds.setdefault(entity_id, []).append(rel_path)
+            self._builds = builds
+        return self._builds
+
+    def effect_users(self, effect_id: str) -> Dict[str, List[str]]:
+        users = self._effect_index().get(effect_id, {})
+        return {data_key: sorted(users.get(data_key, [])) for data_key in ENTITY_KINDS}
+
+    def entity_builds(self, entity_id: str) -> List[str]:
+        return sorted(self._build_index().get(entity_id, []))
+
+    def build_paths(self) -> List[str]:
+        return sorted(self.state["canonical"])
+
+    def build_refs(self, rel_path: str) -> Dict[str, List[Any]]:
+        return self.state["builds"][rel_path]["refs"]
+
+    def uses(self, _id: str) -> Dict[str, Any]:
+        """
+        Everything that uses an effect, skill, set or CP ID.
+        """
+        result: Dict[str, Any] = {"id": _id}
+        if id_registry.kind_of(_id) == "effect":
+            users = self.effect_users(_id)
+            result.update(users)
+            builds: Set[str] = set()
+            for entity_ids in users.values():
+                for entity_id in entity_ids:
+                    builds.update(self.entity_builds(entity_id))
+            result["builds"] = sorted(builds)
+        else:
+            result["builds"] = self.entity_builds(_id)
+        return result
+
+
+# ---------- Impact ----------
+
+
+def record_hashes(data: Dict[str, Any], data_key: str) -> Dict[str, str]:
+    container_key = ENTITY_KINDS[data_key][1] if data_key in ENTITY_KINDS else data_key
+    hashes: Dict[str, str] = {}
+    for record in items_of(data[data_key], container_key):
+        if isinstance(record, dict) and isinstance(record.get("id"), str):
+            text = json.dumps(record, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+            hashes[record["id"]] = _file_hash(text.encode("utf-8"))
+    return hashes
+
+
+def changed_ids(base: Dict[str, Any], target: Dict[str, Any], data_key: str) -> List[str]:
+    """
+    IDs added, removed or modified between two data versions.
+    """
+    old = record_hashes(base, data_key)
+    new = record_hashes(target, data_key)
+    return sorted(_id for _id in set(old) | set(new) if old.get(_id) != new.get(_id))
+
+
+def _resolver_for(data: Dict[str, Any]) -> Callable[[str, Any], Any]:
+    known = {
+        kind: set(record_hashes(data, data_key)) for data_key, (kind, _) in ENTITY_KINDS.items()
+    }
+    registry: List[id_registry.IdRegistry] = []
+
+    def canonical(kind: str, ref: Any) -> Any:
+        if ref in known[kind]:
+            return ref
+        if not registry:
+            registry.append(id_registry.IdRegistry.from_data(data))
+        return registry[0].resolve(kind, ref) or ref
+
+    return canonical
+
+
+def effect_users_in(data: Dict[str, Any], effect_ids: Set[str]) -> Dict[str, List[str]]:
+    """
+    Effect ID -> entities referencing it, for some effects, read from a data
+    version directly (one pass; for versions the index does not describe).
+    """
+    users: Dict[str, List[str]] = {}
+    for data_key, (_, container_key) in ENTITY_KINDS.items():
+        for record in items_of(data[data_key], container_key):
+            if not isinstance(record, dict) or not isinstance(record.get("id"), str):
+                continue
+            for effect_id in entity_effect_refs(data_key, record) & effect_ids:
+                users.setdefault(effect_id, []).append(record["id"])
+    return users
+
+
+def impact(
+    index: ReferenceIndex,
+    base: Dict[str, Any],
+    target: Dict[str, Any],
+    target_indexed: bool = True,
+) -> Dict[str, Any]:
+    """
+    Builds whose pillar results can differ between the base and target data.
+
+    `index` describes the target data by default. With target_indexed=False
+    (target is a git revision, merged previews, ...) the index only supplies
+    the builds' raw references: effect users are read from the target and
+    every build is checked against the changed IDs.
+    """
+    changed = {data_key: changed_ids(base, target, data_key) for data_key in DATA_FILES}
+    aliases_changed = (base.get("id_aliases") or {}) != (target.get("id_aliases") or {})
+
+    # Entity -> why it is affected.
+    affected: Dict[str, List[str]] = {}
+    for data_key in ENTITY_KINDS:
+        for entity_id in changed[data_key]:
+            affected.setdefault(entity_id, []).append("changed")
+    if target_indexed:
+        users = {
+            effect_id: [entity_id for entity_ids in index.effect_users(effect_id).values() for entity_id in entity_ids]
+            for effect_id in changed["effects"]
+        }
+    else:
+        users = effect_users_in(target, set(changed["effects"]))
+    for effect_id in changed["effects"]:
+        for entity_id in users.get(effect_id, []):
+            affected.setdefault(entity_id, []).append(effect_id)
+
+    base_canonical = _resolver_for(base)
+    target_canonical = _resolver_for(target)
+
+    builds: List[Dict[str, Any]] = []
+    candidates: Set[str] = set()
+    for entity_id in affected:
+        candidates.update(index.entity_builds(entity_id))
+    if not target_indexed or aliases_changed or any(changed[data_key] for data_key in ENTITY_KINDS):
+        # Legacy / external references may now resolve elsewhere (and the
+        # index's canonical IDs are only exact for the data it describes).
+        candidates.update(index.build_paths())
+
+    for rel_path in sorted(candidates):
+        via: Set[str] = set()
+        for kind, refs in index.build_refs(rel_path).items():
+            for ref in refs:
+                old_id = base_canonical(kind, ref)
+                new_id = target_canonical(kind, ref)
+                if old_id != new_id:
+                    via.update((str(old_id), str(new_id)))
+                for entity_id in (old_id, new_id):
+                    if entity_id in affected:
+                        via.add(entity_id)
+        if via:
+            builds.append(
+                {
+                    "path": rel_path,
+                    "build_id": index.state["builds"][rel_path]["build_id"],
+                    "via": sorted(via),
+                }
+            )
+
+    return {
+        "changed": {**changed, "id_aliases": aliases_changed},
+        "affected_entities": {entity_id: sorted(set(reasons)) for entity_id, reasons in sorted(affected.items())},
+        "affected_builds": builds,
+        "unaffected_build_count": len(index.build_paths()) - len(builds),
+    }
+
+
+def verify_pillars(
+    builds: List[Dict[str, Any]],
+    base: Dict[str, Any],
+    target: Dict[str, Any],
+) -> None:
+    """
+    Recompute pillars for the affected builds only, under both versions,
+    and mark each entry with "pillars_changed".
+    """
+    for entry in builds:
+        build = load_json(REPO_ROOT / entry["path"])
+        before = compute_pillars.compute_pillars(build, base)
+        after = compute_pillars.compute_pillars(build, target)
+        entry["pillars_changed"] = before != after
+
+
+# ---------- CLI ----------
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Reverse-reference index and data-change impact analysis.")
+    parser.add_argument("--data-dir", type=str, default=str(DATA_DIR), help="Data directory (the target version).")
+    parser.add_argument("--builds-dir", type=str, default=str(BUILDS_DIR), help="Build definitions directory.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    uses_parser = sub.add_parser("uses", help="List the entities and builds that use IDs.")
+    uses_parser.add_argument("ids", nargs="+", help="Effect, skill, set or CP IDs.")
+
+    impact_parser = sub.add_parser("impact", help="List builds whose pillars a data change can affect.")
+    base_group = impact_parser.add_mutually_exclusive_group()
+    base_group.add_argument("--base", type=str, default="HEAD", help="Git revision of the base data (default: HEAD).")
+    base_group.add_argument("--base-dir", type=str, default=None, help="Directory with the base data instead.")
+    impact_parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="Recompute pillars for the affected builds under both versions.",
+    )
+    args = parser.parse_args()
+
+    data_dir = Path(args.data_dir)
+    index = ReferenceIndex.load(data_dir, Path(args.builds_dir))
+
+    if args.command == "uses":
+        print(json.dumps([index.uses(_id) for _id in args.ids], indent=2))
+        return 0
+
+    try:
+        base = load_data(Path(args.base_dir)) if args.base_dir else load_data_at(args.base)
+    except (OSError, ValueError) as exc:
+        print(json.dumps({"status": "ERROR", "message": str(exc)}, indent=2))
+        return 1
+    target = load_data(data_dir)
+
+    result = impact(index, base, target)
+    if args.verify:
+        verify_pillars(result["affected_builds"], base, target)
+    print(
+        json.dumps(
+            {
+                "status": "OK",
+                "base": args.base_dir or args.base,
+                "data_dir": str(data_dir),
+                "index_refreshed": index.refreshed,
+                **result,
+            },
+            indent=2,
+        )
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+tools/import_checkpoint.py
+
+Checkpoints and --resume for the import tools
+(import_skills_from_uesp.py, import_sets_from_uesp.py, import_cp_from_uesp.py).
+
+While a preview is streamed out (tools/import_stream.py PreviewWriter), the
+importer appends a checkpoint every N records to
+
+    raw-imports/<kind>.import-checkpoint.jsonl
+
+The first line identifies the run and its partial preview file:
+
+    {"schema_version": 1, "inputs": {...}, "partial_path": "raw-imports/...tmp"}
+
+every further line is one checkpoint:
+
+    {"rows": 20000, "rows_digest": "...", "offset": 18234871,
+     "manifest": {...changes since the previous checkpoint...},
+     "collisions": {...changes since the previous checkpoint...}}
+
+"rows" is the number of snapshot rows (merged rows for a multi-source
+import) consumed, which is also the number of records in the partial
+preview up to byte "offset"; "rows_digest" is a running hash of those rows.
+The manifest and ID-collision state only hold what changed since the
+previous line, so checkpoints stay small and the journal grows linearly
+with the import.
+
+If the run fails (bad row, OOM, killed job) the partial preview and the
+journal stay behind. `--resume` replays the journal, truncates the partial
+preview to the last checkpoint, re-reads (but does not normalize) the rows
+it already covers and continues; the final preview, manifest and delta
+report are the same as an uninterrupted run. A run that completes removes
+the journal.
+
+The snapshot may be fixed before resuming (e.g. a bad row past the last
+checkpoint): the rows the checkpoint covers must hash to rows_digest, or the
+resume stops. The other inputs (snapshot paths, --limit, the importer source
+and the effect data used for effect_proposals) must not change.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from import_manifest import row_hash
+from import_pipeline import Row
+
+CHECKPOINT_SCHEMA_VERSION = 1
+
+DEFAULT_CHECKPOINT_EVERY = 5000
+
+
+class CheckpointError(Exception):
+    """
+    Raised when --resume cannot use the checkpoint on disk.
+    """
+
+
+def file_stamp(path: Path) -> Optional[List[Any]]:
+    """
+    [path, size, mtime_ns] of an input file, or None when it does not exist.
+    """
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return [str(path.resolve()), stat.st_size, stat.st_mtime_ns]
+
+
+def run_inputs(
+    snapshot_paths: Sequence[Path],
+    limit: Optional[int],
+    normalizer: str,
+    extra_files: Sequence[Path] = (),
+) -> Dict[str, Any]:
+    """
+    Everything a checkpoint depends on; see the module docstring.
+    """
+    return {
+        "snapshots": [str(path.resolve()) for path in snapshot_paths],
+        "limit": limit,
+        "normalizer": normalizer,
+        "extra_files": [file_stamp(path) for path in extra_files],
+    }
+
+
+class ImportCheckpoint:
+    """
+    Checkpoint journal for one importer run.
+
+        checkpoint = ImportCheckpoint(journal_path, inputs, every=5000)
+        if args.resume:
+            checkpoint.load()              # raises CheckpointError
+        else:
+            checkpoint.discard()
+        checkpoint.bind(manifest, collisions)
+        rows = checkpoint.rows_after_checkpoint(rows)
+        with PreviewWriter(..., **checkpoint.writer_options()) as writer:
+            for record in records:
+                writer.write(record)
+                checkpoint.after_write(writer)
+        checkpoint.finish()
+    """
+
+    def __init__(self, path: Path, inputs: Dict[str, Any], every: int = DEFAULT_CHECKPOINT_EVERY) -> None:
+        self.path = path
+        self.inputs = inputs
+        self.every = every
+        self.rows = 0
+        self.offset = 0
+        self.partial_path: Optional[Path] = None
+        self._states: List[Dict[str, Any]] = []
+        self._started = False
+        self._manifest: Any = None
+        self._collisions: Any = None
+        self._rows_digest: Optional[str] = None
+        # Running row digests at checkpoint boundaries, until written out.
+        self._digests: Dict[int, str] = {}
+
+    # ----- resume -----
+
+    def load(self) -> None:
+        """
+        Read the journal of a previous run. Without one the import starts
+        from the beginning; a journal for other inputs raises CheckpointError.
+        """
+        if not self.path.exists():
+            return
+        try:
+            with self.path.open("r", encoding="utf-8") as f:
+                lines = f.read().splitlines()
+            header = json.loads(lines[0])
+        except (OSError, IndexError, json.JSONDecodeError) as exc:
+            raise CheckpointError(f"Unreadable checkpoint: {self.path} ({exc})") from exc
+
+        if header.get("schema_version") != CHECKPOINT_SCHEMA_VERSION or header.get("inputs") != self.inputs:
+            raise CheckpointError(
+                f"Checkpoint {self.path} belongs to a run with different inputs "
+                "(snapshot, --limit, importer or effect data changed); run without --resume."
+            )
+
+        for line in lines[1:]:
+            try:
+                state = json.loads(line)
+            except json.JSONDecodeError:
+                # A checkpoint cut short by the crash; the previous one stands.
+                # Rewrite the journal without it so new checkpoints follow on.
+                self.path.write_text(
+                    "".join(line + "\n" for line in lines[: len(self._states) + 1]),
+                    encoding="utf-8",
+                )
+                break
+            self._states.append(state)
+
+        if not self._states:
+            # Failed before the first checkpoint: nothing to resume.
+            self.discard()
+            return
+        self.partial_path = Path(header["partial_path"])
+        self.rows = self._states[-1]["rows"]
+        self.offset = self._states[-1]["offset"]
+        self._rows_digest = self._states[-1]["rows_digest"]
+        self._started = True
+
+    def bind(self, manifest: Any, collisions: Any) -> None:
+        """
+        Attach the ImportManifest and IdCollisions whose state is checkpointed,
+        replaying the loaded checkpoints into them.
+        """
+        self._manifest = manifest
+        self._collisions = collisions
+        for state in self._states:
+            manifest.restore_state(state["manifest"])
+            collisions.restore_state(state["collisions"])
+        self._states = []
+
+    def writer_options(self) -> Dict[str, Any]:
+        """
+        Keyword arguments for PreviewWriter: keep the partial file on failure
+        and, when resuming, continue it.
+        """
+        partial: Optional[Tuple[Path, int, int]] = None
+        if self.partial_path is not None:
+            partial = (self.partial_path, self.offset, self.rows)
+        return {"keep_partial": True, "partial": partial}
+
+    def _check_skipped(self, digest: str) -> None:
+        if self._rows_digest is not None and digest != self._rows_digest:
+            raise CheckpointError(
+                "Snapshot rows covered by the checkpoint changed since it was written; run without --resume."
+            )
+
+    def rows_after_checkpoint(self, rows: Iterable[Row]) -> Iterator[Row]:
+        """
+        Yield the rows after the checkpoint. All rows are hashed: the skipped
+        ones are checked against the checkpoint, the rest feed new checkpoints.
+        """
+        skip = self.rows
+        digest = hashlib.blake2b(digest_size=16)
+        count = 0
+        for row in rows:
+            if count == skip:
+                self._check_skipped(digest.hexdigest())
+            digest.update(row_hash(row).encode("ascii"))
+            count += 1
+            if count > skip:
+                if count % self.every == 0:
+                    self._digests[count] = digest.hexdigest()
+                yield row
+        if count < skip:
+            raise CheckpointError(
+                f"The snapshot has {count} rows, fewer than the {skip} in the checkpoint; run without --resume."
+            )
+        if count == skip:
+            self._check_skipped(digest.hexdigest())
+
+    # ----- writing -----
+
+    def _append(self, payload: Dict[str, Any]) -> None:
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(payload, ensure_ascii=False, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def after_write(self, writer: Any) -> None:
+        if writer.count % self.every != 0:
+            return
+        if not self._started:
+            # A fresh run: a new journal for this partial file.
+            self.path.write_text("", encoding="utf-8")
+            self._append(
+                {
+                    "schema_version": CHECKPOINT_SCHEMA_VERSION,
+                    "inputs": self.inputs,
+                    "partial_path": str(writer.tmp_path),
+                }
+            )
+            self._started = True
+        offset = writer.sync()
+        self._append(
+            {
+                "rows": writer.count,
+                "rows_digest": self._digests.pop(writer.count),
+                "offset": offset,
+                "manifest": self._manifest.checkpoint_state(),
+                "collisions": self._collisions.checkpoint_state(),
+            }
+        )
+        self.rows = writer.count
+
+    # ----- cleanup -----
+
+    def discard(self) -> None:
+        """
+        Drop a previous run's journal and partial preview (a run without --resume).
+        """
+        if self.path.exists():
+            try:
+                with self.path.open("r", encoding="utf-8") as f:
+                    header = json.loads(f.readline())
+                Path(header["partial_path"]).unlink(missing_ok=True)
+            except (OSError, ValueError, KeyError, TypeError):
+                pass
+            self.path.unlink()
+
+    def finish(self) -> None:
+        self.path.unlink(missing_ok=True)
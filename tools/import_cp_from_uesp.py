@@ -31,23 +31,60 @@ This version still targets PREVIEW USE ONLY. It:
   - id = "cp." + normalized snake_case cpName (or cpId-based fallback)
   - name, tree (warfare/fitness/craft), slot_type, tooltip_raw
   - effects = [] (effect IDs will be added later)
+  - effect_proposals: effect IDs found in tooltip_raw, for review
+    (tools/tooltip_effects.py)
   - optional external_ids.uesp_cp
 
 - Writes schema-correct preview JSON to:
     raw-imports/cp-stars.import-preview.json
 
+- With --workers N, normalizes rows on a process pool (tools/import_pipeline.py);
+  records keep snapshot order. Canonical ID collisions are resolved the same
+  way for any N: the first record keeps the ID, later ones get _2, _3, ...
+
+- Reuses normalized records for rows unchanged since the previous run
+  (raw-imports/cp-stars.import-manifest.json, keyed by cpId) and writes the
+  added/changed/removed IDs to raw-imports/cp-stars.import-delta.json
+  (tools/import_manifest.py). --no-cache normalizes every row again.
+
+- With several --snapshot-path arguments (primary first, each sorted by
+  cpId), merges the snapshots in one streaming pass: the primary wins
+  field by field and later snapshots backfill nulls. Each record gets an
+  import_provenance map of field -> snapshot (tools/import_merge.py).
+
+- Every --checkpoint-every records (default 5000) appends a checkpoint to
+  raw-imports/cp-stars.import-checkpoint.jsonl; after a failed run, --resume
+  continues from the last one and produces the same output as an
+  uninterrupted run (tools/import_checkpoint.py).
+
 - Never writes to data/cp-stars.json.
 
-This is intentionally conservative and does NOT attempt to derive effects[]
-from tooltips yet. It gives you a realistic preview file that
+This is intentionally conservative: effect IDs found in tooltips are carried
+as proposals (effect_proposals) for review, and effects[] itself stays
+empty until promotion. It gives you a realistic preview file that
 validate_data_integrity.py can later validate once promoted into data/cp-stars.json.
 """
 
 import argparse
+import itertools
 import json
 import re
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from import_checkpoint import DEFAULT_CHECKPOINT_EVERY, CheckpointError, ImportCheckpoint, run_inputs
+from import_manifest import ImportManifest
+from import_merge import MergedSnapshots
+from import_pipeline import IdCollisions
+from import_stream import (
+    CsvColumns,
+    PreviewWriter,
+    SnapshotError,
+    csv_int,
+    csv_list,
+    iter_snapshot_rows,
+)
+from tooltip_effects import SYNONYMS_FILE, TooltipEffectExtractor
 
 # Repository paths (mirrors validate_build.py layout).
 REPO_ROOT = Path(__file__).resolve().parents[1]
@@ -204,79 +241,77 @@ def build_cp_star_record(external_row: Dict[str, Any]) -> Dict[str, Any]:
 # ---------- Snapshot loading ----------
 
 
-def load_external_snapshot(snapshot_path: Path) -> List[Dict[str, Any]]:
+# Typed columns of CSV/TSV snapshots; other columns stay strings.
+CSV_COLUMNS: CsvColumns = {
+    "cpId": csv_int,
+    "cpTags": csv_list,
+    "cpEffectIdentifiers": csv_list,
+}
+
+
+def iter_external_snapshot(snapshot_path: Path) -> Iterator[Dict[str, Any]]:
     """
-    Load an external ESO/UESP-like CP snapshot from a simple JSON file.
+    Stream external rows from an ESO/UESP-like snapshot, one row at a time.
 
     Expected shape:
       { "cp_stars": [ { ...external cp fields... }, ... ] }
-    """
-    if not snapshot_path.exists():
-        print(
-            json.dumps(
-                {
-                    "status": "ERROR",
-                    "message": f"Snapshot path not found: {snapshot_path}",
-                }
-            )
-        )
-        return []
 
-    try:
-        with snapshot_path.open("r", encoding="utf-8") as f:
-            payload = json.load(f)
-    except Exception as exc:  # noqa: BLE001
-        print(
-            json.dumps(
-                {
-                    "status": "ERROR",
-                    "message": f"Failed to read snapshot JSON: {snapshot_path}",
-                    "error": str(exc),
-                }
-            )
-        )
-        return []
+    .json.gz / .json.zst and CSV/TSV snapshots (one CP star per row, header
+    row of external field names, typed by CSV_COLUMNS) are read the same way.
+
+    Only the top-level "cp_stars" array is walked, so memory use does not grow
+    with snapshot size. Raises SnapshotError for missing or malformed files.
+    """
+    return iter_snapshot_rows(snapshot_path, "cp_stars", columns=CSV_COLUMNS)
 
-    cp_payload = payload.get("cp_stars", [])
-    if not isinstance(cp_payload, list):
-        print(
-            json.dumps(
-                {
-                    "status": "ERROR",
-                    "message": "Snapshot JSON 'cp_stars' field is not a list.",
-                }
-            )
-        )
-        return []
 
-    normalized_rows: List[Dict[str, Any]] = []
-    for row in cp_payload:
-        if isinstance(row, dict):
-            normalized_rows.append(row)
+def load_external_snapshot(snapshot_path: Path) -> List[Dict[str, Any]]:
+    """
+    Load an external ESO/UESP-like CP snapshot from a simple JSON file.
 
-    return normalized_rows
+    Materializing wrapper around iter_external_snapshot(); prints an error
+    status and returns [] if the snapshot cannot be read.
+    """
+    try:
+        return list(iter_external_snapshot(snapshot_path))
+    except SnapshotError as exc:
+        print(json.dumps({"status": "ERROR", "message": str(exc)}))
+        return []
 
 
 # ---------- Preview writer ----------
 
 
-def write_cp_stars_preview(cp_stars: List[Dict[str, Any]]) -> Path:
+def write_cp_stars_preview(
+    cp_stars: Iterable[Dict[str, Any]],
+    checkpoint: Optional[ImportCheckpoint] = None,
+) -> Tuple[Path, int]:
     """
     Write a preview cp-stars JSON under raw-imports/ using the canonical v1
     container shape, plus a small meta block.
 
+    Records are streamed into the file as the iterable yields them and the
+    preview only replaces the previous one once every record is written.
+    Returns the target path and the number of records written.
+
+    With a checkpoint, progress is recorded every checkpoint.every records
+    and a failed run leaves its partial preview behind for --resume.
+
     This DOES NOT write to data/cp-stars.json. Promotion into data/cp-stars.json
     must be a separate, manual step after validation.
     """
     ensure_raw_imports_dir()
     target_path = RAW_IMPORTS_DIR / "cp-stars.import-preview.json"
     container = build_empty_cp_container()
-    container["cp_stars"] = cp_stars
 
-    with target_path.open("w", encoding="utf-8") as f:
-        json.dump(container, f, indent=2, ensure_ascii=False)
+    writer_options = checkpoint.writer_options() if checkpoint is not None else {}
+    with PreviewWriter(target_path, container["meta"], "cp_stars", **writer_options) as writer:
+        for record in cp_stars:
+            writer.write(record)
+            if checkpoint is not None:
+                checkpoint.after_write(writer)
 
-    return target_path
+    return target_path, writer.count
 
 
 # ---------- CLI ----------
@@ -293,9 +328,12 @@ def main() -> int:
         "--snapshot-path",
         type=str,
         required=True,
+        action="append",
         help=(
             "Path to a frozen external snapshot for CP stars "
-            "(JSON file with a top-level 'cp_stars' array)."
+            "(JSON file with a top-level 'cp_stars' array). "
+            "Repeat to merge several snapshots sorted by cpId, primary first; "
+            "later snapshots only backfill null fields."
         ),
     )
     parser.add_argument(
@@ -307,25 +345,133 @@ def main() -> int:
             "If omitted, imports all CP stars in the snapshot."
         ),
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help=(
+            "Normalize rows on N worker processes (default: 1, serial). "
+            "Output is identical for any N."
+        ),
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=(
+            "Normalize every row again instead of reusing unchanged records "
+            "from raw-imports/cp-stars.import-manifest.json."
+        ),
+    )
+    parser.add_argument(
+        "--checkpoint-every",
+        type=int,
+        default=DEFAULT_CHECKPOINT_EVERY,
+        help=(
+            "Record a resumable checkpoint every N records "
+            "(default: %(default)s; 0 disables checkpoints)."
+        ),
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help=(
+            "Continue a failed run from its last checkpoint in "
+            "raw-imports/cp-stars.import-checkpoint.jsonl (same snapshot and options)."
+        ),
+    )
 
     args = parser.parse_args()
-    snapshot_path = Path(args.snapshot_path)
+    snapshot_paths = [Path(path) for path in args.snapshot_path]
 
-    external_rows: List[Dict[str, Any]] = load_external_snapshot(snapshot_path)
+    manifest = ImportManifest(
+        RAW_IMPORTS_DIR / "cp-stars.import-manifest.json",
+        "cpId",
+        build_cp_star_record,
+        use_cache=not args.no_cache,
+    )
+    collisions = IdCollisions("cpId")
+
+    checkpoint = None
+    if args.checkpoint_every > 0:
+        checkpoint = ImportCheckpoint(
+            RAW_IMPORTS_DIR / "cp-stars.import-checkpoint.jsonl",
+            run_inputs(
+                snapshot_paths,
+                args.limit,
+                manifest.fingerprint,
+                [DATA_DIR / "effects.json", DATA_DIR / SYNONYMS_FILE],
+            ),
+            args.checkpoint_every,
+        )
+        try:
+            if args.resume:
+                checkpoint.load()
+            else:
+                checkpoint.discard()
+        except CheckpointError as exc:
+            print(json.dumps({"status": "ERROR", "message": str(exc)}))
+            return 1
+        checkpoint.bind(manifest, collisions)
+    elif args.resume:
+        print(json.dumps({"status": "ERROR", "message": "--resume needs checkpoints (--checkpoint-every > 0)."}))
+        return 1
+
+    merged = None
+    if len(snapshot_paths) == 1:
+        rows = iter_external_snapshot(snapshot_paths[0])
+    else:
+        merged = MergedSnapshots(snapshot_paths, "cp_stars", "cpId", columns=CSV_COLUMNS)
+        rows = iter(merged)
+    # Rows already in the partial preview of a resumed run are skipped.
+    start = 0
+    if checkpoint is not None:
+        start = checkpoint.rows
+        rows = checkpoint.rows_after_checkpoint(rows)
+    if args.limit is not None:
+        rows = itertools.islice(rows, max(args.limit - start, 0))
+
+    # Effect proposals depend on data/effects.json, not on the snapshot row,
+    # so they are added after the manifest cache.
+    extractor = TooltipEffectExtractor.from_data_dir(DATA_DIR)
+    normalized = manifest.normalize_rows(rows, args.workers)
+    if merged is not None:
+        normalized = merged.attach_provenance(normalized, skip=start)
+    records = collisions.apply(extractor.annotate(record, "cp_stars") for record in normalized)
 
-    cp_stars: List[Dict[str, Any]] = []
-    for idx, row in enumerate(external_rows):
-        if args.limit is not None and idx >= args.limit:
-            break
-        cp_stars.append(build_cp_star_record(row))
+    try:
+        target_path, cp_stars_count = write_cp_stars_preview(records, checkpoint)
+    except (SnapshotError, CheckpointError) as exc:
+        print(json.dumps({"status": "ERROR", "message": str(exc)}))
+        return 1
+
+    # A --limit run only sees part of the snapshot, so it must not become
+    # the baseline for the next delta.
+    delta_summary = None
+    if args.limit is None:
+        delta_path = RAW_IMPORTS_DIR / "cp-stars.import-delta.json"
+        delta = manifest.write_delta(delta_path, snapshot_paths[0], snapshot_paths[1:])
+        manifest.save()
+        delta_summary = {
+            "added": len(delta["added"]),
+            "changed": len(delta["changed"]),
+            "removed": len(delta["removed"]),
+            "path": str(delta_path),
+        }
+    if checkpoint is not None:
+        checkpoint.finish()
 
-    target_path = write_cp_stars_preview(cp_stars)
     print(
         json.dumps(
             {
                 "status": "OK",
                 "message": "CP stars import preview generated.",
-                "cp_stars_count": len(cp_stars),
+                "cp_stars_count": cp_stars_count,
+                "id_collisions": collisions.renamed,
+                "reused_count": manifest.reused_count,
+                "normalized_count": manifest.normalized_count,
+                "delta": delta_summary,
+                "merge": merged.summary() if merged is not None else None,
+                "resumed_from_row": start or None,
                 "target_path": str(target_path),
                 "mode": "preview",
             },
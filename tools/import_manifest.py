@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+tools/import_manifest.py
+
+Differential imports for the import tools
+(import_skills_from_uesp.py, import_sets_from_uesp.py, import_cp_from_uesp.py).
+
+Each importer run keeps a manifest next to its preview:
+
+    raw-imports/<kind>.import-manifest.json
+    {
+      "schema_version": 1,
+      "key": "abilityId",
+      "normalizer": "<hash of the importer source>",
+      "entries": {
+        "<external id>": { "hash": "<row content hash>", "record": {...} },
+        ...
+      }
+    }
+
+On the next run a snapshot row whose external ID and content hash match the
+manifest reuses the cached normalized record; only new or changed rows are
+normalized again. Editing the importer (its normalization rules) changes the
+normalizer hash and invalidates every cached record.
+
+After a full run the importer writes a delta report next to the preview:
+
+    raw-imports/<kind>.import-delta.json
+    {
+      "meta": {...},
+      "added":   [ { "external_id": 123, "id": "skill.x" }, ... ],
+      "changed": [ ... ],
+      "removed": [ ... ]
+    }
+
+"changed" lists rows whose normalized record differs from the previous
+run, so downstream tools can act on just those records.
+"""
+
+import hashlib
+import inspect
+import json
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from atomic_io import atomic_write
+from import_pipeline import Normalizer, Row, normalize_rows
+
+MANIFEST_SCHEMA_VERSION = 1
+
+
+# ---------- Hashing ----------
+
+
+def row_hash(row: Row) -> str:
+    """
+    Content hash of one snapshot row (key order does not matter).
+    """
+    text = json.dumps(row, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def normalizer_fingerprint(normalize: Normalizer) -> str:
+    """
+    Hash of the source file that defines the record builder.
+
+    Any change to the importer's normalization rules invalidates the cache.
+    """
+    source_path = inspect.getsourcefile(normalize)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(MANIFEST_SCHEMA_VERSION).encode("ascii"))
+    if source_path:
+        digest.update(Path(source_path).read_bytes())
+    return digest.hexdigest()
+
+
+def _manifest_key(external_id: Any) -> str:
+    # JSON text keeps 123 and "123" apart and round-trips via json.loads.
+    return json.dumps(external_id, sort_keys=True)
+
+
+def write_json_atomic(path: Path, payload: Any, indent: Optional[int] = 2) -> None:
+    """
+    json.dump payload to a temp file next to `path`, then rename it into place.
+    """
+    with atomic_write(path) as f:
+        if indent is None:
+            # json.dumps uses the C encoder for compact output; json.dump
+            # would fall back to the pure-Python one.
+            f.write(json.dumps(payload, ensure_ascii=False, separators=(",", ":")))
+        else:
+            json.dump(payload, f, indent=indent, ensure_ascii=False)
+
+
+# ---------- Manifest ----------
+
+
+class ImportManifest:
+    """
+    Per-row content-hash cache of normalized records, keyed by external ID.
+
+        manifest = ImportManifest(manifest_path, "abilityId", build_skill_record)
+        for record in manifest.normalize_rows(rows, workers=4):
+            ...
+        manifest.write_delta(delta_path, snapshot_path)
+        manifest.save()
+
+    With use_cache=False every row is normalized again, but the previous
+    manifest is still used for the delta report.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        key: str,
+        normalize: Normalizer,
+        use_cache: bool = True,
+    ) -> None:
+        self.path = path
+        self.key = key
+        self.normalize = normalize
+        self.fingerprint = normalizer_fingerprint(normalize)
+
+        self.previous: Dict[str, Dict[str, Any]] = {}
+        self.has_previous = False
+        self.normalizer_changed = False
+        self._load()
+        self.use_cache = use_cache and not self.normalizer_changed
+
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.added: List[Dict[str, Any]] = []
+        self.changed: List[Dict[str, Any]] = []
+        self.reused_count = 0
+        self.normalized_count = 0
+        # Keys (and added/changed lengths) already reported by checkpoint_state().
+        self._checkpointed_keys: List[str] = []
+        self._checkpointed = (0, 0)
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            with self.path.open("r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            # A damaged cache is only a slower run.
+            return
+        if (
+            not isinstance(payload, dict)
+            or payload.get("schema_version") != MANIFEST_SCHEMA_VERSION
+            or payload.get("key") != self.key
+            or not isinstance(payload.get("entries"), dict)
+        ):
+            return
+        self.previous = payload["entries"]
+        self.has_previous = True
+        self.normalizer_changed = payload.get("normalizer") != self.fingerprint
+
+    def _record_change(self, manifest_key: str, record: Row) -> None:
+        entry = {"external_id": json.loads(manifest_key), "id": record.get("id")}
+        old = self.previous.get(manifest_key)
+        if old is None:
+            self.added.append(entry)
+        elif old.get("record") != record:
+            self.changed.append(entry)
+
+    def normalize_rows(self, rows: Iterable[Row], workers: int = 1) -> Iterator[Row]:
+        """
+        Yield one normalized record per row, in snapshot order, reusing
+        cached records for rows that have not changed since the last run.
+        """
+        # Snapshot-ordered plan: ("cached", key, entry) or ("new", key, hash).
+        # Manifest state only changes when a record is yielded, so it always
+        # matches the records handed out so far (see checkpoint_state()).
+        plan: Deque[Tuple[str, Optional[str], Any]] = deque()
+
+        def rows_to_normalize() -> Iterator[Row]:
+            for row in rows:
+                external_id = row.get(self.key)
+                if external_id is None:
+                    plan.append(("new", None, None))
+                    yield row
+                    continue
+
+                manifest_key = _manifest_key(external_id)
+                digest = row_hash(row)
+                old = self.previous.get(manifest_key)
+                if self.use_cache and old is not None and old.get("hash") == digest:
+                    plan.append(("cached", manifest_key, old))
+                else:
+                    plan.append(("new", manifest_key, digest))
+                    yield row
+
+        def drain_cached() -> Iterator[Row]:
+            while plan and plan[0][0] == "cached":
+                _, manifest_key, old = plan.popleft()
+                self.entries[manifest_key] = old
+                self._checkpointed_keys.append(manifest_key)
+                self.reused_count += 1
+                yield old["record"]
+
+        for record in normalize_rows(rows_to_normalize(), self.normalize, workers):
+            yield from drain_cached()
+            _, manifest_key, digest = plan.popleft()
+            self.normalized_count += 1
+            if manifest_key is not None:
+                self.entries[manifest_key] = {"hash": digest, "record": record}
+                self._checkpointed_keys.append(manifest_key)
+                self._record_change(manifest_key, record)
+            yield record
+        yield from drain_cached()
+
+    def checkpoint_state(self) -> Dict[str, Any]:
+        """
+        Manifest changes since the previous call, for an import checkpoint
+        (tools/import_checkpoint.py). Replaying every state in order with
+        restore_state() rebuilds the manifest as it is now.
+        """
+        added_from, changed_from = self._checkpointed
+        state = {
+            "entries": {key: self.entries[key] for key in self._checkpointed_keys},
+            "added": self.added[added_from:],
+            "changed": self.changed[changed_from:],
+            "reused_count": self.reused_count,
+            "normalized_count": self.normalized_count,
+        }
+        self._checkpointed_keys = []
+        self._checkpointed = (len(self.added), len(self.changed))
+        return state
+
+    def restore_state(self, state: Dict[str, Any]) -> None:
+        self.entries.update(state["entries"])
+        self.added.extend(state["added"])
+        self.changed.extend(state["changed"])
+        self.reused_count = state["reused_count"]
+        self.normalized_count = state["normalized_count"]
+        self._checkpointed = (len(self.added), len(self.changed))
+
+    def removed(self) -> List[Dict[str, Any]]:
+        return [
+            {"external_id": json.loads(manifest_key), "id": (entry.get("record") or {}).get("id")}
+            for manifest_key, entry in self.previous.items()
+            if manifest_key not in self.entries
+        ]
+
+    def delta(self, snapshot_path: Path, backfill_paths: Sequence[Path] = ()) -> Dict[str, Any]:
+        return {
+            "meta": {
+                "source": str(snapshot_path),
+                "backfill_sources": [str(path) for path in backfill_paths],
+                "key": self.key,
+                "previous_manifest": self.has_previous,
+                "normalizer_changed": self.normalizer_changed,
+                "reused_count": self.reused_count,
+                "normalized_count": self.normalized_count,
+            },
+            "added": self.added,
+            "changed": self.changed,
+            "removed": self.removed(),
+        }
+
+    def write_delta(
+        self,
+        delta_path: Path,
+        snapshot_path: Path,
+        backfill_paths: Sequence[Path] = (),
+    ) -> Dict[str, Any]:
+        delta = self.delta(snapshot_path, backfill_paths)
+        write_json_atomic(delta_path, delta)
+        return delta
+
+    def save(self) -> None:
+        write_json_atomic(
+            self.path,
+            {
+                "schema_version": MANIFEST_SCHEMA_VERSION,
+                "key": self.key,
+                "normalizer": self.fingerprint,
+                "entries": self.entries,
+            },
+            indent=None,
+        )
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+tools/import_merge.py
+
+Multi-source snapshot merge for the import tools
+(import_skills_from_uesp.py, import_sets_from_uesp.py, import_cp_from_uesp.py).
+
+docs/ESO-Build-Engine-ESO-Hub-Integration.md names ESO-Hub as the primary
+source and UESP / other dumps as backfill. Given several snapshots of the
+same kind, passed in precedence order (primary first):
+
+    --snapshot-path esohub.json --snapshot-path uesp.json
+
+MergedSnapshots streams one merged row per external ID:
+
+- every source must be sorted by the external ID (abilityId, setId, cpId);
+  the sources are k-way merged with heapq.merge, so each one is read once,
+  row by row, and memory does not grow with the number of rows;
+- field-level precedence: the primary source wins, a later source only
+  fills fields that are missing or null in every earlier one;
+- per-field provenance is kept and attached to the normalized record as
+
+    "import_provenance": { "<external field>": "<source name>", ... }
+
+  (a preview-only field, stripped by tools/promote_preview.py).
+
+Rows repeated within one source are merged the same way (earlier row wins).
+Rows without the external ID cannot be joined and are skipped (counted in
+.skipped).
+"""
+
+import heapq
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from import_pipeline import Row
+from import_stream import CsvColumns, SnapshotError, iter_snapshot_rows
+
+PROVENANCE_FIELD = "import_provenance"
+
+
+def external_sort_key(external_id: Any) -> Tuple[int, Any]:
+    """
+    Total order over external IDs: numbers first (numerically), then strings.
+    """
+    if isinstance(external_id, (int, float)) and not isinstance(external_id, bool):
+        return (0, external_id)
+    return (1, str(external_id))
+
+
+class MergedSnapshots:
+    """
+    Streaming k-way merge of sorted snapshots with per-field provenance.
+
+        merged = MergedSnapshots([primary_path, backfill_path], "skills", "abilityId")
+        records = merged.attach_provenance(normalize(row) for row in merged)
+
+    attach_provenance() expects exactly one record per merged row, in
+    order, which is what ImportManifest.normalize_rows and normalize_rows
+    produce.
+    """
+
+    def __init__(
+        self,
+        snapshot_paths: Sequence[Path],
+        key: str,
+        external_key: str,
+        names: Optional[Sequence[str]] = None,
+        columns: Optional[CsvColumns] = None,
+    ) -> None:
+        self.snapshot_paths = list(snapshot_paths)
+        self.key = key
+        self.external_key = external_key
+        self.columns = columns
+        self.names = list(names) if names is not None else [p.name for p in self.snapshot_paths]
+        self.skipped = 0
+        self.rows_per_source: List[int] = [0] * len(self.snapshot_paths)
+        self._pending: Deque[Dict[str, str]] = deque()
+
+    def _keyed_rows(self, rank: int) -> Iterator[Tuple[Tuple[int, Any], int, Row]]:
+        name = self.names[rank]
+        last: Optional[Tuple[int, Any]] = None
+        for row in iter_snapshot_rows(self.snapshot_paths[rank], self.key, columns=self.columns):
+            external_id = row.get(self.external_key)
+            if external_id is None:
+                self.skipped += 1
+                continue
+            sort_key = external_sort_key(external_id)
+            if last is not None and sort_key < last:
+                raise SnapshotError(
+                    f"Snapshot {name} is not sorted by {self.external_key} "
+                    f"({external_id!r} after {last[1]!r}); sort it before a multi-source import."
+                )
+            last = sort_key
+            self.rows_per_source[rank] += 1
+            yield sort_key, rank, row
+
+    def _merge_group(self, group: List[Tuple[int, Row]]) -> Row:
+        merged: Row = {}
+        provenance: Dict[str, str] = {}
+        for rank, row in group:
+            for field, value in row.items():
+                if value is None or merged.get(field) is not None:
+                    continue
+                merged[field] = value
+                provenance[field] = self.names[rank]
+        # Fields that are null everywhere still appear, as in a single source.
+        for rank, row in group:
+            for field in row:
+                merged.setdefault(field, None)
+        self._pending.append(provenance)
+        return merged
+
+    def __iter__(self) -> Iterator[Row]:
+        streams = [self._keyed_rows(rank) for rank in range(len(self.snapshot_paths))]
+        # Ties on the external ID come out in source (precedence) order.
+        entries = heapq.merge(*streams, key=lambda entry: (entry[0], entry[1]))
+
+        group: List[Tuple[int, Row]] = []
+        group_key: Optional[Tuple[int, Any]] = None
+        for sort_key, rank, row in entries:
+            if group and sort_key != group_key:
+                yield self._merge_group(group)
+                group = []
+            group_key = sort_key
+            group.append((rank, row))
+        if group:
+            yield self._merge_group(group)
+
+    def attach_provenance(self, records: Iterable[Row], skip: int = 0) -> Iterator[Row]:
+        """
+        `skip` merged rows were consumed without producing records (rows a
+        resumed import already wrote); their provenance is dropped.
+        """
+        for record in records:
+            while skip:
+                self._pending.popleft()
+                skip -= 1
+            yield dict(record, **{PROVENANCE_FIELD: self._pending.popleft()})
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "sources": [
+                {"name": name, "path": str(path), "rows": count}
+                for name, path, count in zip(self.names, self.snapshot_paths, self.rows_per_source)
+            ],
+            "skipped_without_key": self.skipped,
+        }
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+tools/import_pipeline.py
+
+Parallel normalization shared by the import tools
+(import_skills_from_uesp.py, import_sets_from_uesp.py, import_cp_from_uesp.py).
+
+The record builders (build_skill_record, build_set_record,
+build_cp_star_record) are pure per-row functions. normalize_rows() shards
+snapshot rows into chunks, normalizes the chunks on a process pool and
+yields the records back in snapshot order, so the preview a run with
+--workers N writes is the same file a serial run writes.
+
+Only a bounded number of chunks is in flight at any time, so the streaming
+reader / writer pair (tools/import_stream.py) keeps memory flat.
+
+Normalized IDs are derived from names, so two external rows can map to the
+same canonical ID. IdCollisions resolves that deterministically after the
+ordered merge: the first record keeps the ID, later ones get "_2", "_3", ...
+suffixes in snapshot order.
+"""
+
+import itertools
+import multiprocessing
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Set
+
+DEFAULT_CHUNK_SIZE = 500
+
+# Chunks queued per worker before the reader waits for results.
+_IN_FLIGHT_PER_WORKER = 2
+
+Row = Dict[str, Any]
+Normalizer = Callable[[Row], Row]
+
+
+def _chunks(rows: Iterable[Row], chunk_size: int) -> Iterator[List[Row]]:
+    it = iter(rows)
+    while True:
+        chunk = list(itertools.islice(it, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _normalize_chunk(normalize: Normalizer, chunk: List[Row]) -> List[Row]:
+    return [normalize(row) for row in chunk]
+
+
+def normalize_rows(
+    rows: Iterable[Row],
+    normalize: Normalizer,
+    workers: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[Row]:
+    """
+    Yield normalize(row) for every row, in input order.
+
+    With workers > 1 the rows are normalized in chunks on a process pool.
+    `normalize` must be a module-level function so it can be sent to the
+    workers.
+    """
+    if workers <= 1:
+        for row in rows:
+            yield normalize(row)
+        return
+
+    with multiprocessing.Pool(processes=workers) as pool:
+        pending: Deque[Any] = deque()
+        max_pending = workers * _IN_FLIGHT_PER_WORKER
+
+        for chunk in _chunks(rows, chunk_size):
+            pending.append(pool.apply_async(_normalize_chunk, (normalize, chunk)))
+            if len(pending) >= max_pending:
+                yield from pending.popleft().get()
+
+        while pending:
+            yield from pending.popleft().get()
+
+
+class IdCollisions:
+    """
+    Deterministic canonical-ID collision handling for normalized records.
+
+        collisions = IdCollisions("abilityId")
+        for record in collisions.apply(records):
+            ...
+        collisions.renamed   # [{ "id", "renamed_to", "external_id" }, ...]
+
+    `external_key` names the external ID kept in the report so a renamed
+    record can be traced back to its snapshot row.
+    """
+
+    def __init__(self, external_key: str) -> None:
+        self.external_key = external_key
+        self.renamed: List[Dict[str, Any]] = []
+        self._seen: Dict[str, int] = {}
+        # IDs touched (and renames made) since the last checkpoint_state().
+        self._dirty: Set[str] = set()
+        self._renamed_checkpointed = 0
+
+    def _external_id(self, record: Row) -> Any:
+        for source in (record.get("external_ids") or {}).values():
+            if isinstance(source, dict) and self.external_key in source:
+                return source[self.external_key]
+        return None
+
+    def apply(self, records: Iterable[Row]) -> Iterator[Row]:
+        seen = self._seen
+        for record in records:
+            record_id = record.get("id")
+            if not isinstance(record_id, str):
+                yield record
+                continue
+
+            if record_id not in seen:
+                seen[record_id] = 1
+                self._dirty.add(record_id)
+                yield record
+                continue
+
+            suffix = seen[record_id]
+            while True:
+                suffix += 1
+                candidate = f"{record_id}_{suffix}"
+                if candidate not in seen:
+                    break
+            seen[record_id] = suffix
+            seen[candidate] = 1
+            self._dirty.update((record_id, candidate))
+
+            self.renamed.append(
+                {
+                    "id": record_id,
+                    "renamed_to": candidate,
+                    "external_id": self._external_id(record),
+                }
+            )
+            yield dict(record, id=candidate)
+
+    def checkpoint_state(self) -> Dict[str, Any]:
+        """
+        Changes since the previous call, for an import checkpoint; see
+        ImportManifest.checkpoint_state().
+        """
+        state = {
+            "seen": {record_id: self._seen[record_id] for record_id in sorted(self._dirty)},
+            "renamed": self.renamed[self._renamed_checkpointed:],
+        }
+        self._dirty = set()
+        self._renamed_checkpointed = len(self.renamed)
+        return state
+
+    def restore_state(self, state: Dict[str, Any]) -> None:
+        self._seen.update(state["seen"])
+        self.renamed.extend(state["renamed"])
+        self._renamed_checkpointed = len(self.renamed)
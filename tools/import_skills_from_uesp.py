@@ -40,22 +40,60 @@ This version still targets PREVIEW USE ONLY. It:
   - resource, cost, cast_time, target, duration_seconds, radius_meters
   - ability_id, external_ids.uesp, tooltip_effect_text
   - effects = [] (effects mapping will be added in a later phase)
+  - effect_proposals: effect IDs found in tooltip_effect_text, for review
+    (tools/tooltip_effects.py)
 
 - Writes schema-correct preview JSON to:
     raw-imports/skills.import-preview.json
 
+- With --workers N, normalizes rows on a process pool (tools/import_pipeline.py);
+  records keep snapshot order. Canonical ID collisions are resolved the same
+  way for any N: the first record keeps the ID, later ones get _2, _3, ...
+
+- Reuses normalized records for rows unchanged since the previous run
+  (raw-imports/skills.import-manifest.json, keyed by abilityId) and writes the
+  added/changed/removed IDs to raw-imports/skills.import-delta.json
+  (tools/import_manifest.py). --no-cache normalizes every row again.
+
+- With several --snapshot-path arguments (primary first, each sorted by
+  abilityId), merges the snapshots in one streaming pass: the primary wins
+  field by field and later snapshots backfill nulls. Each record gets an
+  import_provenance map of field -> snapshot (tools/import_merge.py).
+
+- Every --checkpoint-every records (default 5000) appends a checkpoint to
+  raw-imports/skills.import-checkpoint.jsonl; after a failed run, --resume
+  continues from the last one and produces the same output as an
+  uninterrupted run (tools/import_checkpoint.py).
+
 - Never writes to data/skills.json.
 
-This is intentionally conservative and does NOT attempt to derive effects[]
-from tooltips yet. It gives you a realistic, multi-record preview file that
+This is intentionally conservative: effect IDs found in tooltips are carried
+as proposals (effect_proposals) for review, and effects[] itself stays
+empty until promotion. It gives you a realistic, multi-record preview file that
 validate_data_integrity.py can sanity-check once promoted into data/skills.json.
 """
 
 import argparse
+import itertools
 import json
 import re
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from import_checkpoint import DEFAULT_CHECKPOINT_EVERY, CheckpointError, ImportCheckpoint, run_inputs
+from import_manifest import ImportManifest
+from import_merge import MergedSnapshots
+from import_pipeline import IdCollisions
+from import_stream import (
+    CsvColumns,
+    PreviewWriter,
+    SnapshotError,
+    csv_bool,
+    csv_float,
+    csv_int,
+    iter_snapshot_rows,
+)
+from tooltip_effects import SYNONYMS_FILE, TooltipEffectExtractor
 
 # Repository paths (mirrors validate_build.py layout).
 REPO_ROOT = Path(__file__).resolve().parents[1]
@@ -335,79 +373,80 @@ def build_skill_record(external_row: Dict[str, Any]) -> Dict[str, Any]:
 # ---------- Snapshot loading ----------
 
 
-def load_external_snapshot(snapshot_path: Path) -> List[Dict[str, Any]]:
+# Typed columns of CSV/TSV snapshots; other columns stay strings.
+CSV_COLUMNS: CsvColumns = {
+    "abilityId": csv_int,
+    "baseCost": csv_int,
+    "baseDurationSeconds": csv_float,
+    "radiusMeters": csv_float,
+    "isUltimate": csv_bool,
+    "isPassive": csv_bool,
+}
+
+
+def iter_external_snapshot(snapshot_path: Path) -> Iterator[Dict[str, Any]]:
     """
-    Load an external ESO/UESP-like snapshot from a simple JSON file.
+    Stream external rows from an ESO/UESP-like snapshot, one row at a time.
 
     Expected shape:
       { "skills": [ { ...external skill fields... }, ... ] }
-    """
-    if not snapshot_path.exists():
-        print(
-            json.dumps(
-                {
-                    "status": "ERROR",
-                    "message": f"Snapshot path not found: {snapshot_path}",
-                }
-            )
-        )
-        return []
 
-    try:
-        with snapshot_path.open("r", encoding="utf-8") as f:
-            payload = json.load(f)
-    except Exception as exc:  # noqa: BLE001
-        print(
-            json.dumps(
-                {
-                    "status": "ERROR",
-                    "message": f"Failed to read snapshot JSON: {snapshot_path}",
-                    "error": str(exc),
-                }
-            )
-        )
-        return []
+    .json.gz / .json.zst and CSV/TSV snapshots (one skill per row, header
+    row of external field names, typed by CSV_COLUMNS) are read the same way.
+
+    Only the top-level "skills" array is walked, so memory use does not grow
+    with snapshot size. Raises SnapshotError for missing or malformed files.
+    """
+    return iter_snapshot_rows(snapshot_path, "skills", columns=CSV_COLUMNS)
 
-    skills = payload.get("skills", [])
-    if not isinstance(skills, list):
-        print(
-            json.dumps(
-                {
-                    "status": "ERROR",
-                    "message": "Snapshot JSON 'skills' field is not a list.",
-                }
-            )
-        )
-        return []
 
-    normalized_rows: List[Dict[str, Any]] = []
-    for row in skills:
-        if isinstance(row, dict):
-            normalized_rows.append(row)
+def load_external_snapshot(snapshot_path: Path) -> List[Dict[str, Any]]:
+    """
+    Load an external ESO/UESP-like snapshot from a simple JSON file.
 
-    return normalized_rows
+    Materializing wrapper around iter_external_snapshot(); prints an error
+    status and returns [] if the snapshot cannot be read.
+    """
+    try:
+        return list(iter_external_snapshot(snapshot_path))
+    except SnapshotError as exc:
+        print(json.dumps({"status": "ERROR", "message": str(exc)}))
+        return []
 
 
 # ---------- Preview writer ----------
 
 
-def write_skills_preview(skills: List[Dict[str, Any]]) -> Path:
+def write_skills_preview(
+    skills: Iterable[Dict[str, Any]],
+    checkpoint: Optional[ImportCheckpoint] = None,
+) -> Tuple[Path, int]:
     """
     Write a preview skills JSON under raw-imports/ using the canonical v1
     container shape, plus a small meta block.
 
+    Records are streamed into the file as the iterable yields them and the
+    preview only replaces the previous one once every record is written.
+    Returns the target path and the number of records written.
+
+    With a checkpoint, progress is recorded every checkpoint.every records
+    and a failed run leaves its partial preview behind for --resume.
+
     This DOES NOT write to data/skills.json. Promotion into data/skills.json
     must be a separate, manual step after validation.
     """
     ensure_raw_imports_dir()
     target_path = RAW_IMPORTS_DIR / "skills.import-preview.json"
     container = build_empty_skills_container()
-    container["skills"] = skills
 
-    with target_path.open("w", encoding="utf-8") as f:
-        json.dump(container, f, indent=2, ensure_ascii=False)
+    writer_options = checkpoint.writer_options() if checkpoint is not None else {}
+    with PreviewWriter(target_path, container["meta"], "skills", **writer_options) as writer:
+        for record in skills:
+            writer.write(record)
+            if checkpoint is not None:
+                checkpoint.after_write(writer)
 
-    return target_path
+    return target_path, writer.count
 
 
 # ---------- CLI ----------
@@ -424,9 +463,12 @@ def main() -> int:
         "--snapshot-path",
         type=str,
         required=True,
+        action="append",
         help=(
             "Path to a frozen external snapshot for skills "
-            "(JSON file with a top-level 'skills' array)."
+            "(JSON file with a top-level 'skills' array). "
+            "Repeat to merge several snapshots sorted by abilityId, primary first; "
+            "later snapshots only backfill null fields."
         ),
     )
     parser.add_argument(
@@ -438,25 +480,133 @@ def main() -> int:
             "If omitted, imports all skills in the snapshot."
         ),
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help=(
+            "Normalize rows on N worker processes (default: 1, serial). "
+            "Output is identical for any N."
+        ),
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=(
+            "Normalize every row again instead of reusing unchanged records "
+            "from raw-imports/skills.import-manifest.json."
+        ),
+    )
+    parser.add_argument(
+        "--checkpoint-every",
+        type=int,
+        default=DEFAULT_CHECKPOINT_EVERY,
+        help=(
+            "Record a resumable checkpoint every N records "
+            "(default: %(default)s; 0 disables checkpoints)."
+        ),
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help=(
+            "Continue a failed run from its last checkpoint in "
+            "raw-imports/skills.import-checkpoint.jsonl (same snapshot and options)."
+        ),
+    )
 
     args = parser.parse_args()
-    snapshot_path = Path(args.snapshot_path)
+    snapshot_paths = [Path(path) for path in args.snapshot_path]
 
-    external_rows: List[Dict[str, Any]] = load_external_snapshot(snapshot_path)
+    manifest = ImportManifest(
+        RAW_IMPORTS_DIR / "skills.import-manifest.json",
+        "abilityId",
+        build_skill_record,
+        use_cache=not args.no_cache,
+    )
+    collisions = IdCollisions("abilityId")
+
+    checkpoint = None
+    if args.checkpoint_every > 0:
+        checkpoint = ImportCheckpoint(
+            RAW_IMPORTS_DIR / "skills.import-checkpoint.jsonl",
+            run_inputs(
+                snapshot_paths,
+                args.limit,
+                manifest.fingerprint,
+                [DATA_DIR / "effects.json", DATA_DIR / SYNONYMS_FILE],
+            ),
+            args.checkpoint_every,
+        )
+        try:
+            if args.resume:
+                checkpoint.load()
+            else:
+                checkpoint.discard()
+        except CheckpointError as exc:
+            print(json.dumps({"status": "ERROR", "message": str(exc)}))
+            return 1
+        checkpoint.bind(manifest, collisions)
+    elif args.resume:
+        print(json.dumps({"status": "ERROR", "message": "--resume needs checkpoints (--checkpoint-every > 0)."}))
+        return 1
+
+    merged = None
+    if len(snapshot_paths) == 1:
+        rows = iter_external_snapshot(snapshot_paths[0])
+    else:
+        merged = MergedSnapshots(snapshot_paths, "skills", "abilityId", columns=CSV_COLUMNS)
+        rows = iter(merged)
+    # Rows already in the partial preview of a resumed run are skipped.
+    start = 0
+    if checkpoint is not None:
+        start = checkpoint.rows
+        rows = checkpoint.rows_after_checkpoint(rows)
+    if args.limit is not None:
+        rows = itertools.islice(rows, max(args.limit - start, 0))
+
+    # Effect proposals depend on data/effects.json, not on the snapshot row,
+    # so they are added after the manifest cache.
+    extractor = TooltipEffectExtractor.from_data_dir(DATA_DIR)
+    normalized = manifest.normalize_rows(rows, args.workers)
+    if merged is not None:
+        normalized = merged.attach_provenance(normalized, skip=start)
+    records = collisions.apply(extractor.annotate(record, "skills") for record in normalized)
 
-    skills: List[Dict[str, Any]] = []
-    for idx, row in enumerate(external_rows):
-        if args.limit is not None and idx >= args.limit:
-            break
-        skills.append(build_skill_record(row))
+    try:
+        target_path, skills_count = write_skills_preview(records, checkpoint)
+    except (SnapshotError, CheckpointError) as exc:
+        print(json.dumps({"status": "ERROR", "message": str(exc)}))
+        return 1
+
+    # A --limit run only sees part of the snapshot, so it must not become
+    # the baseline for the next delta.
+    delta_summary = None
+    if args.limit is None:
+        delta_path = RAW_IMPORTS_DIR / "skills.import-delta.json"
+        delta = manifest.write_delta(delta_path, snapshot_paths[0], snapshot_paths[1:])
+        manifest.save()
+        delta_summary = {
+            "added": len(delta["added"]),
+            "changed": len(delta["changed"]),
+            "removed": len(delta["removed"]),
+            "path": str(delta_path),
+        }
+    if checkpoint is not None:
+        checkpoint.finish()
 
-    target_path = write_skills_preview(skills)
     print(
         json.dumps(
             {
                 "status": "OK",
                 "message": "Skills import preview generated.",
-                "skills_count": len(skills),
+                "skills_count": skills_count,
+                "id_collisions": collisions.renamed,
+                "reused_count": manifest.reused_count,
+                "normalized_count": manifest.normalized_count,
+                "delta": delta_summary,
+                "merge": merged.summary() if merged is not None else None,
+                "resumed_from_row": start or None,
                 "target_path": str(target_path),
                 "mode": "preview",
             },
@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+"""
+tools/import_stream.py
+
+Streaming JSON helpers shared by the import tools
+(import_skills_from_uesp.py, import_sets_from_uesp.py, import_cp_from_uesp.py).
+
+Full-catalog ESO-Hub / UESP snapshots carry tooltip bodies and per-rank text
+and can be hundreds of MB. Instead of json.load() on the whole file, the
+importers walk the top-level array they care about one row at a time:
+
+    {
+      "meta": {...},            <- skipped (or captured via `others`)
+      "skills": [ {row}, ... ]  <- yielded one row at a time
+    }
+
+Memory use is bounded by the largest single row, not the snapshot size.
+
+Snapshots may also be compressed and/or tabular; the format follows the
+file name:
+
+    skills.json       skills.json.gz       skills.json.zst
+    skills.csv        skills.csv.gz        skills.csv.zst
+    skills.tsv        ...
+
+Compressed files are decompressed on the fly (.zst needs the optional
+`zstandard` package). CSV/TSV snapshots have one row per record and a header
+row with the external field names; empty cells are null and typed columns
+(ints, floats, flags, "|"-separated lists, JSON cells for nested values) are
+converted by the converters the importer passes in, a batch of rows at a
+time.
+
+The matching PreviewWriter streams normalized records back out into
+raw-imports/*.import-preview.json, so an import of any size runs in flat
+memory and never leaves a half-written preview behind.
+"""
+
+import csv
+import gzip
+import io
+import itertools
+import json
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, TextIO, Tuple
+
+import atomic_io
+
+_WHITESPACE = " \t\n\r"
+_NUMBER_CHARS = "0123456789.eE+-"
+_DEFAULT_CHUNK = 1 << 16
+
+_CSV_BATCH_SIZE = 1000
+
+COMPRESSION_SUFFIXES = (".gz", ".zst")
+TABULAR_DELIMITERS = {".csv": ",", ".tsv": "\t"}
+
+# Column name -> converter for one non-empty CSV cell.
+CsvColumns = Dict[str, Callable[[str], Any]]
+
+
+class SnapshotError(Exception):
+    """
+    Raised when a snapshot cannot be read or does not have the expected shape.
+    """
+
+
+class _JsonStream:
+    """
+    Minimal pull parser over a text stream: decodes one JSON value at a time
+    with json.JSONDecoder.raw_decode, reading more input only when needed.
+    """
+
+    def __init__(self, fp: TextIO, chunk_size: int = _DEFAULT_CHUNK) -> None:
+        self._fp = fp
+        self._chunk_size = chunk_size
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self, size: int) -> bool:
+        if self._eof:
+            return False
+        chunk = self._fp.read(size)
+        if not chunk:
+            self._eof = True
+            return False
+        # Drop the consumed prefix so the buffer only holds unparsed text.
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """
+        Skip whitespace and return the next character ("" at end of input).
+        """
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill(self._chunk_size):
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise SnapshotError(f"Expected {char!r} in snapshot JSON, found {found or 'end of file'!r}")
+        self._pos += 1
+
+    def value(self) -> Any:
+        """
+        Decode the next complete JSON value.
+        """
+        self.peek()
+        read_size = self._chunk_size
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError as exc:
+                if self._fill(read_size):
+                    read_size *= 2
+                    continue
+                raise SnapshotError(f"Invalid snapshot JSON: {exc}") from exc
+            # A value that ends exactly at the buffer end may continue in the
+            # next chunk. A number cut inside its fraction or exponent ("12."
+            # or "1e") decodes as its prefix and stops before the cut, so read
+            # on while a number is followed by a character that could extend it.
+            if (
+                end == len(self._buf)
+                or isinstance(value, (int, float))
+                and not isinstance(value, bool)
+                and self._buf[end] in _NUMBER_CHARS
+            ) and self._fill(read_size):
+                read_size *= 2
+                continue
+            self._pos = end
+            return value
+
+
+def iter_json_array(
+    fp: TextIO,
+    key: str,
+    others: Optional[Dict[str, Any]] = None,
+    chunk_size: int = _DEFAULT_CHUNK,
+    seen_keys: Optional[List[str]] = None,
+) -> Iterator[Any]:
+    """
+    Yield the elements of the top-level `key` array of a JSON object, one
+    at a time.
+
+    Top-level values under other keys are skipped, or stored in `others`
+    when a dict is given (intended for small blocks such as "meta"). A
+    missing key yields nothing, matching payload.get(key, []); pass a list
+    as `seen_keys` to collect the top-level key names and tell the cases
+    apart.
+    """
+    stream = _JsonStream(fp, chunk_size)
+    stream.expect("{")
+
+    if stream.peek() == "}":
+        return
+
+    while True:
+        name = stream.value()
+        if not isinstance(name, str):
+            raise SnapshotError("Snapshot JSON object keys must be strings.")
+        stream.expect(":")
+        if seen_keys is not None:
+            seen_keys.append(name)
+
+        if name == key:
+            if stream.peek() != "[":
+                raise SnapshotError(f"Snapshot JSON '{key}' field is not a list.")
+            stream.expect("[")
+            if stream.peek() == "]":
+                stream.expect("]")
+            else:
+                while True:
+                    yield stream.value()
+                    if stream.peek() == ",":
+                        stream.expect(",")
+                        continue
+                    stream.expect("]")
+                    break
+        else:
+            skipped = stream.value()
+            if others is not None:
+                others[name] = skipped
+
+        if stream.peek() == ",":
+            stream.expect(",")
+            continue
+        stream.expect("}")
+        return
+
+
+# ---------- Tabular snapshots ----------
+
+
+def csv_int(cell: str) -> Any:
+    return int(cell)
+
+
+def csv_float(cell: str) -> Any:
+    return float(cell)
+
+
+def csv_bool(cell: str) -> Any:
+    value = cell.strip().lower()
+    if value in ("1", "true", "yes", "y"):
+        return True
+    if value in ("0", "false", "no", "n"):
+        return False
+    raise ValueError(f"not a boolean: {cell!r}")
+
+
+def csv_list(cell: str) -> Any:
+    return [item for item in (part.strip() for part in cell.split("|")) if item]
+
+
+def csv_json(cell: str) -> Any:
+    return json.loads(cell)
+
+
+def iter_csv_rows(
+    fp: TextIO,
+    delimiter: str = ",",
+    columns: Optional[CsvColumns] = None,
+    batch_size: int = _CSV_BATCH_SIZE,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield one dict per CSV/TSV data row, keyed by the header row.
+
+    Empty cells become None. Cells in `columns` are converted column by
+    column over batches of rows, so each converter runs in a tight loop.
+    """
+    reader = csv.DictReader(fp, delimiter=delimiter)
+    header = reader.fieldnames or []
+    typed = [(name, convert) for name, convert in (columns or {}).items() if name in header]
+
+    rows_before = 0
+    while True:
+        batch: List[Dict[str, Any]] = [
+            {name: (value if value != "" else None) for name, value in row.items() if name is not None}
+            for row in itertools.islice(reader, batch_size)
+        ]
+        if not batch:
+            return
+        for name, convert in typed:
+            for offset, row in enumerate(batch):
+                cell = row.get(name)
+                if cell is None:
+                    continue
+                try:
+                    row[name] = convert(cell)
+                except ValueError as exc:
+                    raise SnapshotError(
+                        f"Invalid value in column '{name}' on data row {rows_before + offset + 1}: {cell!r} ({exc})"
+                    ) from exc
+        rows_before += len(batch)
+        yield from batch
+
+
+# ---------- Snapshot files ----------
+
+
+def snapshot_format(snapshot_path: Path) -> str:
+    """
+    "json", "csv" or "tsv", from the file name without a compression suffix.
+    """
+    name = snapshot_path.name.lower()
+    for suffix in COMPRESSION_SUFFIXES:
+        if name.endswith(suffix):
+            name = name[: -len(suffix)]
+    for suffix in TABULAR_DELIMITERS:
+        if name.endswith(suffix):
+            return suffix[1:]
+    return "json"
+
+
+@contextmanager
+def open_snapshot(snapshot_path: Path) -> Iterator[TextIO]:
+    """
+    Open a snapshot as UTF-8 text, decompressing .gz / .zst on the fly.
+    """
+    name = snapshot_path.name.lower()
+    if name.endswith(".gz"):
+        with gzip.open(snapshot_path, "rt", encoding="utf-8", newline="") as f:
+            yield f
+    elif name.endswith(".zst"):
+        try:
+            import zstandard  # optional dependency
+        except ImportError as exc:
+            raise SnapshotError(
+                f"Reading {snapshot_path} needs the 'zstandard' package (pip install zstandard)."
+            ) from exc
+        with snapshot_path.open("rb") as raw:
+            reader = zstandard.ZstdDecompressor().stream_reader(raw)
+            with io.TextIOWrapper(reader, encoding="utf-8", newline="") as f:
+                try:
+                    yield f
+                except zstandard.ZstdError as exc:
+                    raise SnapshotError(f"Failed to decompress snapshot: {snapshot_path} ({exc})") from exc
+    else:
+        with snapshot_path.open("r", encoding="utf-8", newline="") as f:
+            yield f
+
+
+def iter_snapshot_rows(
+    snapshot_path: Path,
+    key: str,
+    others: Optional[Dict[str, Any]] = None,
+    columns: Optional[CsvColumns] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the object rows of a snapshot's top-level `key` array, or the
+    data rows of a CSV/TSV snapshot (typed with `columns`).
+
+    Non-object rows are skipped, as in the original json.load() based
+    loaders. Raises SnapshotError for missing or malformed files.
+    """
+    if not snapshot_path.exists():
+        raise SnapshotError(f"Snapshot path not found: {snapshot_path}")
+
+    fmt = snapshot_format(snapshot_path)
+    try:
+        with open_snapshot(snapshot_path) as f:
+            if fmt == "json":
+                rows = iter_json_array(f, key, others)
+            else:
+                rows = iter_csv_rows(f, TABULAR_DELIMITERS["." + fmt], columns)
+            for row in rows:
+                if isinstance(row, dict):
+                    yield row
+    except (OSError, UnicodeDecodeError, EOFError, csv.Error) as exc:
+        raise SnapshotError(f"Failed to read snapshot: {snapshot_path} ({exc})") from exc
+
+
+class PreviewWriter:
+    """
+    Incrementally write an import preview container:
+
+        {
+          "meta": {...},
+          "<key>": [
+            {record},
+            ...
+          ]
+        }
+
+    Records are streamed to a temporary file next to the target as they are
+    produced and the file is atomically renamed onto the target when the
+    `with` block exits cleanly. If the block raises (bad row, Ctrl-C, ...)
+    the temporary file is removed and any existing preview is left intact.
+
+    The layout is byte-identical to json.dump(container, f, indent=2,
+    ensure_ascii=False), so streamed previews diff cleanly against old ones.
+
+    For checkpointed imports (tools/import_checkpoint.py), keep_partial=True
+    leaves the temporary file in place when the block raises, sync() returns
+    a durable byte offset after the records written so far, and
+    partial=(tmp_path, offset, count) reopens such a file and continues after
+    its first `count` records.
+    """
+
+    def __init__(
+        self,
+        target_path: Path,
+        meta: Dict[str, Any],
+        key: str,
+        keep_partial: bool = False,
+        partial: Optional[Tuple[Path, int, int]] = None,
+    ) -> None:
+        self.target_path = target_path
+        self.meta = meta
+        self.key = key
+        self.keep_partial = keep_partial
+        self.partial = partial
+        self.count = 0
+        self._fp: Optional[TextIO] = None
+        self._tmp_path: Optional[Path] = None
+
+    @property
+    def tmp_path(self) -> Optional[Path]:
+        return self._tmp_path
+
+    def __enter__(self) -> "PreviewWriter":
+        if self.partial is not None:
+            tmp_path, offset, count = self.partial
+            if not tmp_path.exists() or tmp_path.stat().st_size < offset:
+                raise SnapshotError(f"Partial preview missing or shorter than its checkpoint: {tmp_path}")
+            os.truncate(tmp_path, offset)
+            self._tmp_path = tmp_path
+            self._fp = tmp_path.open("a", encoding="utf-8")
+            self.count = count
+            return self
+
+        self._fp, self._tmp_path = atomic_io.create_temp(self.target_path)
+        meta_text = json.dumps(self.meta, indent=2, ensure_ascii=False).replace("\n", "\n  ")
+        self._fp.write(f'{{\n  "meta": {meta_text},\n  {json.dumps(self.key)}: [')
+        return self
+
+    def sync(self) -> int:
+        """
+        Flush and fsync what has been written; return the file size in bytes.
+        """
+        assert self._fp is not None, "PreviewWriter used outside a with block"
+        self._fp.flush()
+        os.fsync(self._fp.fileno())
+        return os.fstat(self._fp.fileno()).st_size
+
+    def write(self, record: Dict[str, Any]) -> None:
+        assert self._fp is not None, "PreviewWriter used outside a with block"
+        text = json.dumps(record, indent=2, ensure_ascii=False).replace("\n", "\n    ")
+        self._fp.write(("\n    " if self.count == 0 else ",\n    ") + text)
+        self.count += 1
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        assert self._fp is not None and self._tmp_path is not None
+        if exc_type is not None:
+            self._fp.close()
+            if not self.keep_partial:
+                self._tmp_path.unlink(missing_ok=True)
+            return
+
+        try:
+            self._fp.write("]\n}" if self.count == 0 else "\n  ]\n}")
+            self._fp.flush()
+            os.fsync(self._fp.fileno())
+        finally:
+            self._fp.close()
+        atomic_io.replace(self._tmp_path, self.target_path)
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+tools/oracle_check.py
+
+Differential oracle harness: check any evaluation engine against the frozen
+reference implementation in tools/reference_engine.py.
+
+An engine is any callable engine(build, data) that claims to return the
+same result as one of the reference functions:
+
+- kind "pillars": reference_engine.compute_pillars(build, data)
+- kind "effects": reference_engine.aggregate_effects(build, data)
+
+Engines are named as "module:function" (modules resolved from tools/), e.g.
+"compute_pillars:compute_pillars" or "aggregate_effects:aggregate_effects".
+
+Two modes:
+
+- Batch check (CLI): run the engine and the reference on real builds from
+  builds/ plus generated builds (tools/synthetic_data.py) and report the
+  first divergent field per build, e.g.
+
+    pillars.resist.active.computed_resist_shown: expected 43000.0, got 42999.0
+
+- Sampling (library): wrap an engine in OracleSampler for production batch
+  jobs. Only a random fraction of calls (default 1 in 1000) is re-evaluated
+  with the reference, so the overhead on unsampled calls is one random draw.
+
+Usage:
+
+    python tools/oracle_check.py --engine compute_pillars:compute_pillars --kind pillars
+    python tools/oracle_check.py --engine aggregate_effects:aggregate_effects --kind effects \\
+        --synthetic 500 --scale 10
+"""
+
+import argparse
+import importlib
+import json
+import math
+import random
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import id_registry
+import reference_engine
+import synthetic_data
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DATA_DIR = REPO_ROOT / "data"
+BUILDS_DIR = REPO_ROOT / "builds"
+
+REFERENCES: Dict[str, Callable[[Dict[str, Any], Dict[str, Any]], Any]] = {
+    "pillars": reference_engine.compute_pillars,
+    "effects": reference_engine.aggregate_effects,
+}
+
+Engine = Callable[[Dict[str, Any], Dict[str, Any]], Any]
+
+
+# ---------- Loading ----------
+
+
+def load_json(path: Path) -> Any:
+    with path.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_data(data_dir: Path = DATA_DIR) -> Dict[str, Any]:
+    return {
+        "skills": load_json(data_dir / "skills.json"),
+        "effects": load_json(data_dir / "effects.json"),
+        "sets": load_json(data_dir / "sets.json"),
+        "cp_stars": load_json(data_dir / "cp-stars.json"),
+        "id_aliases": id_registry.load_registry_file(str(data_dir)),
+    }
+
+
+def load_engine(spec: str) -> Engine:
+    """
+    Resolve "module:function" into a callable.
+    """
+    module_name, _, func_name = spec.partition(":")
+    if not module_name or not func_name:
+        raise ValueError(f"Engine must be given as 'module:function', got {spec!r}")
+    module = importlib.import_module(module_name)
+    return getattr(module, func_name)
+
+
+def iter_build_files(builds_dir: Path = BUILDS_DIR) -> List[Path]:
+    """
+    Build definitions under builds/ (derived -effects/-pillars files are skipped).
+    """
+    paths: List[Path] = []
+    for path in sorted(builds_dir.glob("*.json")):
+        build = load_json(path)
+        if isinstance(build, dict) and "bars" in build:
+            paths.append(path)
+    return paths
+
+
+# ---------- Comparison ----------
+
+
+def _values_equal(expected: Any, actual: Any, tolerance: float) -> bool:
+    if isinstance(expected, bool) or isinstance(actual, bool):
+        return expected is actual
+    if isinstance(expected, (int, float)) and isinstance(actual, (int, float)):
+        if expected == actual:
+            return True
+        return math.isclose(expected, actual, rel_tol=tolerance, abs_tol=tolerance)
+    return expected == actual
+
+
+def first_divergence(
+    expected: Any,
+    actual: Any,
+    path: str = "",
+    tolerance: float = 1e-9,
+) -> Optional[Dict[str, Any]]:
+    """
+    Walk two JSON-like values in a stable order and return the first
+    difference as { "path", "expected", "actual" }, or None if equal.
+
+    Dict keys are visited in sorted order; lists element by element.
+    """
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        for key in sorted(set(expected) | set(actual), key=str):
+            child = f"{path}.{key}" if path else str(key)
+            if key not in actual:
+                return {"path": child, "expected": expected[key], "actual": "<missing>"}
+            if key not in expected:
+                return {"path": child, "expected": "<missing>", "actual": actual[key]}
+            diff = first_divergence(expected[key], actual[key], child, tolerance)
+            if diff is not None:
+                return diff
+        return None
+
+    if isinstance(expected, list) and isinstance(actual, list):
+        for idx, (exp_item, act_item) in enumerate(zip(expected, actual)):
+            diff = first_divergence(exp_item, act_item, f"{path}[{idx}]", tolerance)
+            if diff is not None:
+                return diff
+        if len(expected) != len(actual):
+            return {
+                "path": f"{path}.length" if path else "length",
+                "expected": len(expected),
+                "actual": len(actual),
+            }
+        return None
+
+    if type(expected) is not type(actual) and not (
+        isinstance(expected, (int, float))
+        and isinstance(actual, (int, float))
+        and not isinstance(expected, bool)
+        and not isinstance(actual, bool)
+    ):
+        return {"path": path, "expected": expected, "actual": actual}
+
+    if not _values_equal(expected, actual, tolerance):
+        return {"path": path, "expected": expected, "actual": actual}
+    return None
+
+
+def check_build(
+    engine: Engine,
+    kind: str,
+    build: Dict[str, Any],
+    data: Dict[str, Any],
+    tolerance: float = 1e-9,
+) -> Optional[Dict[str, Any]]:
+    """
+    Run engine and reference on one build; return the first divergence or None.
+
+    Engine exceptions are reported as divergences rather than raised.
+    """
+    expected = REFERENCES[kind](build, data)
+    try:
+        actual = engine(build, data)
+    except Exception as exc:  # noqa: BLE001
+        return {"path": "<engine>", "expected": "<result>", "actual": f"raised {exc!r}"}
+    return first_divergence(expected, actual, tolerance=tolerance)
+
+
+# ---------- Sampling mode ----------
+
+
+class OracleSampler:
+    """
+    Wrap an engine so that a random fraction of calls is verified against
+    the reference oracle.
+
+        checked = OracleSampler(fast_compute_pillars, kind="pillars", rate=0.001)
+        for build in builds:
+            result = checked(build, data)   # same result as the engine
+        print(checked.summary())
+
+    Divergences, including a reference that raises, are recorded (up to
+    max_recorded) and passed to on_divergence if given; the engine's result
+    is always returned unchanged.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        kind: str = "pillars",
+        rate: float = 0.001,
+        seed: Optional[int] = None,
+        tolerance: float = 1e-9,
+        on_divergence: Optional[Callable[[Dict[str, Any]], None]] = None,
+        max_recorded: int = 100,
+    ) -> None:
+        if kind not in REFERENCES:
+            raise ValueError(f"Unknown oracle kind {kind!r}; expected one of {sorted(REFERENCES)}")
+        self.engine = engine
+        self.reference = REFERENCES[kind]
+        self.kind = kind
+        self.rate = rate
+        self.tolerance = tolerance
+        self.on_divergence = on_divergence
+        self.max_recorded = max_recorded
+        self._random = random.Random(seed).random
+        self.calls = 0
+        self.checked = 0
+        self.divergence_count = 0
+        self.divergences: List[Dict[str, Any]] = []
+
+    def __call__(self, build: Dict[str, Any], data: Dict[str, Any]) -> Any:
+        self.calls += 1
+        result = self.engine(build, data)
+        if self._random() < self.rate:
+            self.checked += 1
+            # The sampled check must never break the wrapped call: a raising
+            # reference (or a build that is not a dict) is itself a divergence.
+            try:
+                diff = first_divergence(self.reference(build, data), result, tolerance=self.tolerance)
+            except Exception as exc:  # noqa: BLE001
+                diff = {"path": "<reference>", "expected": "<result>", "actual": f"raised {exc!r}"}
+            if diff is not None:
+                diff = dict(diff, build_id=build.get("id") if isinstance(build, dict) else None)
+                self.divergence_count += 1
+                if len(self.divergences) < self.max_recorded:
+                    self.divergences.append(diff)
+                if self.on_divergence is not None:
+                    self.on_divergence(diff)
+        return result
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "rate": self.rate,
+            "calls": self.calls,
+            "checked": self.checked,
+            "divergence_count": self.divergence_count,
+            "divergences": self.divergences,
+        }
+
+
+# ---------- CLI ----------
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Check an evaluation engine against the reference oracle."
+    )
+    parser.add_argument(
+        "--engine",
+        type=str,
+        default="compute_pillars:compute_pillars",
+        help="Engine as module:function (default: compute_pillars:compute_pillars).",
+    )
+    parser.add_argument(
+        "--kind",
+        choices=sorted(REFERENCES),
+        default="pillars",
+        help="Which reference the engine is compared with.",
+    )
+    parser.add_argument(
+        "build_paths",
+        nargs="*",
+        help="Real build JSON files (default: every build definition in builds/).",
+    )
+    parser.add_argument("--synthetic", type=int, default=100, help="Generated builds to check.")
+    parser.add_argument("--scale", type=int, default=1, help="Synthetic data-center scale.")
+    parser.add_argument("--seed", type=int, default=0, help="Synthetic generator seed.")
+    parser.add_argument("--tolerance", type=float, default=1e-9, help="Relative/absolute float tolerance.")
+    args = parser.parse_args()
+
+    engine = load_engine(args.engine)
+    divergences: List[Dict[str, Any]] = []
+    checked = 0
+
+    real_data = load_data()
+    build_paths = [Path(p) for p in args.build_paths] or iter_build_files()
+    for path in build_paths:
+        build = load_json(path)
+        checked += 1
+        diff = check_build(engine, args.kind, build, real_data, args.tolerance)
+        if diff is not None:
+            divergences.append(dict(diff, build=str(path), build_id=build.get("id")))
+
+    if args.synthetic > 0:
+        synth_data = synthetic_data.generate_data_center(args.scale, args.seed)
+        for idx in range(args.synthetic):
+            build = synthetic_data.generate_build(synth_data, args.seed, idx)
+            checked += 1
+            diff = check_build(engine, args.kind, build, synth_data, args.tolerance)
+            if diff is not None:
+                divergences.append(dict(diff, build=f"synthetic[{idx}]", build_id=build.get("id")))
+
+    status = "OK" if not divergences else "ERROR"
+    print(
+        json.dumps(
+            {
+                "status": status,
+                "engine": args.engine,
+                "kind": args.kind,
+                "checked": checked,
+                "divergence_count": len(divergences),
+                "divergences": divergences,
+            },
+            indent=2,
+            default=str,
+        )
+    )
+    return 0 if status == "OK" else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
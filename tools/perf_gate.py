@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+tools/perf_gate.py
+
+Performance regression gate for the ESO Build Engine tools.
+
+Guards the hot paths against "harmless" refactors that quietly make them
+slower or hungrier:
+
+- compute_pillars        (builds/s)
+- aggregate_effects      (builds/s)
+- validate_data_integrity (records/s)
+
+Two commands:
+
+- record: measure each benchmark `--samples` times on a synthetic data
+  center (tools/synthetic_data.py) and store the results as a versioned
+  JSON baseline under perf-baselines/<label>.json.
+
+- check: re-run the same measurements with the baseline's configuration
+  and compare. A benchmark regresses when
+    - its median throughput dropped by more than --threshold AND a
+      one-sided Mann-Whitney U test says the drop is significant
+      (p < --alpha), or
+    - its peak traced memory grew by more than --memory-threshold.
+  Prints a readable report and exits 1 on any regression.
+
+Usage:
+
+    python tools/perf_gate.py record --label main
+    python tools/perf_gate.py check --label main
+    python tools/perf_gate.py check --baseline perf-baselines/main.json --threshold 0.15 --json
+"""
+
+import argparse
+import datetime
+import json
+import math
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+import aggregate_effects
+import compute_pillars
+import synthetic_data
+import validate_data_integrity
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+BASELINES_DIR = REPO_ROOT / "perf-baselines"
+
+BASELINE_SCHEMA_VERSION = 1
+
+GATED_BENCHMARKS = ["compute_pillars", "aggregate_effects", "validate_data_integrity"]
+
+DEFAULT_CONFIG = {
+    "scale": 100,
+    "seed": 0,
+    "builds": 20,
+    "samples": 10,
+}
+
+
+# ---------- Statistics ----------
+
+
+def mann_whitney_u_less(sample: List[float], baseline: List[float]) -> float:
+    """
+    One-sided Mann-Whitney U test: p-value for "sample tends to be smaller
+    than baseline", using the normal approximation with tie correction.
+    """
+    n1 = len(sample)
+    n2 = len(baseline)
+    if n1 == 0 or n2 == 0:
+        return 1.0
+
+    combined = sorted(
+        [(value, 0) for value in sample] + [(value, 1) for value in baseline],
+        key=lambda pair: pair[0],
+    )
+
+    # Average ranks for ties.
+    ranks = [0.0] * len(combined)
+    tie_term = 0.0
+    i = 0
+    while i < len(combined):
+        j = i
+        while j + 1 < len(combined) and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        avg_rank = (i + j) / 2.0 + 1.0
+        for k in range(i, j + 1):
+            ranks[k] = avg_rank
+        tied = j - i + 1
+        tie_term += tied ** 3 - tied
+        i = j + 1
+
+    rank_sum = sum(rank for rank, (_, group) in zip(ranks, combined) if group == 0)
+    u1 = rank_sum - n1 * (n1 + 1) / 2.0
+
+    n = n1 + n2
+    mean_u = n1 * n2 / 2.0
+    var_u = n1 * n2 / 12.0 * ((n + 1) - tie_term / (n * (n - 1)))
+    if var_u <= 0:
+        return 1.0
+
+    # Continuity correction towards the mean.
+    z = (u1 - mean_u + 0.5) / math.sqrt(var_u)
+    return 0.5 * math.erfc(-z / math.sqrt(2.0))
+
+
+# ---------- Measurement ----------
+
+
+def build_workloads(fixture_root: Path, config: Dict[str, Any]) -> Dict[str, Tuple[Callable[[], Any], int]]:
+    """
+    Return { benchmark name: (callable, items per call) } on a synthetic fixture.
+    """
+    data = synthetic_data.generate_data_center(config["scale"], config["seed"])
+    data_dir = synthetic_data.write_data_center(data, fixture_root)
+    builds = synthetic_data.generate_builds(data, config["builds"], config["seed"])
+    record_count = (
+        len(data["skills"]["skills"])
+        + len(data["effects"]["effects"])
+        + len(data["sets"]["sets"])
+        + len(data["cp_stars"]["cp_stars"])
+    )
+
+    def run_pillars() -> None:
+        for build in builds:
+            compute_pillars.compute_pillars(build, data)
+
+    def run_aggregate() -> None:
+        for build in builds:
+            aggregate_effects.aggregate_effects(build, data)
+
+    def run_integrity() -> None:
+        validate_data_integrity.validate_data_integrity(data_dir)
+
+    return {
+        "compute_pillars": (run_pillars, len(builds)),
+        "aggregate_effects": (run_aggregate, len(builds)),
+        "validate_data_integrity": (run_integrity, record_count),
+    }
+
+
+def measure(config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Measure throughput samples and peak memory for every gated benchmark.
+    """
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory(prefix="eso-perf-gate-") as tmp:
+        workloads = build_workloads(Path(tmp), config)
+        for name in GATED_BENCHMARKS:
+            fn, items = workloads[name]
+
+            # Warm-up run so imports and caches do not skew the first sample.
+            fn()
+
+            throughputs: List[float] = []
+            for _ in range(config["samples"]):
+                start = time.perf_counter()
+                fn()
+                elapsed = time.perf_counter() - start
+                throughputs.append(items / elapsed if elapsed > 0 else float("inf"))
+
+            # Memory is traced in a separate run: tracemalloc distorts timings.
+            tracemalloc.start()
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            results[name] = {
+                "items": items,
+                "throughput_samples": throughputs,
+                "median_throughput": statistics.median(throughputs),
+                "peak_memory_bytes": peak,
+            }
+    return results
+
+
+# ---------- Baselines ----------
+
+
+def git_revision() -> Any:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def baseline_path(label: str) -> Path:
+    return BASELINES_DIR / f"{label}.json"
+
+
+def write_baseline(path: Path, config: Dict[str, Any], results: Dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "schema_version": BASELINE_SCHEMA_VERSION,
+        "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": config,
+        "benchmarks": results,
+    }
+    with path.open("w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+        f.write("\n")
+
+
+def load_baseline(path: Path) -> Dict[str, Any]:
+    with path.open("r", encoding="utf-8") as f:
+        payload = json.load(f)
+    version = payload.get("schema_version")
+    if version != BASELINE_SCHEMA_VERSION:
+        raise ValueError(
+            f"Baseline {path} has schema_version {version!r}, "
+            f"expected {BASELINE_SCHEMA_VERSION}; re-record it."
+        )
+    return payload
+
+
+# ---------- Comparison ----------
+
+
+def compare(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold: float,
+    memory_threshold: float,
+    alpha: float,
+) -> List[Dict[str, Any]]:
+    rows: List[Dict[str, Any]] = []
+    for name in GATED_BENCHMARKS:
+        base = baseline["benchmarks"].get(name)
+        cur = current.get(name)
+        if base is None or cur is None:
+            rows.append({"benchmark": name, "status": "MISSING", "reasons": ["not in baseline"]})
+            continue
+
+        throughput_ratio = cur["median_throughput"] / base["median_throughput"]
+        p_value = mann_whitney_u_less(cur["throughput_samples"], base["throughput_samples"])
+        memory_ratio = (
+            cur["peak_memory_bytes"] / base["peak_memory_bytes"]
+            if base["peak_memory_bytes"]
+            else 1.0
+        )
+
+        reasons: List[str] = []
+        if throughput_ratio < 1.0 - threshold and p_value < alpha:
+            reasons.append(
+                f"throughput {throughput_ratio:.2f}x baseline "
+                f"(limit {1.0 - threshold:.2f}x, p={p_value:.4f})"
+            )
+        if memory_ratio > 1.0 + memory_threshold:
+            reasons.append(
+                f"peak memory {memory_ratio:.2f}x baseline (limit {1.0 + memory_threshold:.2f}x)"
+            )
+
+        rows.append(
+            {
+                "benchmark": name,
+                "status": "REGRESSION" if reasons else "OK",
+                "baseline_median_throughput": base["median_throughput"],
+                "current_median_throughput": cur["median_throughput"],
+                "throughput_ratio": throughput_ratio,
+                "p_value": p_value,
+                "baseline_peak_memory_bytes": base["peak_memory_bytes"],
+                "current_peak_memory_bytes": cur["peak_memory_bytes"],
+                "memory_ratio": memory_ratio,
+                "reasons": reasons,
+            }
+        )
+    return rows
+
+
+def format_report(rows: List[Dict[str, Any]], baseline_file: Path) -> str:
+    lines = [f"Performance gate vs {baseline_file}", ""]
+    header = f"{'benchmark':<26} {'throughput':>12} {'p-value':>9} {'memory':>8}  status"
+    lines.append(header)
+    lines.append("-" * len(header))
+    for row in rows:
+        if row["status"] == "MISSING":
+            lines.append(f"{row['benchmark']:<26} {'-':>12} {'-':>9} {'-':>8}  MISSING")
+            continue
+        lines.append(
+            f"{row['benchmark']:<26} "
+            f"{row['throughput_ratio']:>11.2f}x "
+            f"{row['p_value']:>9.4f} "
+            f"{row['memory_ratio']:>7.2f}x  "
+            f"{row['status']}"
+        )
+        for reason in row["reasons"]:
+            lines.append(f"    - {reason}")
+    failed = [r for r in rows if r["status"] != "OK"]
+    lines.append("")
+    lines.append("FAIL" if failed else "PASS")
+    return "\n".join(lines)
+
+
+# ---------- CLI ----------
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Record performance baselines or gate a run against one."
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="Measure and store a baseline.")
+    rec.add_argument("--label", type=str, default="baseline", help="Baseline name under perf-baselines/.")
+    rec.add_argument("--scale", type=int, default=DEFAULT_CONFIG["scale"])
+    rec.add_argument("--seed", type=int, default=DEFAULT_CONFIG["seed"])
+    rec.add_argument("--builds", type=int, default=DEFAULT_CONFIG["builds"])
+    rec.add_argument("--samples", type=int, default=DEFAULT_CONFIG["samples"])
+
+    chk = sub.add_parser("check", help="Compare a new run against a stored baseline.")
+    chk.add_argument("--label", type=str, default="baseline", help="Baseline name under perf-baselines/.")
+    chk.add_argument("--baseline", type=str, default=None, help="Explicit baseline path (overrides --label).")
+    chk.add_argument("--threshold", type=float, default=0.10, help="Allowed median throughput drop (fraction).")
+    chk.add_argument("--memory-threshold", type=float, default=0.10, help="Allowed peak memory growth (fraction).")
+    chk.add_argument("--alpha", type=float, default=0.05, help="Significance level for the Mann-Whitney U test.")
+    chk.add_argument("--json", action="store_true", help="Print the comparison as JSON instead of text.")
+
+    args = parser.parse_args()
+
+    if args.command == "record":
+        config = {
+            "scale": args.scale,
+            "seed": args.seed,
+            "builds": args.builds,
+            "samples": args.samples,
+        }
+        results = measure(config)
+        path = baseline_path(args.label)
+        write_baseline(path, config, results)
+        print(
+            json.dumps(
+                {
+                    "status": "OK",
+                    "message": "Performance baseline recorded.",
+                    "baseline_path": str(path),
+                    "median_throughput": {
+                        name: r["median_throughput"] for name, r in results.items()
+                    },
+                },
+                indent=2,
+            )
+        )
+        return 0
+
+    path = Path(args.baseline) if args.baseline else baseline_path(args.label)
+    if not path.is_file():
+        print(f"Baseline not found: {path} (run 'record' first)", file=sys.stderr)
+        return 1
+    try:
+        baseline = load_baseline(path)
+    except ValueError as exc:
+        print(str(exc), file=sys.stderr)
+        return 1
+
+    # Always re-measure with the baseline's own configuration.
+    current = measure(baseline["config"])
+    rows = compare(baseline, current, args.threshold, args.memory_threshold, args.alpha)
+    failed = any(row["status"] != "OK" for row in rows)
+
+    if args.json:
+        print(json.dumps({"status": "ERROR" if failed else "OK", "baseline": str(path), "results": rows}, indent=2))
+    else:
+        print(format_report(rows, path))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
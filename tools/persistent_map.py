@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+tools/persistent_map.py
+
+Immutable hash map with structural sharing (a hash array mapped trie), used
+by tools/data_versions.py to keep many versions of the data center in
+memory at the cost of their differences.
+
+    base = PersistentMap.from_items((rec["id"], rec) for rec in skills)
+    patched = base.set("skill.deep_fissure", new_record)   # base unchanged
+    patched = patched.delete("skill.old")
+
+set() and delete() copy only the path from the root to the changed entry
+(at most 13 nodes of up to 32 slots, in practice 3-4 for a catalog of tens
+of thousands of records); every other node is shared with the original map.
+PersistentMap is a read-only collections.abc.Mapping, so it can stand in
+for a dict index (get, [], in, len, iteration).
+
+Keys are placed by hash(), which differs between interpreter runs for
+strings; pickling therefore stores the items and rebuilds the trie, so maps
+can be sent to worker processes.
+"""
+
+from collections.abc import Mapping
+from typing import Any, Iterable, Iterator, Optional, Tuple
+
+_BITS = 5
+_MASK = (1 << _BITS) - 1
+_HASH_BITS = 64
+_HASH_MASK = (1 << _HASH_BITS) - 1
+
+# A leaf is a (key, hash, value) tuple; nodes are _Bitmap / _Collision.
+Leaf = Tuple[Any, int, Any]
+
+
+class _Bitmap:
+    """
+    Trie node: bit i of `bitmap` is set when hash fragment i has an entry;
+    `array` holds the entries (leaves or child nodes) in bit order.
+    """
+
+    __slots__ = ("bitmap", "array")
+
+    def __init__(self, bitmap: int, array: Tuple[Any, ...]) -> None:
+        self.bitmap = bitmap
+        self.array = array
+
+
+class _Collision:
+    """
+    Leaves whose keys have the same full hash.
+    """
+
+    __slots__ = ("hash", "array")
+
+    def __init__(self, hash_: int, array: Tuple[Leaf, ...]) -> None:
+        self.hash = hash_
+        self.array = array
+
+
+_EMPTY_NODE = _Bitmap(0, ())
+
+
+def _hash(key: Any) -> int:
+    return hash(key) & _HASH_MASK
+
+
+def _position(bitmap: int, bit: int) -> int:
+    return (bitmap & (bit - 1)).bit_count()
+
+
+def _pair(shift: int, leaf1: Leaf, leaf2: Leaf) -> Any:
+    """
+    Smallest subtree holding two leaves with different keys.
+    """
+    if leaf1[1] == leaf2[1] or shift >= _HASH_BITS:
+        return _Collision(leaf1[1], (leaf1, leaf2))
+    frag1 = (leaf1[1] >> shift) & _MASK
+    frag2 = (leaf2[1] >> shift) & _MASK
+    if frag1 == frag2:
+        return _Bitmap(1 << frag1, (_pair(shift + _BITS, leaf1, leaf2),))
+    if frag1 < frag2:
+        return _Bitmap((1 << frag1) | (1 << frag2), (leaf1, leaf2))
+    return _Bitmap((1 << frag1) | (1 << frag2), (leaf2, leaf1))
+
+
+def _get(node: Any, shift: int, h: int, key: Any, default: Any) -> Any:
+    # The hot path of every lookup: type checks and bit counting inlined.
+    while True:
+        if type(node) is _Collision:
+            for leaf in node.array:
+                if leaf[0] == key:
+                    return leaf[2]
+            return default
+        bitmap = node.bitmap
+        bit = 1 << ((h >> shift) & _MASK)
+        if not bitmap & bit:
+            return default
+        entry = node.array[(bitmap & (bit - 1)).bit_count()]
+        if type(entry) is tuple:
+            return entry[2] if entry[1] == h and entry[0] == key else default
+        node = entry
+        shift += _BITS
+
+
+def _assoc(node: Any, shift: int, leaf: Leaf) -> Tuple[Any, bool]:
+    """
+    (node with the leaf set, whether the key is new). Returns `node` itself
+    when the key already maps to the very same value.
+    """
+    key, h, value = leaf
+    if isinstance(node, _Collision):
+        if h != node.hash:
+            # Different hash: push the collision one level down beside it.
+            bit = 1 << ((node.hash >> shift) & _MASK)
+            return _assoc(_Bitmap(bit, (node,)), shift, leaf)
+        for idx, old in enumerate(node.array):
+            if old[0] == key:
+                if old[2] is value:
+                    return node, False
+                return _Collision(h, node.array[:idx] + (leaf,) + node.array[idx + 1 :]), False
+        return _Collision(h, node.array + (leaf,)), True
+
+    bit = 1 << ((h >> shift) & _MASK)
+    idx = _position(node.bitmap, bit)
+    array = node.array
+    if not node.bitmap & bit:
+        return _Bitmap(node.bitmap | bit, array[:idx] + (leaf,) + array[idx:]), True
+
+    entry = array[idx]
+    if isinstance(entry, tuple):
+        if entry[1] == h and entry[0] == key:
+            if entry[2] is value:
+                return node, False
+            child, added = leaf, False
+        else:
+            child, added = _pair(shift + _BITS, entry, leaf), True
+    else:
+        child, added = _assoc(entry, shift + _BITS, leaf)
+        if child is entry:
+            return node, False
+    return _Bitmap(node.bitmap, array[:idx] + (child,) + array[idx + 1 :]), added
+
+
+def _dissoc(node: Any, shift: int, h: int, key: Any) -> Optional[Any]:
+    """
+    Node without `key` (None when it becomes empty); `node` itself when the
+    key is absent. A node left with a single leaf is replaced by the leaf.
+    """
+    if isinstance(node, _Collision):
+        array = tuple(leaf for leaf in node.array if leaf[0] != key)
+        if len(array) == len(node.array):
+            return node
+        return array[0] if len(array) == 1 else _Collision(node.hash, array)
+
+    bit = 1 << ((h >> shift) & _MASK)
+    if not node.bitmap & bit:
+        return node
+    idx = _position(node.bitmap, bit)
+    entry = node.array[idx]
+    if isinstance(entry, tuple):
+        if entry[1] != h or entry[0] != key:
+            return node
+        child = None
+    else:
+        child = _dissoc(entry, shift + _BITS, h, key)
+        if child is entry:
+            return node
+
+    if child is None:
+        array = node.array[:idx] + node.array[idx + 1 :]
+        if not array:
+            return None
+        if len(array) == 1 and isinstance(array[0], tuple) and shift > 0:
+            return array[0]
+        return _Bitmap(node.bitmap & ~bit, array)
+    if isinstance(child, tuple) and len(node.array) == 1 and shift > 0:
+        return child
+    return _Bitmap(node.bitmap, node.array[:idx] + (child,) + node.array[idx + 1 :])
+
+
+def _leaves(node: Any) -> Iterator[Leaf]:
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        for entry in reversed(node.array):
+            if isinstance(entry, tuple):
+                yield entry
+            else:
+                stack.append(entry)
+
+
+def iter_nodes(node: Any) -> Iterator[Any]:
+    """
+    Every trie node under `node` (for sharing statistics).
+    """
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(entry for entry in node.array if not isinstance(entry, tuple))
+
+
+class PersistentMap(Mapping):
+    """
+    Immutable mapping; set() / delete() / update() return new maps that
+    share all unchanged nodes with this one.
+    """
+
+    __slots__ = ("_root", "_count")
+
+    def __init__(self) -> None:
+        self._root: Any = _EMPTY_NODE
+        self._count = 0
+
+    @classmethod
+    def _make(cls, root: Any, count: int) -> "PersistentMap":
+        if isinstance(root, tuple):
+            # A lone leaf under the root: keep the root a node.
+            root = _Bitmap(1 << (root[1] & _MASK), (root,))
+        result = cls.__new__(cls)
+        result._root = root
+        result._count = count
+        return result
+
+    @classmethod
+    def from_items(cls, items: Iterable[Tuple[Any, Any]]) -> "PersistentMap":
+        return cls().update(items)
+
+    # ----- reading -----
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        return _get(self._root, 0, hash(key) & _HASH_MASK, key, default)
+
+    def __getitem__(self, key: Any) -> Any:
+        value = _get(self._root, 0, _hash(key), key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: Any) -> bool:
+        return _get(self._root, 0, _hash(key), key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[Any]:
+        for leaf in _leaves(self._root):
+            yield leaf[0]
+
+    def items(self) -> Iterator[Tuple[Any, Any]]:  # type: ignore[override]
+        for leaf in _leaves(self._root):
+            yield leaf[0], leaf[2]
+
+    def values(self) -> Iterator[Any]:  # type: ignore[override]
+        for leaf in _leaves(self._root):
+            yield leaf[2]
+
+    @property
+    def root(self) -> Any:
+        return self._root
+
+    # ----- updating -----
+
+    def set(self, key: Any, value: Any) -> "PersistentMap":
+        root, added = _assoc(self._root, 0, (key, _hash(key), value))
+        if root is self._root:
+            return self
+        return self._make(root, self._count + added)
+
+    def delete(self, key: Any) -> "PersistentMap":
+        """
+        Map without `key`; `self` when the key is absent.
+        """
+        root = _dissoc(self._root, 0, _hash(key), key)
+        if root is self._root:
+            return self
+        if root is None:
+            return PersistentMap()
+        return self._make(root, self._count - 1)
+
+    def update(self, items: Iterable[Tuple[Any, Any]]) -> "PersistentMap":
+        result = self
+        for key, value in items:
+            result = result.set(key, value)
+        return result
+
+    # ----- misc -----
+
+    def __reduce__(self) -> Any:
+        return (PersistentMap.from_items, (list(self.items()),))
+
+    def __repr__(self) -> str:
+        return f"PersistentMap({dict(self.items())!r})"
+
+
+_MISSING = object()
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+tools/pillar_diff.py
+
+Pillar consequences of a data change: which builds' pillar results differ
+between two data-center versions, and how.
+
+A version is a git revision (--base / --target), a data directory
+(--base-dir / --target-dir) or, for the target, a data directory with import
+previews merged in exactly as tools/promote_preview.py would promote them
+(--target-previews). The default compares data/ at git HEAD with the
+working tree data/.
+
+Only the builds tools/impact.py lists as affected are evaluated, under both
+versions, in parallel worker processes (--jobs); every other build has
+identical compute_pillars() results in both versions. Per build the report
+gives:
+
+- deltas: numeric pillar fields that changed, e.g.
+  "resist.active.computed_resist_shown": {"before": 33100.0, "after": 35000.0, "delta": 1900.0}
+- flips: meets_target values that changed, e.g.
+  {"pillar": "resist.active", "before": false, "after": true}
+- changed_fields: other fields that changed (source lists, missing skills, ...)
+
+Usage:
+
+    python tools/pillar_diff.py
+    python tools/pillar_diff.py --base HEAD~3 --jobs 4
+    python tools/pillar_diff.py --base v1.2 --target v1.3
+    python tools/pillar_diff.py --base-dir data --target-previews skills sets
+"""
+
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import compute_pillars
+import impact
+import promote_preview
+from import_stream import SnapshotError, iter_snapshot_rows
+
+REPO_ROOT = impact.REPO_ROOT
+DATA_DIR = impact.DATA_DIR
+BUILDS_DIR = impact.BUILDS_DIR
+
+# promote_preview kind -> data key.
+PREVIEW_DATA_KEYS: Dict[str, str] = {
+    "skills": "skills",
+    "sets": "sets",
+    "cp-stars": "cp_stars",
+}
+
+
+# ---------- Versions ----------
+
+
+def apply_preview(
+    data: Dict[str, Any],
+    kind: str,
+    preview_path: Optional[Path] = None,
+    data_dir: Path = DATA_DIR,
+) -> Dict[str, Any]:
+    """
+    `data` with one import preview merged in as promote_preview.promote()
+    would write it (without its validation). Legacy preview ids are
+    canonicalized with the aliases in `data_dir`. Raises SnapshotError for
+    an unreadable preview.
+    """
+    spec = promote_preview.KINDS[kind]
+    preview_path = preview_path or promote_preview.RAW_IMPORTS_DIR / spec["preview_file"]
+    preview = [
+        promote_preview.strip_preview_fields(rec)
+        for rec in iter_snapshot_rows(preview_path, spec["key"])
+        if isinstance(rec.get("id"), str)
+    ]
+    promote_preview.canonicalize_ids(kind, preview, data_dir)
+
+    data_key = PREVIEW_DATA_KEYS[kind]
+    container = data[data_key]
+    canonical = promote_preview.unwrap(container, spec["key"])
+    merged: List[Any] = list(canonical)
+    added: List[Any] = []
+    for c_idx, p_rec in promote_preview.merge_join(canonical, preview):
+        if p_rec is None:
+            continue
+        if c_idx is None:
+            added.append(p_rec)
+        else:
+            merged[c_idx] = promote_preview.merge_record(kind, canonical[c_idx], p_rec)
+    merged.extend(added)
+
+    result = dict(data)
+    result[data_key] = dict(container, **{spec["key"]: merged}) if isinstance(container, dict) else merged
+    return result
+
+
+def load_version(revision: Optional[str], data_dir: Optional[Path]) -> Dict[str, Any]:
+    if data_dir is not None:
+        return impact.load_data(data_dir)
+    return impact.load_data_at(revision or "HEAD")
+
+
+# ---------- Deltas ----------
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _pillar_states(pillars: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    "resist.active" -> state result; single-state pillars (core_combo) by name.
+    """
+    states: Dict[str, Dict[str, Any]] = {}
+    for pillar_name, body in (pillars or {}).items():
+        if not isinstance(body, dict):
+            continue
+        if "meets_target" in body:
+            states[pillar_name] = body
+            continue
+        for state_name, result in body.items():
+            if isinstance(result, dict):
+                states[f"{pillar_name}.{state_name}"] = result
+    return states
+
+
+def pillar_deltas(before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Differences between two compute_pillars() results for one build.
+    """
+    deltas: Dict[str, Dict[str, Any]] = {}
+    flips: List[Dict[str, Any]] = []
+    changed_fields: List[str] = []
+
+    old_states = _pillar_states(before.get("pillars", {}))
+    new_states = _pillar_states(after.get("pillars", {}))
+    for state in sorted(set(old_states) | set(new_states)):
+        old = old_states.get(state, {})
+        new = new_states.get(state, {})
+        for field in sorted(set(old) | set(new)):
+            old_value = old.get(field)
+            new_value = new.get(field)
+            if old_value == new_value:
+                continue
+            if field == "meets_target":
+                flips.append({"pillar": state, "before": old_value, "after": new_value})
+            elif _is_number(old_value) and _is_number(new_value):
+                deltas[f"{state}.{field}"] = {
+                    "before": old_value,
+                    "after": new_value,
+                    "delta": new_value - old_value,
+                }
+            else:
+                changed_fields.append(f"{state}.{field}")
+
+    return {"deltas": deltas, "flips": flips, "changed_fields": changed_fields}
+
+
+# ---------- Evaluation ----------
+
+# (base, target) data, loaded once per worker process.
+_WORKER_VERSIONS: Dict[str, Dict[str, Any]] = {}
+
+
+def _init_worker(base: Dict[str, Any], target: Dict[str, Any]) -> None:
+    _WORKER_VERSIONS["base"] = base
+    _WORKER_VERSIONS["target"] = target
+
+
+def _diff_build(rel_path: str) -> Dict[str, Any]:
+    build = impact.load_json(REPO_ROOT / rel_path)
+    before = compute_pillars.compute_pillars(build, _WORKER_VERSIONS["base"])
+    after = compute_pillars.compute_pillars(build, _WORKER_VERSIONS["target"])
+    return pillar_deltas(before, after)
+
+
+def diff_pillars(
+    index: impact.ReferenceIndex,
+    base: Dict[str, Any],
+    target: Dict[str, Any],
+    target_indexed: bool = True,
+    jobs: int = 1,
+) -> Dict[str, Any]:
+    """
+    impact() plus pillar deltas for each affected build; see the module docstring.
+    """
+    result = impact.impact(index, base, target, target_indexed)
+    builds = result["affected_builds"]
+    paths = [entry["path"] for entry in builds]
+
+    if jobs > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(
+            max_workers=min(jobs, len(paths)),
+            initializer=_init_worker,
+            initargs=(base, target),
+        ) as pool:
+            diffs = list(pool.map(_diff_build, paths, chunksize=max(1, len(paths) // (jobs * 4))))
+    else:
+        _init_worker(base, target)
+        diffs = [_diff_build(rel_path) for rel_path in paths]
+
+    for entry, diff in zip(builds, diffs):
+        entry.update(diff)
+        entry["pillars_changed"] = bool(diff["deltas"] or diff["flips"] or diff["changed_fields"])
+
+    result["flipped_build_count"] = sum(1 for entry in builds if entry["flips"])
+    return result
+
+
+# ---------- CLI ----------
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Pillar deltas between two data-center versions.")
+    parser.add_argument("--data-dir", type=str, default=str(DATA_DIR), help="Indexed data directory (default target).")
+    parser.add_argument("--builds-dir", type=str, default=str(BUILDS_DIR), help="Build definitions directory.")
+    base_group = parser.add_mutually_exclusive_group()
+    base_group.add_argument("--base", type=str, default="HEAD", help="Git revision of the base data (default: HEAD).")
+    base_group.add_argument("--base-dir", type=str, default=None, help="Directory with the base data instead.")
+    target_group = parser.add_mutually_exclusive_group()
+    target_group.add_argument("--target", type=str, default=None, help="Git revision of the target data.")
+    target_group.add_argument("--target-dir", type=str, default=None, help="Directory with the target data.")
+    parser.add_argument(
+        "--target-previews",
+        nargs="*",
+        choices=sorted(PREVIEW_DATA_KEYS),
+        default=None,
+        help="Merge these import previews into the target (no kinds: all of them).",
+    )
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Parallel worker processes.")
+    args = parser.parse_args()
+
+    data_dir = Path(args.data_dir)
+    target_dir = Path(args.target_dir) if args.target_dir else (None if args.target else data_dir)
+    preview_kinds: List[str] = []
+    if args.target_previews is not None:
+        preview_kinds = args.target_previews or sorted(PREVIEW_DATA_KEYS)
+
+    index = impact.ReferenceIndex.load(data_dir, Path(args.builds_dir))
+    try:
+        base = load_version(args.base, Path(args.base_dir) if args.base_dir else None)
+        target = load_version(args.target, target_dir)
+        for kind in preview_kinds:
+            target = apply_preview(target, kind, data_dir=target_dir or data_dir)
+    except (OSError, ValueError, SnapshotError) as exc:
+        print(json.dumps({"status": "ERROR", "message": str(exc)}, indent=2))
+        return 1
+
+    target_indexed = (
+        target_dir is not None and target_dir.resolve() == data_dir.resolve() and not preview_kinds
+    )
+    result = diff_pillars(index, base, target, target_indexed, args.jobs)
+    print(
+        json.dumps(
+            {
+                "status": "OK",
+                "base": args.base_dir or args.base,
+                "target": args.target or str(target_dir),
+                "target_previews": preview_kinds,
+                "index_refreshed": index.refreshed,
+                **result,
+            },
+            indent=2,
+        )
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,470 @@
+#!/usr/bin/env python3
+"""
+tools/promote_preview.py
+
+Promote import previews (raw-imports/*.import-preview.json) into the
+canonical data/*.json files.
+
+For each kind (skills, sets, cp-stars) the tool:
+
+1. Canonicalizes preview ids through the alias registry
+   (data/id-aliases.json, see tools/id_registry.py), so an importer still
+   emitting a legacy id updates the canonical record instead of adding a
+   duplicate, then merge-joins the preview and the canonical file by id
+   (both sides sorted by id, one linear pass).
+2. Merges matched records field by field. The preview wins, except where it
+   has nothing to say: hand-curated effects[] (and set bonus effects) are
+   kept while the preview's are empty, and null preview values never erase
+   curated ones. Canonical records missing from the preview are kept as is.
+   Review-only fields (effect_proposals, import_provenance) are dropped.
+3. Validates only what the promotion touches: the changed and added
+   records (id uniqueness, namespace, effect references, with the same
+   field paths validate_data_integrity.py would report), plus the builds
+   that reference them (validate_build.py reference checks).
+4. Writes the result atomically: existing records keep their canonical
+   order, new records are appended sorted by id. Nothing is written when
+   validation fails or with --dry-run.
+
+Usage:
+
+    python tools/promote_preview.py skills --dry-run
+    python tools/promote_preview.py skills sets cp-stars
+    python tools/promote_preview.py sets --preview-path raw-imports/sets.import-preview.json
+
+Output (to stdout): one status object per kind, wrapped as
+
+{
+  "status": "OK" | "ERROR",
+  "results": [
+    {
+      "kind": "skills",
+      "status": "OK" | "ERROR",
+      "added_ids": [...],
+      "changed_ids": [...],
+      "canonicalized_ids": [ { "id": "cp.steed_s_blessing", "canonical": "cp.steeds_blessing" } ],
+      "affected_builds": [...],
+      "error_count": N,
+      "errors": [ { "field": "...", "message": "..." }, ... ],
+      ...
+    }
+  ]
+}
+"""
+
+import argparse
+import json
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+import id_registry
+import validate_build
+import validate_data_integrity
+from atomic_io import atomic_write
+from import_stream import SnapshotError, iter_snapshot_rows
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DATA_DIR = REPO_ROOT / "data"
+BUILDS_DIR = REPO_ROOT / "builds"
+RAW_IMPORTS_DIR = REPO_ROOT / "raw-imports"
+
+KINDS: Dict[str, Dict[str, Any]] = {
+    "skills": {
+        "data_file": "skills.json",
+        "preview_file": "skills.import-preview.json",
+        "key": "skills",
+        "field_prefix": "skills",
+        "prefixes": ["skill."],
+        "registry_kind": "skill",
+        "check_references": validate_data_integrity.check_skill_references,
+    },
+    "sets": {
+        "data_file": "sets.json",
+        "preview_file": "sets.import-preview.json",
+        "key": "sets",
+        "field_prefix": "sets",
+        "prefixes": ["set."],
+        "registry_kind": "set",
+        "check_references": validate_data_integrity.check_set_references,
+    },
+    "cp-stars": {
+        "data_file": "cp-stars.json",
+        "preview_file": "cp-stars.import-preview.json",
+        "key": "cp_stars",
+        "field_prefix": "cpstars",
+        "prefixes": ["cp."],
+        "registry_kind": "cp",
+        "check_references": validate_data_integrity.check_cpstar_references,
+    },
+}
+
+# Review-only fields written by the importers (tools/tooltip_effects.py);
+# they never reach data/*.json.
+PREVIEW_ONLY_FIELDS = ("effect_proposals", "import_provenance")
+
+Record = Dict[str, Any]
+
+
+def load_json(path: Path) -> Any:
+    with path.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def unwrap(container: Any, key: str) -> List[Any]:
+    if isinstance(container, dict):
+        return container.get(key, [])
+    return container
+
+
+# ---------- Merge ----------
+
+
+def strip_preview_fields(record: Record) -> Record:
+    record = {k: v for k, v in record.items() if k not in PREVIEW_ONLY_FIELDS}
+    bonuses = record.get("bonuses")
+    if isinstance(bonuses, list):
+        record["bonuses"] = [
+            {k: v for k, v in bonus.items() if k not in PREVIEW_ONLY_FIELDS} if isinstance(bonus, dict) else bonus
+            for bonus in bonuses
+        ]
+    return record
+
+
+def canonicalize_ids(kind: str, preview: List[Record], data_dir: Path = DATA_DIR) -> List[Dict[str, str]]:
+    """
+    Rewrite legacy preview ids to their canonical ids in place, using the
+    aliases in data/id-aliases.json. Returns the { id, canonical } renames.
+    """
+    payload = id_registry.load_registry_file(str(data_dir))
+    if not payload:
+        return []
+    registry = id_registry.IdRegistry()
+    registry.add_registry_file(payload)
+
+    renamed: List[Dict[str, str]] = []
+    registry_kind = KINDS[kind]["registry_kind"]
+    for idx, rec in enumerate(preview):
+        canonical = registry.resolve(registry_kind, rec["id"])
+        if canonical is not None:
+            renamed.append({"id": rec["id"], "canonical": canonical})
+            preview[idx] = dict(rec, id=canonical)
+    return renamed
+
+
+def merge_join(
+    canonical: List[Any],
+    preview: List[Record],
+) -> Iterator[Tuple[Optional[int], Optional[Record]]]:
+    """
+    Sorted merge-join by id.
+
+    Yields (canonical_index, preview_record) in id order; either side is
+    None when the id exists on one side only. Preview records must have
+    string ids.
+    """
+    left = sorted(
+        (rec["id"], idx)
+        for idx, rec in enumerate(canonical)
+        if isinstance(rec, dict) and isinstance(rec.get("id"), str)
+    )
+    right = sorted(preview, key=lambda rec: rec["id"])
+
+    i = j = 0
+    while i < len(left) or j < len(right):
+        if j >= len(right) or (i < len(left) and left[i][0] < right[j]["id"]):
+            yield left[i][1], None
+            i += 1
+        elif i >= len(left) or right[j]["id"] < left[i][0]:
+            yield None, right[j]
+            j += 1
+        else:
+            yield left[i][1], right[j]
+            i += 1
+            j += 1
+
+
+def merge_set_bonuses(canonical: Any, preview: Any) -> Any:
+    """
+    Merge bonus tiers by piece count; curated tier effects survive while
+    the preview's tier has none. Tiers on one side only are kept.
+    """
+    if not isinstance(preview, list) or not preview:
+        return canonical
+    if not isinstance(canonical, list):
+        return preview
+
+    by_pieces: Dict[Any, Any] = {}
+    for bonus in canonical:
+        if isinstance(bonus, dict):
+            by_pieces[bonus.get("pieces")] = bonus
+    for bonus in preview:
+        if not isinstance(bonus, dict):
+            continue
+        old = by_pieces.get(bonus.get("pieces"))
+        if isinstance(old, dict) and not bonus.get("effects") and old.get("effects"):
+            bonus = dict(bonus, effects=old["effects"])
+        by_pieces[bonus.get("pieces")] = bonus
+
+    return sorted(by_pieces.values(), key=lambda b: (not isinstance(b.get("pieces"), int), b.get("pieces") or 0))
+
+
+def merge_record(kind: str, canonical: Record, preview: Record) -> Record:
+    merged = dict(canonical)
+    for field, value in preview.items():
+        if value is None and canonical.get(field) is not None:
+            continue
+        merged[field] = value
+
+    if kind == "sets":
+        merged["bonuses"] = merge_set_bonuses(canonical.get("bonuses"), preview.get("bonuses"))
+    elif not preview.get("effects") and canonical.get("effects"):
+        merged["effects"] = canonical["effects"]
+    return merged
+
+
+# ---------- Validation of touched records ----------
+
+
+def validate_touched(
+    kind: str,
+    records: List[Any],
+    touched: List[int],
+    untouched_ids: Set[str],
+    effect_ids: Set[str],
+) -> List[Dict[str, Any]]:
+    """
+    Run the validate_data_integrity checks for the records at `touched`
+    (indices into the merged list), in the same order a full run reports
+    them: uniqueness, then namespace, then references.
+    """
+    spec = KINDS[kind]
+    prefix = spec["field_prefix"]
+    errors: List[Dict[str, Any]] = []
+
+    seen = set(untouched_ids)
+    for idx in touched:
+        _id = records[idx].get("id")
+        if _id in seen:
+            errors.append({"field": f"{prefix}[{idx}].id", "message": f"Duplicate id '{_id}'"})
+        seen.add(_id)
+
+    for idx in touched:
+        error = validate_data_integrity.check_id_namespace(
+            records[idx]["id"], spec["prefixes"], f"{prefix}[{idx}].id"
+        )
+        if error is not None:
+            errors.append(error)
+
+    check_references: Callable[[Any, int, Set[str]], List[Dict[str, Any]]] = spec["check_references"]
+    for idx in touched:
+        errors.extend(check_references(records[idx], idx, effect_ids))
+
+    return errors
+
+
+def iter_referencing_builds(builds_dir: Path, kind: str, ids: Set[str]) -> Iterator[Tuple[Path, Record]]:
+    """
+    Build definitions under builds_dir that reference any of `ids`.
+    """
+    for path in sorted(builds_dir.glob("*.json")):
+        build = load_json(path)
+        if not isinstance(build, dict) or "bars" not in build:
+            continue
+        if kind == "skills":
+            refs = {
+                slot.get("skill_id")
+                for bar in (build.get("bars") or {}).values()
+                if isinstance(bar, list)
+                for slot in bar
+                if isinstance(slot, dict)
+            }
+        elif kind == "sets":
+            refs = {piece.get("set_id") for piece in build.get("gear", []) if isinstance(piece, dict)}
+        else:
+            refs = {
+                cp_id
+                for stars in (build.get("cp_slotted") or {}).values()
+                if isinstance(stars, list)
+                for cp_id in stars
+            }
+        if refs & ids:
+            yield path, build
+
+
+def validate_reverse_references(
+    kind: str,
+    records: List[Any],
+    touched_ids: Set[str],
+    data_dir: Path,
+    builds_dir: Path,
+) -> Tuple[List[str], List[Dict[str, Any]]]:
+    """
+    Re-run the build reference checks, against the promoted data, for the
+    builds that reference a touched record.
+    """
+    lists = dict(
+        zip(
+            ("skills", "sets", "cp-stars"),
+            validate_build.unwrap_data_containers(
+                load_json(data_dir / "skills.json"),
+                load_json(data_dir / "sets.json"),
+                load_json(data_dir / "cp-stars.json"),
+            ),
+        )
+    )
+    lists[kind] = records
+
+    affected: List[str] = []
+    errors: List[Dict[str, Any]] = []
+    for path, build in iter_referencing_builds(builds_dir, kind, touched_ids):
+        affected.append(str(path))
+        for error in validate_build.validate_references(build, lists["skills"], lists["sets"], lists["cp-stars"]):
+            errors.append(dict(error, field=f"{path.name}:{error['field']}"))
+    return affected, errors
+
+
+# ---------- Promotion ----------
+
+
+def write_container_atomic(path: Path, container: Any) -> None:
+    with atomic_write(path) as f:
+        json.dump(container, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+
+def promote(
+    kind: str,
+    preview_path: Optional[Path] = None,
+    data_dir: Path = DATA_DIR,
+    builds_dir: Path = BUILDS_DIR,
+    dry_run: bool = False,
+) -> Dict[str, Any]:
+    spec = KINDS[kind]
+    data_path = data_dir / spec["data_file"]
+    preview_path = preview_path or RAW_IMPORTS_DIR / spec["preview_file"]
+
+    result: Dict[str, Any] = {
+        "kind": kind,
+        "data_path": str(data_path),
+        "preview_path": str(preview_path),
+        "dry_run": dry_run,
+    }
+
+    errors: List[Dict[str, Any]] = []
+    preview: List[Record] = []
+    try:
+        for p_idx, rec in enumerate(iter_snapshot_rows(preview_path, spec["key"])):
+            if not isinstance(rec.get("id"), str):
+                errors.append({"field": f"preview.{spec['key']}[{p_idx}].id", "message": "Preview record has no string id"})
+                continue
+            preview.append(strip_preview_fields(rec))
+    except SnapshotError as exc:
+        errors.append({"field": "preview", "message": str(exc)})
+
+    if errors:
+        return dict(result, status="ERROR", error_count=len(errors), errors=errors)
+
+    renamed = canonicalize_ids(kind, preview, data_dir)
+    container = load_json(data_path)
+    canonical = unwrap(container, spec["key"])
+    merged: List[Any] = list(canonical)
+    changed: List[int] = []
+    added: List[Record] = []
+    unchanged = 0
+    not_in_preview = 0
+
+    for c_idx, p_rec in merge_join(canonical, preview):
+        if p_rec is None:
+            not_in_preview += 1
+        elif c_idx is None:
+            added.append(p_rec)
+        else:
+            record = merge_record(kind, canonical[c_idx], p_rec)
+            if record == canonical[c_idx]:
+                unchanged += 1
+            else:
+                merged[c_idx] = record
+                changed.append(c_idx)
+
+    first_new = len(merged)
+    merged.extend(added)
+    touched = sorted(changed) + list(range(first_new, len(merged)))
+
+    touched_set = set(touched)
+    untouched_ids = {
+        rec["id"]
+        for idx, rec in enumerate(merged)
+        if idx not in touched_set and isinstance(rec, dict) and isinstance(rec.get("id"), str)
+    }
+    effect_ids = set(validate_data_integrity.collect_ids(unwrap(load_json(data_dir / "effects.json"), "effects")))
+
+    errors.extend(validate_touched(kind, merged, touched, untouched_ids, effect_ids))
+    touched_ids = {merged[idx]["id"] for idx in touched}
+    affected_builds, build_errors = validate_reverse_references(kind, merged, touched_ids, data_dir, builds_dir)
+    errors.extend(build_errors)
+
+    status = "OK" if not errors else "ERROR"
+    written = False
+    if status == "OK" and touched and not dry_run:
+        if isinstance(container, dict):
+            container = dict(container)
+            container[spec["key"]] = merged
+        else:
+            container = merged
+        write_container_atomic(data_path, container)
+        written = True
+
+    return dict(
+        result,
+        status=status,
+        written=written,
+        added_ids=[rec["id"] for rec in added],
+        changed_ids=[merged[idx]["id"] for idx in sorted(changed)],
+        canonicalized_ids=renamed,
+        unchanged_count=unchanged,
+        not_in_preview_count=not_in_preview,
+        validated_records=len(touched),
+        affected_builds=affected_builds,
+        error_count=len(errors),
+        errors=errors,
+    )
+
+
+# ---------- CLI ----------
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Merge import previews from raw-imports/ into data/*.json, validating only what changes."
+    )
+    parser.add_argument("kinds", nargs="+", choices=sorted(KINDS), help="Which previews to promote.")
+    parser.add_argument(
+        "--preview-path",
+        type=str,
+        default=None,
+        help="Preview file to promote (only with a single kind; default: raw-imports/<kind>.import-preview.json).",
+    )
+    parser.add_argument("--data-dir", type=str, default=str(DATA_DIR), help="Canonical data directory.")
+    parser.add_argument("--builds-dir", type=str, default=str(BUILDS_DIR), help="Builds checked for reverse references.")
+    parser.add_argument("--dry-run", action="store_true", help="Report the merge and validation without writing.")
+    args = parser.parse_args()
+
+    if args.preview_path and len(args.kinds) != 1:
+        parser.error("--preview-path needs exactly one kind")
+
+    results = [
+        promote(
+            kind,
+            Path(args.preview_path) if args.preview_path else None,
+            Path(args.data_dir),
+            Path(args.builds_dir),
+            args.dry_run,
+        )
+        for kind in args.kinds
+    ]
+    status = "OK" if all(r["status"] == "OK" for r in results) else "ERROR"
+    print(json.dumps({"status": status, "results": results}, indent=2, ensure_ascii=False))
+    return 0 if status == "OK" else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+tools/reconcile_ids.py
+
+Reconcile drifting IDs with canonical ones.
+
+IDs drift between sources: stored build outputs use "skill.deepfissure"
+where data/skills.json has "skill.deep_fissure", and normalize_*_id turns
+"Steed's Blessing" into "cp.steed_s_blessing" while the curated star is
+"cp.steeds_blessing". This tool collects every ID that is referenced but not
+canonical and proposes the canonical ID it most likely means.
+
+Canonical IDs are the ids in data/{skills,sets,cp-stars,effects}.json plus
+the build definitions under builds/. Queried IDs come from every JSON file
+under builds/ (including derived -effects/-pillars outputs) and from the
+import previews under raw-imports/.
+
+Matching uses a character trigram inverted index per namespace (skill.,
+set., cp., buff., ...). A query reads only the postings of its rarest
+trigrams (prefix filtering), then scores the few candidates of plausible
+length, so the cost does not grow with catalog size the way pairwise
+string distance does.
+
+Scores are the Jaccard similarity of the trigram sets of the IDs with
+separators removed; IDs that only differ in separators score 1.0.
+
+Output (default raw-imports/id-aliases.proposed.json), for review:
+
+{
+  "meta": {...},
+  "aliases": [
+    {
+      "alias": "skill.deepfissure",
+      "canonical": "skill.deep_fissure",
+      "score": 1.0,
+      "status": "exact_normalized" | "review" | "ambiguous",
+      "candidates": [ { "id": "...", "score": 0.0 }, ... ],
+      "seen_in": ["builds/permafrost-marshal-pillars.json"]
+    }
+  ],
+  "unmatched": [ { "id": "...", "seen_in": [...] } ]
+}
+
+Usage:
+
+    python tools/reconcile_ids.py
+    python tools/reconcile_ids.py --min-score 0.4 --output -
+"""
+
+import argparse
+import json
+import math
+import re
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Set, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DATA_DIR = REPO_ROOT / "data"
+BUILDS_DIR = REPO_ROOT / "builds"
+RAW_IMPORTS_DIR = REPO_ROOT / "raw-imports"
+DEFAULT_OUTPUT = RAW_IMPORTS_DIR / "id-aliases.proposed.json"
+
+ID_RE = re.compile(r"^(skill|set|cp|buff|debuff|shield|hot|build)\.[A-Za-z0-9_]+$")
+
+DATA_FILES = (
+    ("skills.json", "skills"),
+    ("sets.json", "sets"),
+    ("cp-stars.json", "cp_stars"),
+    ("effects.json", "effects"),
+)
+
+# Second-best candidates this close to the best make a match ambiguous.
+AMBIGUITY_MARGIN = 0.05
+
+
+def load_json(path: Path) -> Any:
+    with path.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def relative(path: Path) -> str:
+    try:
+        return path.resolve().relative_to(REPO_ROOT).as_posix()
+    except ValueError:
+        return str(path)
+
+
+# ---------- N-grams ----------
+
+
+def split_namespace(_id: str) -> Tuple[str, str]:
+    namespace, _, local = _id.partition(".")
+    return namespace, local
+
+
+def squash(local: str) -> str:
+    """
+    Lowercase and drop separators: "deep_fissure" and "deepfissure" agree.
+    """
+    return "".join(ch for ch in local.lower() if ch.isalnum())
+
+
+def trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NgramIndex:
+    """
+    Trigram inverted index over canonical IDs, partitioned by namespace.
+
+        index = NgramIndex(canonical_ids)
+        index.query("skill.deepfissure")
+        # [("skill.deep_fissure", 1.0), ...]
+    """
+
+    def __init__(self, ids: Iterable[str] = ()) -> None:
+        self._entries: List[Tuple[str, str, Set[str]]] = []
+        self._postings: Dict[str, Dict[str, List[int]]] = defaultdict(lambda: defaultdict(list))
+        self._ids: Set[str] = set()
+        for _id in ids:
+            self.add(_id)
+
+    def __contains__(self, _id: str) -> bool:
+        return _id in self._ids
+
+    def add(self, _id: str) -> None:
+        if _id in self._ids:
+            return
+        self._ids.add(_id)
+        namespace, local = split_namespace(_id)
+        key = squash(local)
+        grams = trigrams(key)
+        entry = len(self._entries)
+        self._entries.append((_id, key, grams))
+        postings = self._postings[namespace]
+        for gram in grams:
+            postings[gram].append(entry)
+
+    def query(self, _id: str, min_score: float = 0.5, limit: int = 3) -> List[Tuple[str, float]]:
+        """
+        Best canonical matches for _id in its own namespace, highest first.
+        """
+        namespace, local = split_namespace(_id)
+        key = squash(local)
+        grams = trigrams(key)
+        postings = self._postings.get(namespace)
+        if not postings or not grams:
+            return []
+
+        # Jaccard >= t needs at least t * |grams| shared trigrams, so a match
+        # must share one of the |grams| - needed + 1 rarest ones (prefix
+        # filter); only their postings are read.
+        needed = max(1, math.ceil(min_score * len(grams)))
+        rarest = sorted(grams, key=lambda gram: len(postings.get(gram, ())))
+        candidates: Set[int] = set()
+        for gram in rarest[: len(grams) - needed + 1]:
+            candidates.update(postings.get(gram, ()))
+
+        min_len = min_score * len(grams)
+        max_len = len(grams) / min_score if min_score > 0 else math.inf
+        scored: List[Tuple[str, float]] = []
+        for entry in candidates:
+            cand_id, cand_key, cand_grams = self._entries[entry]
+            if not min_len <= len(cand_grams) <= max_len:
+                continue
+            if cand_key == key:
+                score = 1.0
+            else:
+                count = len(grams & cand_grams)
+                score = count / (len(grams) + len(cand_grams) - count)
+            if score >= min_score:
+                scored.append((cand_id, round(score, 4)))
+
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored[:limit]
+
+
+# ---------- Sources ----------
+
+
+def load_canonical_ids(data_dir: Path = DATA_DIR, builds_dir: Path = BUILDS_DIR) -> List[str]:
+    ids: List[str] = []
+    for file_name, key in DATA_FILES:
+        container = load_json(data_dir / file_name)
+        items = container.get(key, []) if isinstance(container, dict) else container
+        ids.extend(item["id"] for item in items if isinstance(item, dict) and isinstance(item.get("id"), str))
+    for path in sorted(builds_dir.glob("*.json")):
+        build = load_json(path)
+        if isinstance(build, dict) and "bars" in build and isinstance(build.get("id"), str):
+            ids.append(build["id"])
+    return ids
+
+
+def iter_id_strings(value: Any) -> Iterator[str]:
+    """
+    Every string (value or key) in a JSON document that looks like an ID.
+    """
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if ID_RE.match(key):
+                yield key
+            yield from iter_id_strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from iter_id_strings(item)
+    elif isinstance(value, str) and ID_RE.match(value):
+        yield value
+
+
+def collect_references(paths: Iterable[Path]) -> Dict[str, List[str]]:
+    """
+    ID -> sorted list of files it appears in.
+    """
+    seen: Dict[str, Set[str]] = defaultdict(set)
+    for path in paths:
+        for _id in iter_id_strings(load_json(path)):
+            seen[_id].add(relative(path))
+    return {_id: sorted(files) for _id, files in seen.items()}
+
+
+def default_query_files(builds_dir: Path = BUILDS_DIR, raw_imports_dir: Path = RAW_IMPORTS_DIR) -> List[Path]:
+    return sorted(builds_dir.glob("*.json")) + sorted(raw_imports_dir.glob("*.import-preview.json"))
+
+
+# ---------- Reconciliation ----------
+
+
+def reconcile(
+    index: NgramIndex,
+    references: Dict[str, List[str]],
+    min_score: float = 0.5,
+) -> Dict[str, Any]:
+    aliases: List[Dict[str, Any]] = []
+    unmatched: List[Dict[str, Any]] = []
+
+    for _id in sorted(references):
+        if _id in index:
+            continue
+        candidates = index.query(_id, min_score)
+        if not candidates:
+            unmatched.append({"id": _id, "seen_in": references[_id]})
+            continue
+
+        best_id, best_score = candidates[0]
+        if len(candidates) > 1 and best_score - candidates[1][1] < AMBIGUITY_MARGIN:
+            status = "ambiguous"
+        elif best_score == 1.0:
+            status = "exact_normalized"
+        else:
+            status = "review"
+
+        aliases.append(
+            {
+                "alias": _id,
+                "canonical": best_id,
+                "score": best_score,
+                "status": status,
+                "candidates": [{"id": cand, "score": score} for cand, score in candidates],
+                "seen_in": references[_id],
+            }
+        )
+
+    return {"aliases": aliases, "unmatched": unmatched}
+
+
+# ---------- CLI ----------
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Propose canonical IDs for drifted IDs in builds/ and raw-imports/ previews."
+    )
+    parser.add_argument("paths", nargs="*", help="JSON files to scan (default: builds/*.json and import previews).")
+    parser.add_argument("--min-score", type=float, default=0.5, help="Minimum trigram similarity (0-1).")
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=str(DEFAULT_OUTPUT),
+        help="Where to write the proposed alias map ('-' for stdout).",
+    )
+    args = parser.parse_args()
+
+    index = NgramIndex(load_canonical_ids())
+    paths = [Path(p) for p in args.paths] or default_query_files()
+    result = reconcile(index, collect_references(paths), args.min_score)
+    payload = {
+        "meta": {
+            "generated_by": "tools/reconcile_ids.py",
+            "min_score": args.min_score,
+            "note": (
+                "Proposals only. Review each entry and copy accepted aliases "
+                "into the canonical alias registry."
+            ),
+        },
+        **result,
+    }
+
+    text = json.dumps(payload, indent=2, ensure_ascii=False)
+    if args.output == "-":
+        print(text)
+    else:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+        print(
+            json.dumps(
+                {
+                    "status": "OK",
+                    "alias_count": len(result["aliases"]),
+                    "unmatched_count": len(result["unmatched"]),
+                    "output": args.output,
+                },
+                indent=2,
+            )
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
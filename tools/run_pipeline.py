@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+tools/run_pipeline.py
+
+Make-style runner for the external data pipeline
+(docs/ESO-Build-Engine-External-Data-Runbook.md):
+
+    import-skills ── validate-preview-skills
+    import-sets   ── validate-preview-sets
+    import-cp     ── validate-preview-cp
+    validate-data                  (data/*.json, independent)
+
+Each stage is a tool invocation with declared input and output files.
+Stages whose dependencies are done run concurrently (--jobs), so the three
+importers and validate-data run side by side.
+
+A stage is skipped when the content hashes of its inputs (snapshot, tool
+sources, data files, upstream outputs), its command line and its outputs
+are unchanged since its last successful run. Changing only the CP snapshot
+re-runs only the CP branch.
+
+Run state is kept in .cache/pipeline-state.json. File hashes are reused
+while a file's size and mtime are unchanged, so unchanged multi-GB
+snapshots are not re-read on every run.
+
+Output (to stdout):
+
+{
+  "status": "OK" | "ERROR",
+  "stages": [
+    {
+      "name": "import-cp",
+      "status": "ran" | "cached" | "failed" | "blocked",
+      "seconds": 0.42,
+      "returncode": 0,
+      "output": {...tool JSON output...}
+    },
+    ...
+  ]
+}
+
+Usage:
+
+    python tools/run_pipeline.py
+    python tools/run_pipeline.py import-cp --jobs 2
+    python tools/run_pipeline.py --cp-snapshot raw-imports/cp-esohub-snapshot.json
+    python tools/run_pipeline.py --force --dry-run
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+from atomic_io import atomic_write
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+STATE_PATH = REPO_ROOT / ".cache" / "pipeline-state.json"
+
+STATE_SCHEMA_VERSION = 1
+
+# Modules every importer runs on.
+IMPORT_SUPPORT = [
+    "tools/atomic_io.py",
+    "tools/import_checkpoint.py",
+    "tools/import_manifest.py",
+    "tools/import_merge.py",
+    "tools/import_pipeline.py",
+    "tools/import_stream.py",
+    "tools/tooltip_effects.py",
+    "data/effects.json",
+    "data/effect-synonyms.json",
+]
+
+# Import kind -> (tool, default snapshot, preview file).
+IMPORTS = {
+    "skills": ("import_skills_from_uesp.py", "skills.snapshot.json", "skills.import-preview.json"),
+    "sets": ("import_sets_from_uesp.py", "sets.snapshot.json", "sets.import-preview.json"),
+    "cp": ("import_cp_from_uesp.py", "cp-stars.snapshot.json", "cp-stars.import-preview.json"),
+}
+
+# Import kind -> validate_import_preview.py preview kind.
+VALIDATED_PREVIEWS = {
+    "skills": "skills",
+    "sets": "sets",
+    "cp": "cp-stars",
+}
+
+
+class Stage:
+    """
+    One pipeline step: a command, the files it reads and writes, and the
+    stages that must finish first.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        command: List[str],
+        inputs: List[str],
+        outputs: List[str],
+        deps: Optional[List[str]] = None,
+    ) -> None:
+        self.name = name
+        self.command = command
+        self.inputs = inputs
+        self.outputs = outputs
+        self.deps = deps or []
+
+
+def build_stages(snapshots: Dict[str, str]) -> List[Stage]:
+    """
+    The pipeline DAG. Paths are repo-relative; inputs may be globs.
+    """
+    stages: List[Stage] = []
+    for kind, (tool, _, preview) in IMPORTS.items():
+        stages.append(
+            Stage(
+                f"import-{kind}",
+                ["tools/" + tool, "--snapshot-path", snapshots[kind]],
+                [snapshots[kind], "tools/" + tool] + IMPORT_SUPPORT,
+                ["raw-imports/" + preview],
+            )
+        )
+    for kind, preview_kind in VALIDATED_PREVIEWS.items():
+        stages.append(
+            Stage(
+                f"validate-preview-{kind}",
+                ["tools/validate_import_preview.py", preview_kind],
+                [
+                    "tools/validate_import_preview.py",
+                    "tools/import_stream.py",
+                    "raw-imports/" + IMPORTS[kind][2],
+                ],
+                [],
+                deps=[f"import-{kind}"],
+            )
+        )
+    stages.append(
+        Stage(
+            "validate-data",
+            ["tools/validate_data_integrity.py"],
+            ["tools/validate_data_integrity.py", "data/*.json"],
+            [],
+        )
+    )
+    return stages
+
+
+def select_stages(stages: List[Stage], targets: List[str]) -> List[Stage]:
+    """
+    The named stages plus everything upstream of them (all stages if none).
+    """
+    by_name = {stage.name: stage for stage in stages}
+    unknown = [name for name in targets if name not in by_name]
+    if unknown:
+        raise SystemExit(f"Unknown stage(s): {', '.join(unknown)} (known: {', '.join(by_name)})")
+    if not targets:
+        return stages
+
+    wanted: Set[str] = set()
+    pending = list(targets)
+    while pending:
+        name = pending.pop()
+        if name not in wanted:
+            wanted.add(name)
+            pending.extend(by_name[name].deps)
+    return [stage for stage in stages if stage.name in wanted]
+
+
+# ---------- Hashing ----------
+
+
+class FileHasher:
+    """
+    Content hashes of repo files, reusing a previous hash while the file's
+    size and mtime are unchanged.
+    """
+
+    def __init__(self, known: Dict[str, Dict[str, Any]]) -> None:
+        self.known = known
+
+    def expand(self, patterns: List[str]) -> List[str]:
+        paths: List[str] = []
+        for pattern in patterns:
+            if glob.has_magic(pattern):
+                matches = sorted(glob.glob(str(REPO_ROOT / pattern)))
+                paths.extend(os.path.relpath(match, REPO_ROOT) for match in matches)
+            else:
+                paths.append(pattern)
+        return paths
+
+    def hash_file(self, rel_path: str) -> Optional[str]:
+        path = REPO_ROOT / rel_path
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        known = self.known.get(rel_path)
+        if known and known["size"] == stat.st_size and known["mtime_ns"] == stat.st_mtime_ns:
+            return known["hash"]
+
+        digest = hashlib.blake2b(digest_size=16)
+        with path.open("rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        self.known[rel_path] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": digest.hexdigest()}
+        return digest.hexdigest()
+
+    def hash_files(self, patterns: List[str]) -> Dict[str, Optional[str]]:
+        return {rel_path: self.hash_file(rel_path) for rel_path in self.expand(patterns)}
+
+
+def stage_key(stage: Stage, hasher: FileHasher) -> str:
+    payload = {"command": stage.command, "inputs": hasher.hash_files(stage.inputs)}
+    text = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+# ---------- State ----------
+
+
+def load_state(path: Path) -> Dict[str, Any]:
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {"schema_version": STATE_SCHEMA_VERSION, "files": {}, "stages": {}}
+    if state.get("schema_version") != STATE_SCHEMA_VERSION:
+        return {"schema_version": STATE_SCHEMA_VERSION, "files": {}, "stages": {}}
+    return state
+
+
+def save_state(path: Path, state: Dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with atomic_write(path) as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+
+
+# ---------- Running ----------
+
+
+def run_stage(stage: Stage) -> Dict[str, Any]:
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable] + stage.command,
+        cwd=str(REPO_ROOT),
+        capture_output=True,
+        text=True,
+    )
+    result: Dict[str, Any] = {
+        "name": stage.name,
+        "status": "ran" if proc.returncode == 0 else "failed",
+        "seconds": round(time.perf_counter() - started, 3),
+        "returncode": proc.returncode,
+    }
+    try:
+        result["output"] = json.loads(proc.stdout)
+    except json.JSONDecodeError:
+        result["output"] = proc.stdout.strip()[-2000:]
+    if proc.returncode != 0 and proc.stderr.strip():
+        result["stderr"] = proc.stderr.strip()[-2000:]
+    return result
+
+
+def run_pipeline(
+    stages: List[Stage],
+    state: Dict[str, Any],
+    jobs: int = 1,
+    force: bool = False,
+    dry_run: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Run the stages in dependency order, independent ones concurrently.
+    Updates `state` with the stages that succeeded.
+    """
+    hasher = FileHasher(state.setdefault("files", {}))
+    stage_state = state.setdefault("stages", {})
+    selected = {stage.name for stage in stages}
+    remaining = {stage.name: stage for stage in stages}
+    results: Dict[str, Dict[str, Any]] = {}
+    keys: Dict[str, str] = {}
+    running: Dict[Future, str] = {}
+
+    def settled(name: str) -> bool:
+        # Deps outside the selection count as done.
+        return name not in selected or name in results
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        while remaining or running:
+            for name in [n for n, s in remaining.items() if all(settled(d) for d in s.deps)]:
+                stage = remaining.pop(name)
+                failed_deps = [d for d in stage.deps if results.get(d, {}).get("status") in ("failed", "blocked")]
+                if failed_deps:
+                    results[name] = {"name": name, "status": "blocked", "blocked_by": failed_deps}
+                    continue
+
+                if dry_run and any(results.get(d, {}).get("status") == "would_run" for d in stage.deps):
+                    results[name] = {"name": name, "status": "would_run"}
+                    continue
+
+                # Keys are computed once upstream outputs exist.
+                keys[name] = stage_key(stage, hasher)
+                previous = stage_state.get(name, {})
+                outputs_unchanged = previous.get("outputs") == hasher.hash_files(stage.outputs) and all(
+                    h is not None for h in previous.get("outputs", {}).values()
+                )
+                if not force and previous.get("key") == keys[name] and outputs_unchanged:
+                    results[name] = {"name": name, "status": "cached"}
+                    continue
+                if dry_run:
+                    results[name] = {"name": name, "status": "would_run"}
+                    continue
+                running[pool.submit(run_stage, stage)] = name
+
+            if not running:
+                continue
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                result = future.result()
+                results[name] = result
+                stage = next(s for s in stages if s.name == name)
+                if result["status"] == "ran":
+                    # Outputs changed on disk; hash them fresh.
+                    for rel_path in stage.outputs:
+                        hasher.known.pop(rel_path, None)
+                    stage_state[name] = {"key": keys[name], "outputs": hasher.hash_files(stage.outputs)}
+                else:
+                    stage_state.pop(name, None)
+
+    return [results[stage.name] for stage in stages]
+
+
+# ---------- CLI ----------
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run the import/validate pipeline, skipping unchanged stages.")
+    parser.add_argument("stages", nargs="*", help="Stages to run, with their upstream stages (default: all).")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Stages to run at once.")
+    parser.add_argument("--force", action="store_true", help="Run every selected stage, ignoring the cache.")
+    parser.add_argument("--dry-run", action="store_true", help="Only report which stages would run.")
+    for kind, (_, snapshot, _) in IMPORTS.items():
+        parser.add_argument(
+            f"--{kind}-snapshot",
+            type=str,
+            default=f"raw-imports/{snapshot}",
+            help=f"Snapshot for import-{kind} (repo-relative; default: %(default)s).",
+        )
+    args = parser.parse_args()
+
+    snapshots = {kind: getattr(args, f"{kind}_snapshot") for kind in IMPORTS}
+    stages = select_stages(build_stages(snapshots), args.stages)
+
+    state = load_state(STATE_PATH)
+    results = run_pipeline(stages, state, args.jobs, args.force, args.dry_run)
+    if not args.dry_run:
+        save_state(STATE_PATH, state)
+
+    ok = all(result["status"] in ("ran", "cached", "would_run") for result in results)
+    print(json.dumps({"status": "OK" if ok else "ERROR", "stages": results}, indent=2, ensure_ascii=False))
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,659 @@
+#!/usr/bin/env python3
+"""
+tools/shared_data_center.py
+
+Compiled, shareable data center for multi-process workers.
+
+Fanning out over a process pool normally makes every worker re-parse
+data/*.json and rebuild its indexes, multiplying memory by the worker count.
+This module compiles the data center ONCE into a flat, position-independent
+byte image and lets workers attach to it read-only:
+
+- Interned values: every ID and scalar (timing, target, duration, stat) is
+  stored once as JSON text in a value table and referenced by integer.
+- Hash indexes: per entity kind (skills, sets, cp_stars, effects), an
+  open-addressing table (crc32, linear probing) from ID to row.
+- Alias tables: per entity kind, the id_registry aliases and external IDs
+  with their canonical ID, indexed the same way, so legacy references
+  resolve exactly as the IdResolver in compute_pillars resolves them.
+- Contribution table: one row per effect instance a skill, set bonus or CP
+  star can contribute (effect, timing, target, duration, pieces), in the
+  same order tools/compute_pillars.py would emit them.
+- Effect columns: stat and resolved scalar magnitude per effect.
+
+The image can be published into multiprocessing.shared_memory
+(publish_shared / attach_shared) or written to a file and memory-mapped
+(write_image / attach_file). Attaching only parses a fixed-size header and
+casts memoryviews over the sections, so worker startup is constant time
+regardless of catalog size, and all workers share one physical copy.
+
+compute_pillars_view(build, view) returns exactly what
+compute_pillars.compute_pillars(build, data) returns for the data the image
+was compiled from (checked by tools/oracle_check.py).
+
+Usage:
+
+    python tools/shared_data_center.py compile --out /tmp/data-center.img
+    python tools/shared_data_center.py pillars builds/permafrost-marshal.json --workers 4
+"""
+
+import argparse
+import json
+import mmap
+import multiprocessing
+import os
+import struct
+import sys
+import weakref
+import zlib
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import compute_pillars
+import id_registry
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+IMAGE_MAGIC = b"ESODC\x00\x02\x00"
+# magic (8 bytes) + header length (uint32) + padding (uint32)
+_PREFIX = struct.Struct("<8sII")
+_ALIGN = 8
+
+ENTITY_KINDS = ("skills", "sets", "cp_stars")
+
+# Entity kind -> id_registry kind.
+REGISTRY_KINDS: Dict[str, str] = {
+    "skills": "skill",
+    "sets": "set",
+    "cp_stars": "cp",
+}
+
+
+# ---------- Compilation ----------
+
+
+class _ValueTable:
+    """
+    Intern JSON scalars as JSON text; identical values share one entry.
+    """
+
+    def __init__(self) -> None:
+        self.ids: Dict[str, int] = {}
+        self.texts: List[bytes] = []
+
+    def intern(self, value: Any) -> int:
+        text = json.dumps(value)
+        idx = self.ids.get(text)
+        if idx is None:
+            idx = len(self.texts)
+            self.ids[text] = idx
+            self.texts.append(text.encode("utf-8"))
+        return idx
+
+
+def _table_size(count: int) -> int:
+    size = 8
+    while size < count * 2:
+        size *= 2
+    return size
+
+
+def _key_hash(key_text: bytes) -> int:
+    return zlib.crc32(key_text)
+
+
+def _build_hash_index(key_texts: List[bytes]) -> List[int]:
+    size = _table_size(len(key_texts))
+    mask = size - 1
+    table = [-1] * size
+    for row, text in enumerate(key_texts):
+        slot = _key_hash(text) & mask
+        while table[slot] != -1:
+            slot = (slot + 1) & mask
+        table[slot] = row
+    return table
+
+
+def _skill_contributions(skill: Dict[str, Any]) -> Iterable[Tuple[Any, Any, Any, Any, int]]:
+    for eff in skill.get("effects", []):
+        if not isinstance(eff, dict):
+            continue
+        effect_id = eff.get("effect_id")
+        if not effect_id:
+            continue
+        yield effect_id, eff.get("timing"), eff.get("target"), eff.get("duration_seconds"), 0
+
+
+def _set_contributions(set_record: Dict[str, Any]) -> Iterable[Tuple[Any, Any, Any, Any, int]]:
+    for bonus in set_record.get("bonuses", []):
+        if not isinstance(bonus, dict):
+            continue
+        pieces_required = bonus.get("pieces")
+        if not isinstance(pieces_required, int):
+            continue
+        for eff in bonus.get("effects", []):
+            if isinstance(eff, str):
+                effect_id = eff
+                timing = bonus.get("timing")
+                duration = bonus.get("duration_seconds")
+                target = bonus.get("target")
+            elif isinstance(eff, dict):
+                effect_id = eff.get("effect_id")
+                timing = eff.get("timing")
+                duration = eff.get("duration_seconds")
+                target = eff.get("target")
+            else:
+                continue
+            if not effect_id:
+                continue
+            yield effect_id, timing, target, duration, int(pieces_required)
+
+
+def _cp_contributions(star: Dict[str, Any]) -> Iterable[Tuple[Any, Any, Any, Any, int]]:
+    for eff in star.get("effects", []):
+        if isinstance(eff, str):
+            effect_id = eff
+            timing = star.get("timing")
+            duration = star.get("duration_seconds")
+            target = star.get("target")
+        elif isinstance(eff, dict):
+            effect_id = eff.get("effect_id")
+            timing = eff.get("timing")
+            duration = eff.get("duration_seconds")
+            target = eff.get("target")
+        else:
+            continue
+        if not effect_id:
+            continue
+        yield effect_id, timing, target, duration, 0
+
+
+_CONTRIBUTORS = {
+    "skills": _skill_contributions,
+    "sets": _set_contributions,
+    "cp_stars": _cp_contributions,
+}
+
+
+def compile_data_center(data: Dict[str, Any]) -> bytes:
+    """
+    Compile a load_all_data()-shaped dict into a flat data-center image.
+    """
+    values = _ValueTable()
+    unwrapped = compute_pillars.unwrap_containers(data)
+
+    sections: Dict[str, Tuple[str, List[Any]]] = {}
+    c_effect: List[int] = []
+    c_timing: List[int] = []
+    c_target: List[int] = []
+    c_duration: List[int] = []
+    c_pieces: List[int] = []
+
+    for kind in ENTITY_KINDS:
+        # index_by_id semantics: last record wins for duplicate IDs.
+        index = compute_pillars.index_by_id(unwrapped[kind])
+        keys: List[int] = []
+        starts: List[int] = []
+        counts: List[int] = []
+        for entity_id, record in index.items():
+            keys.append(values.intern(entity_id))
+            starts.append(len(c_effect))
+            for effect_id, timing, target, duration, pieces in _CONTRIBUTORS[kind](record):
+                c_effect.append(values.intern(effect_id))
+                c_timing.append(values.intern(timing))
+                c_target.append(values.intern(target))
+                c_duration.append(values.intern(duration))
+                c_pieces.append(pieces)
+            counts.append(len(c_effect) - starts[-1])
+        sections[f"{kind}.key"] = ("i", keys)
+        sections[f"{kind}.start"] = ("i", starts)
+        sections[f"{kind}.count"] = ("i", counts)
+        sections[f"{kind}.index"] = ("i", _build_hash_index([values.texts[k] for k in keys]))
+
+    registry = id_registry.IdRegistry.from_data(data)
+    for kind, registry_kind in REGISTRY_KINDS.items():
+        alias_keys: List[int] = []
+        alias_targets: List[int] = []
+        for alias, canonical in registry.entries(registry_kind):
+            alias_keys.append(values.intern(alias))
+            alias_targets.append(values.intern(canonical))
+        sections[f"{kind}.alias.key"] = ("i", alias_keys)
+        sections[f"{kind}.alias.target"] = ("i", alias_targets)
+        sections[f"{kind}.alias.index"] = ("i", _build_hash_index([values.texts[k] for k in alias_keys]))
+
+    effects_index = compute_pillars.index_effects_by_id(data["effects"])
+    e_keys: List[int] = []
+    e_stats: List[int] = []
+    e_magnitudes: List[float] = []
+    for effect_id, meta in effects_index.items():
+        e_keys.append(values.intern(effect_id))
+        e_stats.append(values.intern(meta.get("stat")))
+        e_magnitudes.append(compute_pillars.get_magnitude(meta))
+    sections["effects.key"] = ("i", e_keys)
+    sections["effects.stat"] = ("i", e_stats)
+    sections["effects.magnitude"] = ("d", e_magnitudes)
+    sections["effects.index"] = ("i", _build_hash_index([values.texts[k] for k in e_keys]))
+
+    sections["contrib.effect"] = ("i", c_effect)
+    sections["contrib.timing"] = ("i", c_timing)
+    sections["contrib.target"] = ("i", c_target)
+    sections["contrib.duration"] = ("i", c_duration)
+    sections["contrib.pieces"] = ("i", c_pieces)
+
+    offsets: List[int] = [0]
+    for text in values.texts:
+        offsets.append(offsets[-1] + len(text))
+    sections["values.offset"] = ("q", offsets)
+
+    # Lay out sections after the header; offsets are relative to the body.
+    body = bytearray()
+    layout: Dict[str, List[Any]] = {}
+    for name, (typecode, items) in sections.items():
+        packed = struct.pack(f"<{len(items)}{typecode}", *items)
+        layout[name] = [len(body), len(packed), typecode]
+        body += packed
+        body += b"\x00" * (-len(body) % _ALIGN)
+    blob = b"".join(values.texts)
+    layout["values.blob"] = [len(body), len(blob), "B"]
+    body += blob
+
+    header = json.dumps(
+        {
+            "sections": layout,
+            "counts": {
+                "skills": len(sections["skills.key"][1]),
+                "sets": len(sections["sets.key"][1]),
+                "cp_stars": len(sections["cp_stars.key"][1]),
+                "effects": len(e_keys),
+                "contributions": len(c_effect),
+                "values": len(values.texts),
+            },
+        },
+        sort_keys=True,
+    ).encode("utf-8")
+    header += b" " * (-(len(header) + _PREFIX.size) % _ALIGN)
+
+    return _PREFIX.pack(IMAGE_MAGIC, len(header), 0) + header + bytes(body)
+
+
+# ---------- Read-only view ----------
+
+
+class _EffectsIndexView:
+    """
+    Mapping-like effects index for the compute_pillars evaluators, which only
+    call .get(effect_id, default) and read "stat" / "magnitude_value".
+    """
+
+    def __init__(self, view: "DataCenterView") -> None:
+        # A weak reference keeps the view out of a reference cycle, so it is
+        # freed (releasing its memoryviews) before the SharedMemory it keeps
+        # alive is closed; in a cycle, SharedMemory.__del__ can run first
+        # and fail on the still-exported buffer.
+        self._view = weakref.proxy(view)
+        self._cache: Dict[Any, Dict[str, Any]] = {}
+
+    def get(self, effect_id: Any, default: Any = None) -> Any:
+        meta = self._cache.get(effect_id)
+        if meta is not None:
+            return meta
+        row = self._view.lookup("effects", effect_id)
+        if row < 0:
+            return default
+        view = self._view
+        meta = {
+            "id": effect_id,
+            "stat": view.value(view.section("effects.stat")[row]),
+            "magnitude_value": view.section("effects.magnitude")[row],
+        }
+        self._cache[effect_id] = meta
+        return meta
+
+
+class DataCenterView:
+    """
+    Read-only view over a compiled data-center image (bytes, mmap or shm).
+
+    Construction parses only the fixed header and casts section memoryviews,
+    so it costs the same for 10 records or 10 million.
+    """
+
+    def __init__(self, buffer: Any, keepalive: Any = None) -> None:
+        mem = memoryview(buffer).toreadonly()
+        magic, header_len, _ = _PREFIX.unpack_from(mem, 0)
+        if magic != IMAGE_MAGIC:
+            raise ValueError("Not a compiled ESO data-center image (bad magic).")
+        header_start = _PREFIX.size
+        header = json.loads(bytes(mem[header_start:header_start + header_len]))
+        body = mem[header_start + header_len:]
+
+        self.counts: Dict[str, int] = header["counts"]
+        self._sections: Dict[str, memoryview] = {}
+        for name, (offset, length, typecode) in header["sections"].items():
+            raw = body[offset:offset + length]
+            self._sections[name] = raw if typecode == "B" else raw.cast(typecode)
+        self._values = self._sections["values.blob"]
+        self._value_offsets = self._sections["values.offset"]
+        self._value_cache: Dict[int, Any] = {}
+        self._keepalive = keepalive
+        self.effects_index = _EffectsIndexView(self)
+
+    def section(self, name: str) -> memoryview:
+        return self._sections[name]
+
+    def value(self, idx: int) -> Any:
+        cached = self._value_cache.get(idx, _MISSING)
+        if cached is not _MISSING:
+            return cached
+        start = self._value_offsets[idx]
+        end = self._value_offsets[idx + 1]
+        value = json.loads(bytes(self._values[start:end]))
+        self._value_cache[idx] = value
+        return value
+
+    def _value_text(self, idx: int) -> bytes:
+        return bytes(self._values[self._value_offsets[idx]:self._value_offsets[idx + 1]])
+
+    def lookup(self, kind: str, key: Any) -> int:
+        """
+        Return the row for an entity ID, or -1 if it is not in the image.
+        """
+        return self._probe(kind, key)
+
+    def resolve(self, kind: str, key: Any) -> Optional[Any]:
+        """
+        Canonical ID for a legacy or external ID of an entity kind, or None
+        (id_registry.IdRegistry.resolve over the compiled alias table).
+        """
+        row = self._probe(f"{kind}.alias", key)
+        if row < 0:
+            return None
+        return self.value(self._sections[f"{kind}.alias.target"][row])
+
+    def _probe(self, prefix: str, key: Any) -> int:
+        try:
+            text = json.dumps(key).encode("utf-8")
+        except TypeError:
+            return -1
+        table = self._sections[f"{prefix}.index"]
+        keys = self._sections[f"{prefix}.key"]
+        mask = len(table) - 1
+        slot = _key_hash(text) & mask
+        while True:
+            row = table[slot]
+            if row == -1:
+                return -1
+            if self._value_text(keys[row]) == text:
+                return row
+            slot = (slot + 1) & mask
+
+    def contributions(self, kind: str, row: int) -> range:
+        start = self._sections[f"{kind}.start"][row]
+        return range(start, start + self._sections[f"{kind}.count"][row])
+
+    def instance(self, contrib: int, source: Any) -> Dict[str, Any]:
+        return {
+            "effect_id": self.value(self._sections["contrib.effect"][contrib]),
+            "source": source,
+            "timing": self.value(self._sections["contrib.timing"][contrib]),
+            "target": self.value(self._sections["contrib.target"][contrib]),
+            "duration_seconds": self.value(self._sections["contrib.duration"][contrib]),
+        }
+
+
+_MISSING = object()
+
+
+# ---------- Evaluation over a view ----------
+
+
+def aggregate_effects_view(build: Dict[str, Any], view: DataCenterView) -> List[Dict[str, Any]]:
+    """
+    Same result as compute_pillars.aggregate_effects(build, data), using the image.
+    """
+    results: List[Dict[str, Any]] = []
+
+    bars = build.get("bars", {}) or {}
+    for bar_name in ("front", "back"):
+        for slot in bars.get(bar_name, []):
+            if not isinstance(slot, dict):
+                continue
+            skill_id = slot.get("skill_id")
+            if not skill_id:
+                continue
+            row = view.lookup("skills", skill_id)
+            if row < 0:
+                skill_id = view.resolve("skills", skill_id) or skill_id
+                row = view.lookup("skills", skill_id)
+            if row < 0:
+                continue
+            for contrib in view.contributions("skills", row):
+                results.append(view.instance(contrib, skill_id))
+
+    # Pieces listed under a legacy ID count towards the canonical set.
+    set_rows: Dict[Any, int] = {}
+    piece_counts: Dict[Any, int] = {}
+    for set_id, count in compute_pillars.compute_set_piece_counts(build).items():
+        row = view.lookup("sets", set_id)
+        if row < 0:
+            set_id = view.resolve("sets", set_id) or set_id
+            row = view.lookup("sets", set_id)
+        set_rows[set_id] = row
+        piece_counts[set_id] = piece_counts.get(set_id, 0) + count
+
+    pieces = view.section("contrib.pieces")
+    for set_id, count in piece_counts.items():
+        row = set_rows[set_id]
+        if row < 0:
+            continue
+        for contrib in view.contributions("sets", row):
+            if count >= pieces[contrib]:
+                results.append(view.instance(contrib, set_id))
+
+    cp_slotted = build.get("cp_slotted", {}) or {}
+    for tree_name in ("warfare", "fitness", "craft"):
+        for cp_id in cp_slotted.get(tree_name, []):
+            if not cp_id:
+                continue
+            row = view.lookup("cp_stars", cp_id)
+            if row < 0:
+                cp_id = view.resolve("cp_stars", cp_id) or cp_id
+                row = view.lookup("cp_stars", cp_id)
+            if row < 0:
+                continue
+            for contrib in view.contributions("cp_stars", row):
+                results.append(view.instance(contrib, cp_id))
+
+    return results
+
+
+def compute_pillars_view(build: Dict[str, Any], view: DataCenterView) -> Dict[str, Any]:
+    """
+    Same result as compute_pillars.compute_pillars(build, data), using the image.
+    """
+    split = compute_pillars.split_active_inactive(aggregate_effects_view(build, view))
+    effects_index = view.effects_index
+    pillars_cfg = build.get("pillars", {}) or {}
+
+    states: Dict[str, Dict[str, Any]] = {}
+    for state in ("inactive", "active"):
+        effects = split[state]
+        states[state] = {
+            "resist": compute_pillars.evaluate_resist_pillar(
+                build, effects, effects_index, pillars_cfg.get("resist", {}) or {}
+            ),
+            "health": compute_pillars.evaluate_health_pillar(
+                build, effects, effects_index, pillars_cfg.get("health", {}) or {}
+            ),
+            "speed": compute_pillars.evaluate_speed_pillar(
+                build, effects, effects_index, pillars_cfg.get("speed", {}) or {}
+            ),
+            "hots": compute_pillars.evaluate_hots_pillar(
+                build, effects, effects_index, pillars_cfg.get("hots", {}) or {}
+            ),
+            "shield": compute_pillars.evaluate_shield_pillar(
+                build, effects, effects_index, pillars_cfg.get("shield", {}) or {}
+            ),
+        }
+
+    pillars: Dict[str, Any] = {
+        name: {"inactive": states["inactive"][name], "active": states["active"][name]}
+        for name in ("resist", "health", "speed", "hots", "shield")
+    }
+    pillars["core_combo"] = compute_pillars.evaluate_core_combo_pillar(
+        build, pillars_cfg.get("core_combo", {}) or {}
+    )
+    return {"build_id": build.get("id"), "pillars": pillars}
+
+
+# ---------- Publishing and attaching ----------
+
+
+def publish_shared(image: bytes, name: Optional[str] = None) -> shared_memory.SharedMemory:
+    """
+    Copy an image into a new shared-memory block. The caller owns the block
+    and must close() and unlink() it when the workers are done.
+    """
+    shm = shared_memory.SharedMemory(name=name, create=True, size=max(1, len(image)))
+    shm.buf[: len(image)] = image
+    return shm
+
+
+def attach_shared(name: str) -> DataCenterView:
+    """
+    Attach read-only to a published image from any process.
+
+    Only the publisher owns the block (and unlinks it), so the attaching
+    process must stay out of the shared-memory resource tracker: a tracker
+    of its own would unlink the block when the process exits.
+    """
+    if sys.version_info >= (3, 13):
+        shm = shared_memory.SharedMemory(name=name, track=False)
+    else:
+        shm = _attach_untracked(name)
+    return DataCenterView(shm.buf, keepalive=shm)
+
+
+def _attach_untracked(name: str) -> shared_memory.SharedMemory:
+    # What track=False does on 3.13+: skip the register() call. Unregistering
+    # afterwards is not equivalent: pool workers share the publisher's
+    # tracker, which keeps one entry per name, so that would drop the
+    # publisher's registration (and the tracker fails on its unlink()).
+    from multiprocessing import resource_tracker
+
+    register = resource_tracker.register
+    resource_tracker.register = lambda *args: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+def write_image(image: bytes, path: Path) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_bytes(image)
+    os.replace(tmp_path, path)
+    return path
+
+
+def attach_file(path: Path) -> DataCenterView:
+    """
+    Memory-map an image file read-only; pages are shared via the page cache.
+    """
+    with path.open("rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return DataCenterView(mapped, keepalive=mapped)
+
+
+# ---------- Process pool ----------
+
+_worker_view: Optional[DataCenterView] = None
+
+
+def _init_worker(shm_name: Optional[str], image_path: Optional[str]) -> None:
+    global _worker_view
+    if shm_name is not None:
+        _worker_view = attach_shared(shm_name)
+    else:
+        _worker_view = attach_file(Path(image_path))
+
+
+def _worker_compute(build: Dict[str, Any]) -> Dict[str, Any]:
+    assert _worker_view is not None, "worker not initialised"
+    return compute_pillars_view(build, _worker_view)
+
+
+def compute_pillars_pool(
+    builds: List[Dict[str, Any]],
+    data: Dict[str, Any],
+    workers: int,
+    chunksize: int = 16,
+) -> List[Dict[str, Any]]:
+    """
+    Evaluate builds over a process pool whose workers share one compiled image.
+    """
+    shm = publish_shared(compile_data_center(data))
+    try:
+        with multiprocessing.Pool(
+            processes=workers,
+            initializer=_init_worker,
+            initargs=(shm.name, None),
+        ) as pool:
+            return pool.map(_worker_compute, builds, chunksize=chunksize)
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+# ---------- CLI ----------
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Compile the data center into a shareable image or evaluate builds over it."
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    comp = sub.add_parser("compile", help="Write a compiled data-center image file.")
+    comp.add_argument("--out", type=str, required=True, help="Image output path.")
+
+    pil = sub.add_parser("pillars", help="Compute pillars for builds over a shared image.")
+    pil.add_argument("build_paths", nargs="+", help="Build JSON files.")
+    pil.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    pil.add_argument("--image", type=str, default=None, help="Use an existing image file instead of data/.")
+
+    args = parser.parse_args()
+    data = compute_pillars.load_all_data(str(REPO_ROOT))
+
+    if args.command == "compile":
+        image = compile_data_center(data)
+        path = write_image(image, Path(args.out))
+        view = DataCenterView(image)
+        print(
+            json.dumps(
+                {"status": "OK", "image_path": str(path), "bytes": len(image), "counts": view.counts},
+                indent=2,
+            )
+        )
+        return 0
+
+    builds = [compute_pillars.load_json(p) for p in args.build_paths]
+    if args.image:
+        with multiprocessing.Pool(
+            processes=args.workers,
+            initializer=_init_worker,
+            initargs=(None, args.image),
+        ) as pool:
+            results = pool.map(_worker_compute, builds)
+    else:
+        results = compute_pillars_pool(builds, data, args.workers)
+
+    json.dump(results, sys.stdout, indent=2, sort_keys=True)
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
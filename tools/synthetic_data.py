@@ -0,0 +1,511 @@
+#!/usr/bin/env python3
+"""
+tools/synthetic_data.py
+
+Deterministic synthetic data generator for benchmarking the ESO Build Engine.
+
+The canonical data center only holds a handful of records (12 skills,
+21 effects, 4 sets, 10 CP stars), which is too small to show how the tools
+scale. This module generates v1 Data Model shaped data at any multiple of
+that size:
+
+- generate_data_center(scale, seed) -> dict shaped like load_all_data():
+  { "skills": {...}, "effects": {...}, "sets": {...}, "cp_stars": {...} }
+  - effects across all pillar stats (resist, health, speed, hots, shields)
+    plus non-pillar stats, with buff./debuff./shield./hot. prefixes.
+  - skills (active/passive/ultimate) whose effects use every timing
+    (on_hit, on_cast, while_active, passive, on_block).
+  - sets with 2-5 piece bonuses referencing effect IDs.
+  - CP stars spread across warfare/fitness/craft.
+- generate_build(data, seed, index) -> a build that passes
+  tools/validate_build.py against the generated data.
+- generate_snapshot(kind, count, seed) -> an external UESP-like snapshot
+  payload for the importers (skills / sets / cp_stars).
+
+The same (scale, seed) always yields byte-identical output.
+
+Usage:
+
+    python tools/synthetic_data.py --scale 100 --seed 7 --out-dir /tmp/dc100 --builds 50
+
+Writes data/*.json style files into <out-dir>/data and builds into
+<out-dir>/builds. Never writes into the repository data/ or builds/ folders.
+"""
+
+import argparse
+import json
+import random
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Canonical data-center sizes at scale 1 (mirrors data/*.json).
+BASE_COUNTS = {
+    "skills": 12,
+    "effects": 21,
+    "sets": 4,
+    "cp_stars": 10,
+}
+
+EFFECT_TIMINGS = ["on_hit", "on_cast", "while_active", "passive", "on_block"]
+EFFECT_TARGETS = ["self", "self_area", "group", "enemy"]
+CP_TREES = ["warfare", "fitness", "craft"]
+BAR_SLOTS = ["1", "2", "3", "4", "5", "ULT"]
+GEAR_SLOTS = [
+    "head",
+    "shoulder",
+    "chest",
+    "hands",
+    "waist",
+    "legs",
+    "feet",
+    "neck",
+    "ring1",
+    "ring2",
+    "front_weapon",
+    "back_weapon",
+]
+ARMOR_SLOTS = {"head", "shoulder", "chest", "hands", "waist", "legs", "feet"}
+
+# (id prefix, stat, magnitude_kind, magnitude range) per effect family.
+EFFECT_FAMILIES = [
+    ("buff.", "resistance_flat", "flat", (660, 5948)),
+    ("debuff.", "resistance_flat", "flat", (-5948, -660)),
+    ("buff.", "maxhealth", "flat", (500, 3000)),
+    ("buff.", "movement_speed_scalar", "scalar", (0.05, 0.3)),
+    ("buff.", "movement_speed_out_of_combat_scalar", "scalar", (0.1, 0.3)),
+    ("buff.", "mounted_speed_scalar", "scalar", (0.1, 0.5)),
+    ("hot.", "hot", "flat", (0.5, 1.5)),
+    ("shield.", "shield", "flat", (0.5, 1.5)),
+    ("buff.", "damage_taken_scalar", "scalar", (-0.1, -0.02)),
+    ("buff.", "resource_gain", "flat", (0.5, 1.5)),
+]
+
+NAME_WORDS = [
+    "frost",
+    "ember",
+    "storm",
+    "bone",
+    "soul",
+    "glacial",
+    "vigor",
+    "barrier",
+    "fissure",
+    "netch",
+    "dragon",
+    "marshal",
+    "warden",
+    "rider",
+    "hunt",
+    "pariah",
+    "bulwark",
+    "flare",
+]
+
+
+# ---------- Helpers ----------
+
+
+def scaled_count(kind: str, scale: int) -> int:
+    return max(1, BASE_COUNTS[kind] * max(1, int(scale)))
+
+
+def make_name(rng: random.Random, index: int) -> str:
+    """
+    Build a human-ish name that is unique per index, e.g. "Glacial Rider 17".
+    """
+    first = rng.choice(NAME_WORDS).capitalize()
+    second = rng.choice(NAME_WORDS).capitalize()
+    return f"{first} {second} {index}"
+
+
+def to_id_base(name: str) -> str:
+    return name.strip().lower().replace(" ", "_")
+
+
+# ---------- Data center ----------
+
+
+def generate_effects(rng: random.Random, count: int) -> List[Dict[str, Any]]:
+    effects: List[Dict[str, Any]] = []
+    for idx in range(count):
+        prefix, stat, kind, (low, high) = EFFECT_FAMILIES[idx % len(EFFECT_FAMILIES)]
+        tier = rng.choice(["Major", "Minor"])
+        name = f"{tier} {make_name(rng, idx)}"
+        if kind == "flat" and abs(high) > 10:
+            value: Any = rng.randint(int(low), int(high))
+        else:
+            value = round(rng.uniform(low, high), 3)
+        effects.append(
+            {
+                "id": f"{prefix}{to_id_base(name)}",
+                "name": name,
+                "category": "modifier",
+                "scope": "target" if prefix == "debuff." else "self",
+                "stat": stat,
+                "magnitude_kind": kind,
+                "magnitude_value": value,
+                "stacking_rule": "exclusive_tier",
+                "stacks_with": [],
+                "description": f"Synthetic {stat} effect ({value}).",
+            }
+        )
+    return effects
+
+
+def generate_skills(
+    rng: random.Random,
+    count: int,
+    effect_ids: List[str],
+) -> List[Dict[str, Any]]:
+    skills: List[Dict[str, Any]] = []
+    for idx in range(count):
+        name = make_name(rng, idx)
+        # Keep roughly the canonical mix: mostly actives, some ultimates/passives.
+        roll = idx % 6
+        if roll == 0:
+            skill_type = "ultimate"
+        elif roll == 1:
+            skill_type = "passive"
+        else:
+            skill_type = "active"
+
+        skill_effects: List[Dict[str, Any]] = []
+        for e_idx in range(rng.randint(0, 3)):
+            timing = EFFECT_TIMINGS[(idx + e_idx) % len(EFFECT_TIMINGS)]
+            skill_effects.append(
+                {
+                    "effect_id": rng.choice(effect_ids),
+                    "timing": timing,
+                    "duration_seconds": rng.choice([None, 5, 10, 20, 30]),
+                    "target": rng.choice(EFFECT_TARGETS),
+                    "notes": "Synthetic effect instance.",
+                }
+            )
+
+        skills.append(
+            {
+                "id": f"skill.{to_id_base(name)}",
+                "name": name,
+                "class_id": rng.choice(["warden", "necromancer", "dragonknight"]),
+                "skill_line_id": f"synthetic_line_{idx % 9}",
+                "type": skill_type,
+                "resource": rng.choice(["magicka", "stamina", "health"]),
+                "cost": rng.choice([None, 2700, 2984, 3510]),
+                "cast_time": "instant",
+                "target": rng.choice(["self", "area", "enemy"]),
+                "duration_seconds": rng.choice([None, 5, 10, 20]),
+                "radius_meters": rng.choice([None, 6, 8, 20]),
+                "ability_id": None,
+                "external_ids": {"uesp": None},
+                "tooltip_effect_text": (
+                    f"{name} grants {len(skill_effects)} synthetic effects."
+                ),
+                "effects": skill_effects,
+            }
+        )
+    return skills
+
+
+def generate_sets(
+    rng: random.Random,
+    count: int,
+    effect_ids: List[str],
+) -> List[Dict[str, Any]]:
+    sets: List[Dict[str, Any]] = []
+    for idx in range(count):
+        name = make_name(rng, idx)
+        bonuses: List[Dict[str, Any]] = []
+        for pieces in range(2, 6):
+            bonus_effects = [
+                rng.choice(effect_ids) for _ in range(rng.randint(0, 2))
+            ]
+            bonuses.append(
+                {
+                    "pieces": pieces,
+                    "tooltip_raw": f"{pieces}-piece bonus of {name}.",
+                    "effects": bonus_effects,
+                }
+            )
+        sets.append(
+            {
+                "id": f"set.{to_id_base(name)}",
+                "name": name,
+                "type": rng.choice(["armor", "weapon", "jewelry"]),
+                "source": rng.choice(["crafted", "overland", "dungeon", "trial"]),
+                "tags": rng.sample(["pvp", "tank", "speed", "healer"], 2),
+                "set_id": None,
+                "external_ids": {"eso_sets_api": None},
+                "bonuses": bonuses,
+            }
+        )
+    return sets
+
+
+def generate_cp_stars(
+    rng: random.Random,
+    count: int,
+    effect_ids: List[str],
+) -> List[Dict[str, Any]]:
+    stars: List[Dict[str, Any]] = []
+    for idx in range(count):
+        name = make_name(rng, idx)
+        stars.append(
+            {
+                "id": f"cp.{to_id_base(name)}",
+                "name": name,
+                "tree": CP_TREES[idx % len(CP_TREES)],
+                "slot_type": "slottable" if idx % 4 else "passive",
+                "tooltip_raw": f"Synthetic Champion Point star {name}.",
+                "effects": [rng.choice(effect_ids) for _ in range(rng.randint(0, 2))],
+            }
+        )
+    return stars
+
+
+def generate_data_center(scale: int = 1, seed: int = 0) -> Dict[str, Any]:
+    """
+    Generate a full v1 data center at scale x the canonical record counts.
+    """
+    rng = random.Random(f"data-center:{scale}:{seed}")
+
+    effects = generate_effects(rng, scaled_count("effects", scale))
+    effect_ids = [e["id"] for e in effects]
+
+    return {
+        "skills": {"skills": generate_skills(rng, scaled_count("skills", scale), effect_ids)},
+        "effects": {"effects": effects},
+        "sets": {"sets": generate_sets(rng, scaled_count("sets", scale), effect_ids)},
+        "cp_stars": {
+            "cp_stars": generate_cp_stars(rng, scaled_count("cp_stars", scale), effect_ids)
+        },
+    }
+
+
+# ---------- Builds ----------
+
+
+def generate_build(data: Dict[str, Any], seed: int = 0, index: int = 0) -> Dict[str, Any]:
+    """
+    Generate a random build that passes validate_build against `data`.
+    """
+    rng = random.Random(f"build:{seed}:{index}")
+
+    skills = data["skills"]["skills"]
+    sets = data["sets"]["sets"]
+    cp_stars = data["cp_stars"]["cp_stars"]
+
+    ultimates = [s["id"] for s in skills if s.get("type") == "ultimate"]
+    regulars = [s["id"] for s in skills if s.get("type") != "ultimate"]
+    all_skill_ids = [s["id"] for s in skills]
+    ultimates = ultimates or all_skill_ids
+    regulars = regulars or all_skill_ids
+
+    bars: Dict[str, List[Dict[str, Any]]] = {}
+    slotted: List[str] = []
+    for bar_name in ("front", "back"):
+        bar_slots: List[Dict[str, Any]] = []
+        for slot in BAR_SLOTS:
+            pool = ultimates if slot == "ULT" else regulars
+            skill_id = rng.choice(pool)
+            slotted.append(skill_id)
+            bar_slots.append({"slot": slot, "skill_id": skill_id})
+        bars[bar_name] = bar_slots
+
+    # Concentrate gear into a few sets so multi-piece bonuses activate.
+    set_ids = [s["id"] for s in sets]
+    build_sets = rng.sample(set_ids, min(3, len(set_ids)))
+    gear: List[Dict[str, Any]] = []
+    for slot in GEAR_SLOTS:
+        gear.append(
+            {
+                "slot": slot,
+                "set_id": rng.choice(build_sets),
+                "weight": rng.choice(["light", "medium", "heavy"]) if slot in ARMOR_SLOTS else None,
+                "trait": rng.choice(["reinforced", "impenetrable", "swift", "defending"]),
+                "enchant": rng.choice(["glyph.max_magicka", "glyph.max_health"]),
+            }
+        )
+
+    cp_slotted: Dict[str, List[Any]] = {}
+    for tree_name in CP_TREES:
+        tree_ids = [c["id"] for c in cp_stars if c.get("tree") == tree_name]
+        picked = rng.sample(tree_ids, min(4, len(tree_ids)))
+        cp_slotted[tree_name] = picked + [None] * (4 - len(picked))
+
+    return {
+        "id": f"build.synthetic_{seed}_{index}",
+        "name": f"Synthetic Build {seed}-{index}",
+        "class_core": "warden",
+        "sub_classes": [],
+        "cp_total": 1800,
+        "role_tags": ["synthetic"],
+        "attributes": {"health": 64, "magicka": 0, "stamina": 0},
+        "pillars": {
+            "resist": {"target_resist_shown": rng.choice([20000, 33000, 43000])},
+            "health": {"focus": "health_first"},
+            "speed": {"profile": "extreme_speed"},
+            "hots": {"min_active_hots": rng.randint(0, 3)},
+            "shield": {"min_active_shields": rng.randint(0, 3)},
+            "core_combo": {"skills": rng.sample(slotted, 3)},
+        },
+        "bars": bars,
+        "gear": gear,
+        "cp_slotted": cp_slotted,
+    }
+
+
+def generate_builds(data: Dict[str, Any], count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    return [generate_build(data, seed, idx) for idx in range(count)]
+
+
+# ---------- External snapshots (importer input) ----------
+
+
+def generate_snapshot(kind: str, count: int, seed: int = 0) -> Dict[str, Any]:
+    """
+    Generate an external UESP-like snapshot payload for one importer.
+
+    kind is one of "skills", "sets", "cp_stars".
+    """
+    rng = random.Random(f"snapshot:{kind}:{seed}")
+    rows: List[Dict[str, Any]] = []
+
+    for idx in range(count):
+        name = make_name(rng, idx)
+        if kind == "skills":
+            rows.append(
+                {
+                    "abilityId": 100000 + idx,
+                    "internalName": name,
+                    "classTag": rng.choice(["warden", "necromancer", "dragonknight"]),
+                    "skillLineTag": f"synthetic_line_{idx % 9}",
+                    "mechanicType": rng.choice(["magicka", "stamina", "health"]),
+                    "baseCost": rng.choice([2700, 2984, 3510]),
+                    "castTimeType": rng.choice(["instant", "channeled", "cast_time"]),
+                    "targetType": rng.choice(["enemy_area", "self_area", "enemy", "self"]),
+                    "baseDurationSeconds": float(rng.choice([5, 10, 20])),
+                    "radiusMeters": float(rng.choice([6, 8, 20])),
+                    "isUltimate": idx % 6 == 0,
+                    "isPassive": idx % 6 == 1,
+                    "rawTooltipText": f"{name} applies Major Resolve and Minor Breach.",
+                    "sourceTag": "synthetic",
+                }
+            )
+        elif kind == "sets":
+            rows.append(
+                {
+                    "setId": 1000 + idx,
+                    "setName": name,
+                    "setType": rng.choice(["armor", "weapon", "jewelry"]),
+                    "setSource": rng.choice(["overland", "dungeon", "crafted"]),
+                    "setTags": rng.sample(["pvp", "tank", "speed", "healer"], 2),
+                    "bonusRows": [
+                        {
+                            "piecesRequired": pieces,
+                            "bonusTooltipRaw": f"Adds {pieces * 600} Maximum Health.",
+                            "bonusEffectIdentifiers": [],
+                        }
+                        for pieces in range(2, 6)
+                    ],
+                }
+            )
+        elif kind == "cp_stars":
+            rows.append(
+                {
+                    "cpId": 1 + idx,
+                    "cpName": name,
+                    "cpTree": CP_TREES[idx % len(CP_TREES)],
+                    "slotType": "slottable" if idx % 4 else "passive",
+                    "cpTooltipRaw": f"Increases your Movement Speed by {idx % 10 + 1}%.",
+                    "cpTags": ["synthetic"],
+                    "cpEffectIdentifiers": [],
+                }
+            )
+        else:
+            raise ValueError(f"Unknown snapshot kind: {kind!r}")
+
+    return {kind: rows}
+
+
+# ---------- Writers ----------
+
+
+def write_data_center(data: Dict[str, Any], out_dir: Path) -> Path:
+    """
+    Write a generated data center as <out_dir>/data/{skills,effects,sets,cp-stars}.json.
+    """
+    data_dir = out_dir / "data"
+    data_dir.mkdir(parents=True, exist_ok=True)
+    file_names = {
+        "skills": "skills.json",
+        "effects": "effects.json",
+        "sets": "sets.json",
+        "cp_stars": "cp-stars.json",
+    }
+    for key, file_name in file_names.items():
+        with (data_dir / file_name).open("w", encoding="utf-8") as f:
+            json.dump(data[key], f, indent=2, ensure_ascii=False)
+    return data_dir
+
+
+def write_builds(builds: List[Dict[str, Any]], out_dir: Path) -> List[Path]:
+    builds_dir = out_dir / "builds"
+    builds_dir.mkdir(parents=True, exist_ok=True)
+    paths: List[Path] = []
+    for idx, build in enumerate(builds):
+        path = builds_dir / f"synthetic-{idx:05d}.json"
+        with path.open("w", encoding="utf-8") as f:
+            json.dump(build, f, indent=2, ensure_ascii=False)
+        paths.append(path)
+    return paths
+
+
+# ---------- CLI ----------
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Generate a deterministic synthetic ESO data center (and builds) "
+            "at N x the canonical data size."
+        )
+    )
+    parser.add_argument("--scale", type=int, default=10, help="Multiple of the canonical record counts.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (same seed, same output).")
+    parser.add_argument("--builds", type=int, default=0, help="Number of random valid builds to write.")
+    parser.add_argument(
+        "--out-dir",
+        type=str,
+        required=True,
+        help="Output directory; data/ and builds/ are created beneath it.",
+    )
+    args = parser.parse_args()
+
+    out_dir = Path(args.out_dir)
+    data = generate_data_center(args.scale, args.seed)
+    data_dir = write_data_center(data, out_dir)
+    build_paths = write_builds(generate_builds(data, args.builds, args.seed), out_dir)
+
+    print(
+        json.dumps(
+            {
+                "status": "OK",
+                "scale": args.scale,
+                "seed": args.seed,
+                "data_dir": str(data_dir),
+                "counts": {
+                    "skills": len(data["skills"]["skills"]),
+                    "effects": len(data["effects"]["effects"]),
+                    "sets": len(data["sets"]["sets"]),
+                    "cp_stars": len(data["cp_stars"]["cp_stars"]),
+                },
+                "builds_written": len(build_paths),
+            },
+            indent=2,
+        )
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+tools/tooltip_effects.py
+
+Tooltip → effect ID extraction for the import tools
+(import_skills_from_uesp.py, import_sets_from_uesp.py, import_cp_from_uesp.py).
+
+Every effect `name` in data/effects.json ("Major Resolve", "Minor Breach",
+...) plus the synonyms in data/effect-synonyms.json are compiled into one
+Aho–Corasick automaton. Each tooltip is then scanned once, in time linear in
+its length no matter how many effect names there are, and every hit becomes
+a proposal for review:
+
+    "effect_proposals": [
+      {
+        "effect_id": "debuff.major_breach",
+        "text": "Major Breach",
+        "span": [42, 54],
+        "via": "name"
+      }
+    ]
+
+Matching is case-insensitive and only accepts whole words; overlapping hits
+resolve leftmost-longest ("Major Resolve" wins over a "Resolve" synonym).
+
+Proposals never go into effects[] on their own: they land in
+effect_proposals (on the record, or on each set bonus), which
+tools/promote_preview.py strips during promotion.
+
+synonyms file shape:
+
+    {
+      "synonyms": {
+        "debuff.major_breach": ["Major Fracture"],
+        ...
+      }
+    }
+
+Usage:
+
+    python tools/tooltip_effects.py "Applies Major Breach and Minor Fracture to enemies hit."
+"""
+
+import argparse
+import json
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DATA_DIR = REPO_ROOT / "data"
+SYNONYMS_FILE = "effect-synonyms.json"
+
+# Normalized record field holding tooltip text, per import kind. Sets keep
+# their text per bonus tier (bonuses[*].tooltip_raw).
+TOOLTIP_FIELDS: Dict[str, str] = {
+    "skills": "tooltip_effect_text",
+    "sets": "tooltip_raw",
+    "cp_stars": "tooltip_raw",
+}
+
+
+def load_json(path: Path) -> Any:
+    with path.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def fold_case(text: str) -> str:
+    """
+    Lowercase without changing the length, so spans index the original text.
+    """
+    folded = text.lower()
+    if len(folded) == len(text):
+        return folded
+    return "".join(c.lower() if len(c.lower()) == 1 else c for c in text)
+
+
+# ---------- Automaton ----------
+
+
+class AhoCorasick:
+    """
+    Multi-pattern matcher: all occurrences of all patterns in one pass.
+
+        automaton = AhoCorasick(["major breach", "breach"])
+        list(automaton.iter_matches("major breach"))
+        # [(0, 12, 0), (6, 12, 1)]   (start, end, pattern index)
+
+    Patterns and text are compared as given; callers fold case beforehand.
+    """
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        self.patterns: List[str] = list(patterns)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+
+        for p_idx, pattern in enumerate(self.patterns):
+            if not pattern:
+                continue
+            state = 0
+            for ch in pattern:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            self._out[state].append(p_idx)
+
+        # Breadth-first failure links; each state also reports the patterns
+        # of its failure chain.
+        queue: Deque[int] = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        patterns = self.patterns
+        state = 0
+        for pos, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                end = pos + 1
+                for p_idx in out[state]:
+                    yield end - len(patterns[p_idx]), end, p_idx
+
+
+# ---------- Extractor ----------
+
+
+def _is_word_boundary(text: str, start: int, end: int) -> bool:
+    before = text[start - 1] if start > 0 else " "
+    after = text[end] if end < len(text) else " "
+    return not before.isalnum() and not after.isalnum()
+
+
+class TooltipEffectExtractor:
+    """
+    Propose effect IDs for tooltip text.
+
+        extractor = TooltipEffectExtractor.from_data_dir(DATA_DIR)
+        extractor.extract("Applies Major Breach to enemies hit.")
+        record = extractor.annotate(record, "skills")
+    """
+
+    def __init__(
+        self,
+        effects: List[Dict[str, Any]],
+        synonyms: Optional[Dict[str, List[str]]] = None,
+    ) -> None:
+        # folded pattern -> [(effect_id, via), ...]; several effects may share a name.
+        targets: Dict[str, List[Tuple[str, str]]] = {}
+
+        def add(text: Any, effect_id: str, via: str) -> None:
+            if not isinstance(text, str) or not text.strip():
+                return
+            entries = targets.setdefault(fold_case(text.strip()), [])
+            if all(effect_id != existing for existing, _ in entries):
+                entries.append((effect_id, via))
+
+        for effect in effects:
+            if isinstance(effect, dict) and isinstance(effect.get("id"), str):
+                add(effect.get("name"), effect["id"], "name")
+        for effect_id, names in (synonyms or {}).items():
+            for name in names:
+                add(name, effect_id, "synonym")
+
+        self._targets = list(targets.values())
+        self.automaton = AhoCorasick(targets.keys())
+
+    @classmethod
+    def from_data_dir(cls, data_dir: Path = DATA_DIR) -> "TooltipEffectExtractor":
+        effects_data = load_json(data_dir / "effects.json")
+        effects = effects_data.get("effects", []) if isinstance(effects_data, dict) else effects_data
+        synonyms: Dict[str, List[str]] = {}
+        synonyms_path = data_dir / SYNONYMS_FILE
+        if synonyms_path.exists():
+            synonyms = load_json(synonyms_path).get("synonyms", {})
+        return cls(effects, synonyms)
+
+    def extract(self, text: Any) -> List[Dict[str, Any]]:
+        """
+        Leftmost-longest, non-overlapping, whole-word effect mentions in text.
+        """
+        if not isinstance(text, str) or not text:
+            return []
+
+        hits = [
+            (start, end, p_idx)
+            for start, end, p_idx in self.automaton.iter_matches(fold_case(text))
+            if _is_word_boundary(text, start, end)
+        ]
+        hits.sort(key=lambda hit: (hit[0], -(hit[1] - hit[0])))
+
+        proposals: List[Dict[str, Any]] = []
+        covered = 0
+        for start, end, p_idx in hits:
+            if start < covered:
+                continue
+            covered = end
+            for effect_id, via in self._targets[p_idx]:
+                proposals.append(
+                    {
+                        "effect_id": effect_id,
+                        "text": text[start:end],
+                        "span": [start, end],
+                        "via": via,
+                    }
+                )
+        return proposals
+
+    def annotate(self, record: Dict[str, Any], kind: str) -> Dict[str, Any]:
+        """
+        Return a copy of a normalized record with effect_proposals filled in
+        (on each bonus tier for sets).
+        """
+        field = TOOLTIP_FIELDS[kind]
+        if kind != "sets":
+            return dict(record, effect_proposals=self.extract(record.get(field)))
+
+        bonuses = record.get("bonuses")
+        if not isinstance(bonuses, list):
+            return record
+        return dict(
+            record,
+            bonuses=[
+                dict(bonus, effect_proposals=self.extract(bonus.get(field))) if isinstance(bonus, dict) else bonus
+                for bonus in bonuses
+            ],
+        )
+
+
+# ---------- CLI ----------
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Show effect proposals for tooltip text.")
+    parser.add_argument("texts", nargs="+", help="Tooltip text(s) to scan.")
+    parser.add_argument("--data-dir", type=str, default=str(DATA_DIR), help="Directory with effects.json.")
+    args = parser.parse_args()
+
+    extractor = TooltipEffectExtractor.from_data_dir(Path(args.data_dir))
+    print(
+        json.dumps(
+            [{"text": text, "effect_proposals": extractor.extract(text)} for text in args.texts],
+            indent=2,
+            ensure_ascii=False,
+        )
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,7 +1,11 @@
+import hashlib
 import json
 import sys
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
+
+import build_rules
+import id_registry
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
 DATA_DIR = REPO_ROOT / "data"
@@ -13,216 +17,13 @@ def load_json(path: Path) -> Any:
         return json.load(f)
 
 
-def collect_ids(items: List[Dict[str, Any]], key: str) -> List[str]:
-    return [item[key] for item in items if key in item]
-
-
 def validate_build_structure(build: Dict[str, Any]) -> List[Dict[str, Any]]:
     """
-    Structural checks only, matching docs/ESO-Build-Engine-Global-Rules.md v1.
+    Structural checks only, matching docs/ESO-Build-Engine-Global-Rules.md v1
+    (build_rules.GLOBAL_RULES).
     """
-    errors: List[Dict[str, Any]] = []
-
-    # Basic identity
-    if "id" not in build:
-        errors.append({"field": "id", "message": "Missing build.id"})
-    if "name" not in build:
-        errors.append({"field": "name", "message": "Missing build.name"})
-
-    # Bars structure
-    bars = build.get("bars")
-    if bars is None:
-        errors.append({"field": "bars", "message": "Missing build.bars"})
-    else:
-        for bar_name in ("front", "back"):
-            if bar_name not in bars:
-                errors.append(
-                    {"field": f"bars.{bar_name}", "message": f"Missing {bar_name} bar"}
-                )
-                continue
-
-            bar_slots = bars[bar_name]
-            if not isinstance(bar_slots, list):
-                errors.append(
-                    {
-                        "field": f"bars.{bar_name}",
-                        "message": f"Expected list of slots for bar '{bar_name}'",
-                    }
-                )
-                continue
-
-            # Allowed slots are "1"–"5" and "ULT" as strings.
-            seen_slots = set()
-            for idx, slot in enumerate(bar_slots):
-                field_prefix = f"bars.{bar_name}[{idx}]"
-
-                # Slot presence and type
-                raw_slot = slot.get("slot")
-                if raw_slot is None:
-                    errors.append(
-                        {
-                            "field": f"{field_prefix}.slot",
-                            "message": "Missing slot on bar entry",
-                        }
-                    )
-                    continue
-
-                # Normalize to string, since v1 uses string slots
-                slot_str = str(raw_slot)
-                if slot_str not in {"1", "2", "3", "4", "5", "ULT"}:
-                    errors.append(
-                        {
-                            "field": f"{field_prefix}.slot",
-                            "message": f"Invalid slot '{slot_str}', expected '1'-'5' or 'ULT'",
-                        }
-                    )
-                if slot_str in seen_slots:
-                    errors.append(
-                        {
-                            "field": f"{field_prefix}.slot",
-                            "message": f"Duplicate slot '{slot_str}' on bar '{bar_name}'",
-                        }
-                    )
-                seen_slots.add(slot_str)
-
-                # Skill ID presence (v1: skill_id)
-                if "skill_id" not in slot:
-                    errors.append(
-                        {
-                            "field": f"{field_prefix}.skill_id",
-                            "message": "Missing skill_id on bar slot",
-                        }
-                    )
-
-    # Gear structure
-    gear = build.get("gear")
-    if gear is None:
-        errors.append({"field": "gear", "message": "Missing build.gear"})
-    else:
-        if not isinstance(gear, list):
-            errors.append(
-                {"field": "gear", "message": "build.gear must be a list of items"}
-            )
-        else:
-            required_slots = {
-                "head",
-                "shoulder",
-                "chest",
-                "hands",
-                "waist",
-                "legs",
-                "feet",
-                "neck",
-                "ring1",
-                "ring2",
-                "front_weapon",
-                "back_weapon",
-            }
-            seen_gear_slots = set()
-            for idx, item in enumerate(gear):
-                slot_name = item.get("slot")
-                if slot_name is None:
-                    errors.append(
-                        {
-                            "field": f"gear[{idx}].slot",
-                            "message": "Missing gear.slot",
-                        }
-                    )
-                    continue
-
-                if slot_name not in required_slots:
-                    errors.append(
-                        {
-                            "field": f"gear[{idx}].slot",
-                            "message": f"Unexpected gear slot '{slot_name}'",
-                        }
-                    )
-
-                if slot_name in seen_gear_slots:
-                    errors.append(
-                        {
-                            "field": f"gear[{idx}].slot",
-                            "message": f"Duplicate gear slot '{slot_name}'",
-                        }
-                    )
-                seen_gear_slots.add(slot_name)
-
-                # Armor weights only on armor slots
-                if slot_name in {
-                    "head",
-                    "shoulder",
-                    "chest",
-                    "hands",
-                    "waist",
-                    "legs",
-                    "feet",
-                }:
-                    weight = item.get("weight")
-                    if weight not in {"light", "medium", "heavy"}:
-                        errors.append(
-                            {
-                                "field": f"gear[{idx}].weight",
-                                "message": f"Invalid armor weight '{weight}', expected 'light', 'medium', or 'heavy'",
-                            }
-                        )
-
-            # Check for any missing required gear slots
-            missing_slots = required_slots - seen_gear_slots
-            for slot_name in sorted(missing_slots):
-                errors.append(
-                    {
-                        "field": f"gear.{slot_name}",
-                        "message": f"Missing gear item for required slot '{slot_name}'",
-                    }
-                )
-
-    # CP layout (v1: cp_slotted)
-    cp_slotted = build.get("cp_slotted")
-    if cp_slotted is None:
-        errors.append({"field": "cp_slotted", "message": "Missing build.cp_slotted"})
-    else:
-        for tree_name in ("warfare", "fitness", "craft"):
-            stars = cp_slotted.get(tree_name)
-            if stars is None:
-                errors.append(
-                    {
-                        "field": f"cp_slotted.{tree_name}",
-                        "message": f"Missing CP tree '{tree_name}'",
-                    }
-                )
-                continue
-
-            if not isinstance(stars, list):
-                errors.append(
-                    {
-                        "field": f"cp_slotted.{tree_name}",
-                        "message": f"Expected list of CP IDs for tree '{tree_name}'",
-                        }
-                )
-                continue
-
-            if len(stars) > 4:
-                errors.append(
-                    {
-                        "field": f"cp_slotted.{tree_name}",
-                        "message": "More than 4 CP stars slotted in tree",
-                    }
-                )
-
-            seen_cp_ids = set()
-            for idx, cp_id in enumerate(stars):
-                if cp_id is None:
-                    continue
-                if cp_id in seen_cp_ids:
-                    errors.append(
-                        {
-                            "field": f"cp_slotted.{tree_name}[{idx}]",
-                            "message": f"Duplicate CP id '{cp_id}' in tree '{tree_name}'",
-                        }
-                    )
-                seen_cp_ids.add(cp_id)
-
-    return errors
+    structure_errors, _ = _STRUCTURE_VALIDATOR(build)
+    return structure_errors
 
 
 def validate_references(
@@ -230,66 +31,22 @@ def validate_references(
     skills: List[Dict[str, Any]],
     sets: List[Dict[str, Any]],
     cp_stars: List[Dict[str, Any]],
+    resolver: Optional[id_registry.IdResolver] = None,
 ) -> List[Dict[str, Any]]:
     """
     Cross-reference checks against canonical data.
-    """
-    errors: List[Dict[str, Any]] = []
-
-    skill_ids = set(collect_ids(skills, "id"))
-    set_ids = set(collect_ids(sets, "id"))
-    cp_ids = set(collect_ids(cp_stars, "id"))
 
-    # Bars -> skills
-    bars = build.get("bars", {})
-    for bar_name in ("front", "back"):
-        bar_slots = bars.get(bar_name, [])
-        if not isinstance(bar_slots, list):
-            continue
-        for idx, slot in enumerate(bar_slots):
-            skill_id = slot.get("skill_id")
-            if skill_id is None:
-                # Structural function already reports missing skill_id
-                continue
-            if skill_id not in skill_ids:
-                errors.append(
-                    {
-                        "field": f"bars.{bar_name}[{idx}].skill_id",
-                        "message": f"Unknown skill_id '{skill_id}'",
-                    }
-                )
-
-    # Gear -> sets
-    for idx, piece in enumerate(build.get("gear", [])):
-        set_id = piece.get("set_id")
-        slot_name = piece.get("slot", "?")
-        if set_id is None:
-            continue
-        if set_id not in set_ids:
-            errors.append(
-                {
-                    "field": f"gear[{idx}].set_id",
-                    "message": f"Unknown set_id '{set_id}' on slot '{slot_name}'",
-                }
-            )
+    With a resolver, IDs that are not canonical but resolve through the alias
+    registry are accepted; they are recorded in resolver.resolved instead.
+    """
+    validator = build_rules.compile_build_validator(
+        build_rules.GLOBAL_RULES, build_rules.known_ids(skills, sets, cp_stars)
+    )
+    _, reference_errors = validator(build, resolver)
+    return reference_errors
 
-    # CP slotted -> cp_stars
-    cp_slotted = build.get("cp_slotted", {})
-    for tree_name, stars in cp_slotted.items():
-        if not isinstance(stars, list):
-            continue
-        for idx, cp_id in enumerate(stars):
-            if cp_id is None:
-                continue
-            if cp_id not in cp_ids:
-                errors.append(
-                    {
-                        "field": f"cp_slotted.{tree_name}[{idx}]",
-                        "message": f"Unknown CP id '{cp_id}' in tree '{tree_name}'",
-                    }
-                )
 
-    return errors
+_STRUCTURE_VALIDATOR = build_rules.compile_build_validator(build_rules.GLOBAL_RULES)
 
 
 def unwrap_data_containers(
@@ -316,53 +73,142 @@ def unwrap_data_containers(
     return skills, sets, cp_stars
 
 
-def validate_build(build_path: Path) -> Dict[str, Any]:
-    # Load canonical data files
-    skills_data = load_json(DATA_DIR / "skills.json")
-    effects_data = load_json(DATA_DIR / "effects.json")  # reserved for future rules
-    sets_data = load_json(DATA_DIR / "sets.json")
-    cpstars_data = load_json(DATA_DIR / "cp-stars.json")
+# ---------- Compiled validators ----------
+
+
+DATA_FILES = ("skills.json", "sets.json", "cp-stars.json", id_registry.ALIASES_FILE)
+
+# Validators compiled per data hash; a corpus run compiles once.
+_VALIDATORS: Dict[str, "DataValidator"] = {}
+_MAX_VALIDATORS = 4
+# (path, size, mtime_ns) -> content hash, so unchanged files are not re-read.
+_FILE_HASHES: Dict[Tuple[str, int, int], str] = {}
 
+
+class DataValidator:
+    """
+    GLOBAL_RULES compiled against one data center, plus its alias registry
+    (compiled on the first non-canonical ID).
+    """
+
+    def __init__(self, data_dir: Path) -> None:
+        skills, sets, cp_stars = unwrap_data_containers(
+            load_json(data_dir / "skills.json"),
+            load_json(data_dir / "sets.json"),
+            load_json(data_dir / "cp-stars.json"),
+        )
+        self.validate = build_rules.compile_build_validator(
+            build_rules.GLOBAL_RULES, build_rules.known_ids(skills, sets, cp_stars)
+        )
+        self._registry_data = {
+            "skills": skills,
+            "sets": sets,
+            "cp_stars": cp_stars,
+            "id_aliases": id_registry.load_registry_file(str(data_dir)),
+        }
+        self._registry: Optional[id_registry.IdRegistry] = None
+
+    def registry(self) -> id_registry.IdRegistry:
+        if self._registry is None:
+            self._registry = id_registry.IdRegistry.from_data(self._registry_data)
+        return self._registry
+
+    def resolver(self) -> id_registry.IdResolver:
+        """
+        A fresh per-build resolver sharing the compiled registry.
+        """
+        return id_registry.IdResolver(self.registry)
+
+
+def data_hash(data_dir: Path) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for file_name in DATA_FILES:
+        path = data_dir / file_name
+        try:
+            stat = path.stat()
+        except OSError:
+            digest.update(f"{file_name}:missing;".encode("utf-8"))
+            continue
+        stamp = (str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+        file_hash = _FILE_HASHES.get(stamp)
+        if file_hash is None:
+            file_hash = hashlib.blake2b(path.read_bytes(), digest_size=16).hexdigest()
+            _FILE_HASHES[stamp] = file_hash
+        digest.update(f"{file_name}:{file_hash};".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def validator_for_data(data_dir: Path = DATA_DIR) -> DataValidator:
+    key = data_hash(data_dir)
+    validator = _VALIDATORS.get(key)
+    if validator is None:
+        if len(_VALIDATORS) >= _MAX_VALIDATORS:
+            _VALIDATORS.pop(next(iter(_VALIDATORS)))
+        validator = _VALIDATORS[key] = DataValidator(data_dir)
+    return validator
+
+
+def validate_build(build_path: Path, data_dir: Path = DATA_DIR) -> Dict[str, Any]:
+    data_validator = validator_for_data(data_dir)
     build = load_json(build_path)
 
-    # Unwrap top-level containers to lists as defined in the v1 Data Model.
-    skills, sets, cp_stars = unwrap_data_containers(skills_data, sets_data, cpstars_data)
+    # The alias registry is only compiled if a build has a non-canonical ID.
+    resolver = data_validator.resolver()
+
+    # One walk over the build: structure and reference checks together.
+    structure_errors, reference_errors = data_validator.validate(build, resolver)
+    errors: List[Dict[str, Any]] = structure_errors + reference_errors
 
-    errors: List[Dict[str, Any]] = []
-    errors.extend(validate_build_structure(build))
-    errors.extend(validate_references(build, skills, sets, cp_stars))
+    # Legacy / external IDs are valid but should be migrated.
+    warnings = [
+        {
+            "id": entry["id"],
+            "canonical": entry["canonical"],
+            "message": f"Legacy {entry['kind']} id '{entry['id']}' resolved to '{entry['canonical']}'",
+        }
+        for entry in resolver.resolved
+    ]
 
     status = "OK" if not errors else "ERROR"
 
+    # A non-object build is a structure error, not a crash.
+    fields = build if isinstance(build, dict) else {}
     result = {
-        "build_id": build.get("id"),
-        "build_name": build.get("name"),
+        "build_id": fields.get("id"),
+        "build_name": fields.get("name"),
         "build_path": str(build_path),
         "status": status,
         "error_count": len(errors),
         "errors": errors,
+        "warnings": warnings,
     }
 
     return result
 
 
 def main(argv: List[str]) -> int:
-    if len(argv) != 2:
-        print("Usage: python tools/validate_build.py builds/permafrost-marshal.json")
+    if len(argv) < 2:
+        print("Usage: python tools/validate_build.py builds/permafrost-marshal.json [more builds...]")
         return 1
 
-    build_path = Path(argv[1])
-    if not build_path.is_file():
+    build_paths = [Path(arg) for arg in argv[1:]]
+    missing = [path for path in build_paths if not path.is_file()]
+    if missing:
         print(
             json.dumps(
-                {"status": "ERROR", "message": f"Build file not found: {build_path}"}
+                {"status": "ERROR", "message": f"Build file not found: {missing[0]}"}
             )
         )
         return 1
 
-    result = validate_build(build_path)
-    print(json.dumps(result, indent=2))
-    return 0 if result["status"] == "OK" else 1
+    # Several builds share one compiled validator (one walk per build).
+    results = [validate_build(build_path) for build_path in build_paths]
+    if len(results) == 1:
+        print(json.dumps(results[0], indent=2))
+    else:
+        status = "OK" if all(result["status"] == "OK" for result in results) else "ERROR"
+        print(json.dumps({"status": status, "results": results}, indent=2))
+    return 0 if all(result["status"] == "OK" for result in results) else 1
 
 
 if __name__ == "__main__":
@@ -3,6 +3,8 @@ import json
 import sys
 from pathlib import Path
 
+from build_rules import GLOBAL_RULES, normalize_bar_slot
+
 REPO_ROOT = Path(__file__).resolve().parents[1]
 DATA_DIR = REPO_ROOT / "data"
 BUILDS_DIR = REPO_ROOT / "builds"
@@ -28,17 +30,18 @@ def validate_build_structure(build: dict) -> list[str]:
     errors: list[str] = []
 
     # Top-level keys (Phase 1: minimal but consistent with v1 model)
-    required_top = ["id", "name", "bars", "gear", "cp_slotted"]
+    required_top = list(GLOBAL_RULES["required"]) + ["bars", "gear", "cp_slotted"]
     for key in required_top:
         if key not in build:
             errors.append(f"Missing top-level key: {key}")
 
-    # Bars: front/back, slots 1–5 + ULT as array objects
+    # Bars: front/back, slots 1–5 + ULT as array objects (1 and "1" are the same slot)
+    bar_rules = GLOBAL_RULES["bars"]
     bars = build.get("bars")
     if not isinstance(bars, dict):
         errors.append("bars must be an object with 'front' and 'back' arrays")
     else:
-        for bar_name in ["front", "back"]:
+        for bar_name in bar_rules["names"]:
             if bar_name not in bars:
                 errors.append(f"Missing bar: {bar_name}")
                 continue
@@ -54,14 +57,15 @@ def validate_build_structure(build: dict) -> list[str]:
                     errors.append(f"Bar '{bar_name}' contains non-object slot entry: {entry!r}")
                     continue
                 slot = entry.get("slot")
-                if slot not in [1, 2, 3, 4, 5, "ULT"]:
+                slot_str = normalize_bar_slot(slot)
+                if slot_str not in bar_rules["slots"]:
                     errors.append(f"Bar '{bar_name}' has invalid slot value: {slot!r}")
-                if slot in seen_slots:
+                if slot_str in seen_slots:
                     errors.append(f"Bar '{bar_name}' has duplicate slot: {slot!r}")
-                seen_slots.add(slot)
+                seen_slots.add(slot_str)
 
             # Ensure at least the canonical slots exist
-            required_slots = {1, 2, 3, 4, 5, "ULT"}
+            required_slots = set(bar_rules["slots"])
             if required_slots - seen_slots:
                 missing = ", ".join(map(str, sorted(required_slots - seen_slots, key=str)))
                 errors.append(f"Bar '{bar_name}' missing required slots: {missing}")
@@ -71,20 +75,7 @@ def validate_build_structure(build: dict) -> list[str]:
     if not isinstance(gear, list):
         errors.append("gear must be a list of gear slot records")
     else:
-        required_gear_slots = {
-            "head",
-            "shoulder",
-            "chest",
-            "hands",
-            "waist",
-            "legs",
-            "feet",
-            "neck",
-            "ring1",
-            "ring2",
-            "front_weapon",
-            "back_weapon",
-        }
+        required_gear_slots = set(GLOBAL_RULES["gear"]["slots"])
         present_slots = set()
         for item in gear:
             if not isinstance(item, dict):
@@ -106,11 +97,12 @@ def validate_build_structure(build: dict) -> list[str]:
             errors.append(f"gear has unexpected slots: {extra_str}")
 
     # CP layout: cp_slotted with warfare/fitness/craft arrays of up to 4 entries
+    cp_rules = GLOBAL_RULES["cp_slotted"]
     cp_slotted = build.get("cp_slotted")
     if not isinstance(cp_slotted, dict):
         errors.append("cp_slotted must be an object with warfare/fitness/craft arrays")
     else:
-        for tree in ["warfare", "fitness", "craft"]:
+        for tree in cp_rules["trees"]:
             if tree not in cp_slotted:
                 errors.append(f"cp_slotted missing tree: {tree}")
                 continue
@@ -118,8 +110,8 @@ def validate_build_structure(build: dict) -> list[str]:
             if not isinstance(stars, list):
                 errors.append(f"cp_slotted.{tree} must be a list (up to 4 entries)")
                 continue
-            if len(stars) > 4:
-                errors.append(f"cp_slotted.{tree} has more than 4 entries")
+            if len(stars) > cp_rules["max_per_tree"]:
+                errors.append(f"cp_slotted.{tree} has more than {cp_rules['max_per_tree']} entries")
 
     return errors
 
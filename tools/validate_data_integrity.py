@@ -18,6 +18,31 @@ Data-wide integrity checks for the ESO Build Engine v1 Data Center.
     - Set.bonuses[*].effects[*] (strings) must exist in effects.id.
     - CP star.effects[*] (strings) must exist in effects.id.
 
+Incremental mode (the CLI default; --full disables it):
+
+  A full run spends most of its time parsing the data files. The
+  incremental run keeps, under .cache/data-integrity/:
+
+  - index.json: per file, its stamp (path, size, mtime), content hash and
+    last error report;
+  - <file>.records.json: per file, the hash of each record's raw JSON
+    text in file order, with that record's id and reference errors and,
+    per effect_id, the records that reference it (see record_texts and
+    the per-record cache notes below);
+  - effect-ids.json: the effect IDs of the last run, with the hash of the
+    effects.json they were read from;
+  - effect-index.json: reverse reference index, effect_id -> the files that
+    reference it.
+
+  A file whose content hash is unchanged is not parsed. In a changed file
+  only the records whose text hash is new are decoded and checked; the
+  rest reuse their cached results. When effect IDs are added or removed,
+  the reverse indexes select the records that reference them, and only
+  those are re-checked. Uniqueness and namespace checks are re-run over
+  the cached ids of a changed file. Files not in the json.dump(indent=N)
+  layout are checked whole. The report is the same as a full run's; a
+  change to this tool invalidates the cache.
+
 Output (to stdout):
 
 {
@@ -30,14 +55,21 @@ Output (to stdout):
 }
 """
 
+import argparse
+import hashlib
 import json
+import re
 import sys
 from pathlib import Path
-from typing import Any, Dict, List, Set
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
 
+from atomic_io import atomic_write
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
 DATA_DIR = REPO_ROOT / "data"
+CACHE_DIR = REPO_ROOT / ".cache" / "data-integrity"
+
+CACHE_SCHEMA_VERSION = 2
 
 
 def load_json(path: Path) -> Any:
@@ -69,26 +101,159 @@ def check_unique_ids(ids: List[str], field_prefix: str) -> List[Dict[str, Any]]:
     return errors
 
 
+def check_id_namespace(
+    _id: str,
+    allowed_prefixes: List[str],
+    field: str,
+) -> Optional[Dict[str, Any]]:
+    if any(_id.startswith(p) for p in allowed_prefixes):
+        return None
+    return {
+        "field": field,
+        "message": (
+            f"ID '{_id}' does not start with any allowed "
+            f"prefix {allowed_prefixes}"
+        ),
+    }
+
+
 def check_namespace_prefix(
     ids: List[str],
     allowed_prefixes: List[str],
     field_prefix: str,
 ) -> List[Dict[str, Any]]:
     errors: List[Dict[str, Any]] = []
+    prefixes = tuple(allowed_prefixes)
     for idx, _id in enumerate(ids):
-        if not any(_id.startswith(p) for p in allowed_prefixes):
+        # Build the field path only for the (rare) misses.
+        if not _id.startswith(prefixes):
+            errors.append(check_id_namespace(_id, allowed_prefixes, f"{field_prefix}[{idx}].id"))
+    return errors
+
+
+# ---------- Per-record reference checks ----------
+#
+# Each *_reference_slots function walks a single record at position `idx`
+# and yields its reference "slots" in report order: a (field, effect_id)
+# pair for each effect reference, or a ready error dict for a malformed
+# entry. render_slots() turns them into errors against a set of effect IDs.
+#
+# The check_*_references wrappers return the reference errors of one record;
+# the validate_* functions below run them over whole files,
+# tools/promote_preview.py runs them over just the records a promotion
+# changes, and the incremental run caches their errors per record.
+
+Slot = Union[Tuple[str, str], Dict[str, Any]]
+
+
+def render_slots(slots: Iterable[Slot], effect_ids: Set[str]) -> List[Dict[str, Any]]:
+    errors: List[Dict[str, Any]] = []
+    for slot in slots:
+        if isinstance(slot, dict):
+            errors.append(slot)
+            continue
+        field, effect_id = slot
+        if effect_id not in effect_ids:
             errors.append(
                 {
-                    "field": f"{field_prefix}[{idx}].id",
+                    "field": field,
                     "message": (
-                        f"ID '{_id}' does not start with any allowed "
-                        f"prefix {allowed_prefixes}"
+                        f"Unknown effect_id '{effect_id}' "
+                        "(not found in effects.json)"
                     ),
                 }
             )
     return errors
 
 
+def skill_reference_slots(skill: Any, s_idx: int) -> Iterator[Slot]:
+    if not isinstance(skill, dict):
+        return
+    effects = skill.get("effects", [])
+    if not isinstance(effects, list):
+        return
+    for e_idx, eff in enumerate(effects):
+        if not isinstance(eff, dict):
+            continue
+        effect_id = eff.get("effect_id")
+        if not effect_id:
+            # Missing effect_id is treated as a schema omission, not a reference error.
+            continue
+        yield (f"skills[{s_idx}].effects[{e_idx}].effect_id", effect_id)
+
+
+def set_reference_slots(set_rec: Any, s_idx: int) -> Iterator[Slot]:
+    if not isinstance(set_rec, dict):
+        return
+    for b_idx, bonus in enumerate(set_rec.get("bonuses", [])):
+        if not isinstance(bonus, dict):
+            continue
+        effects = bonus.get("effects", [])
+        if not isinstance(effects, list):
+            continue
+        for e_idx, eff in enumerate(effects):
+            field = f"sets[{s_idx}].bonuses[{b_idx}].effects[{e_idx}]"
+            # Canonical form: effects is a list of strings.
+            if not isinstance(eff, str):
+                yield {
+                    "field": field,
+                    "message": (
+                        "Set bonus effects must be string IDs matching "
+                        "effects.id; embedded objects are not allowed."
+                    ),
+                }
+                continue
+            yield (field, eff)
+
+
+def cpstar_reference_slots(star: Any, c_idx: int) -> Iterator[Slot]:
+    if not isinstance(star, dict):
+        # Non-object entries violate the Global Rules entity/ID representation.
+        return
+    effects = star.get("effects", [])
+    if not isinstance(effects, list):
+        return
+    for e_idx, eff in enumerate(effects):
+        field = f"cpstars[{c_idx}].effects[{e_idx}]"
+        if not isinstance(eff, str):
+            yield {
+                "field": field,
+                "message": (
+                    "CP star effects must be string IDs matching "
+                    "effects.id; embedded objects are not allowed."
+                ),
+            }
+            continue
+        yield (field, eff)
+
+
+def check_skill_references(
+    skill: Any,
+    s_idx: int,
+    effect_ids: Set[str],
+) -> List[Dict[str, Any]]:
+    return render_slots(skill_reference_slots(skill, s_idx), effect_ids)
+
+
+def check_set_references(
+    set_rec: Any,
+    s_idx: int,
+    effect_ids: Set[str],
+) -> List[Dict[str, Any]]:
+    return render_slots(set_reference_slots(set_rec, s_idx), effect_ids)
+
+
+def check_cpstar_references(
+    star: Any,
+    c_idx: int,
+    effect_ids: Set[str],
+) -> List[Dict[str, Any]]:
+    return render_slots(cpstar_reference_slots(star, c_idx), effect_ids)
+
+
+# ---------- File-level validators ----------
+
+
 def validate_skills(
     skills: List[Dict[str, Any]],
     effect_ids: Set[str],
@@ -106,28 +271,7 @@ def validate_skills(
     errors.extend(check_namespace_prefix(skill_ids, ["skill."], "skills"))
 
     for s_idx, skill in enumerate(skills):
-        if not isinstance(skill, dict):
-            continue
-        effects = skill.get("effects", [])
-        if not isinstance(effects, list):
-            continue
-        for e_idx, eff in enumerate(effects):
-            if not isinstance(eff, dict):
-                continue
-            effect_id = eff.get("effect_id")
-            if not effect_id:
-                # Missing effect_id is treated as a schema omission, not a reference error.
-                continue
-            if effect_id not in effect_ids:
-                errors.append(
-                    {
-                        "field": f"skills[{s_idx}].effects[{e_idx}].effect_id",
-                        "message": (
-                            f"Unknown effect_id '{effect_id}' "
-                            "(not found in effects.json)"
-                        ),
-                    }
-                )
+        errors.extend(check_skill_references(skill, s_idx, effect_ids))
 
     return errors
 
@@ -171,43 +315,7 @@ def validate_sets(
     errors.extend(check_namespace_prefix(set_ids, ["set."], "sets"))
 
     for s_idx, set_rec in enumerate(sets):
-        if not isinstance(set_rec, dict):
-            continue
-        for b_idx, bonus in enumerate(set_rec.get("bonuses", [])):
-            if not isinstance(bonus, dict):
-                continue
-            effects = bonus.get("effects", [])
-            if not isinstance(effects, list):
-                continue
-            for e_idx, eff in enumerate(effects):
-                # Canonical form: effects is a list of strings.
-                if not isinstance(eff, str):
-                    errors.append(
-                        {
-                            "field": (
-                                f"sets[{s_idx}].bonuses[{b_idx}].effects[{e_idx}]"
-                            ),
-                            "message": (
-                                "Set bonus effects must be string IDs matching "
-                                "effects.id; embedded objects are not allowed."
-                            ),
-                        }
-                    )
-                    continue
-
-                effect_id = eff
-                if effect_id not in effect_ids:
-                    errors.append(
-                        {
-                            "field": (
-                                f"sets[{s_idx}].bonuses[{b_idx}].effects[{e_idx}]"
-                            ),
-                            "message": (
-                                f"Unknown effect_id '{effect_id}' "
-                                "(not found in effects.json)"
-                            ),
-                        }
-                    )
+        errors.extend(check_set_references(set_rec, s_idx, effect_ids))
 
     return errors
 
@@ -229,45 +337,16 @@ def validate_cpstars(
     errors.extend(check_namespace_prefix(cp_ids, ["cp."], "cpstars"))
 
     for c_idx, star in enumerate(cpstars):
-        if not isinstance(star, dict):
-            # Non-object entries violate the Global Rules entity/ID representation.
-            continue
-        effects = star.get("effects", [])
-        if not isinstance(effects, list):
-            continue
-        for e_idx, eff in enumerate(effects):
-            if not isinstance(eff, str):
-                errors.append(
-                    {
-                        "field": f"cpstars[{c_idx}].effects[{e_idx}]",
-                        "message": (
-                            "CP star effects must be string IDs matching "
-                            "effects.id; embedded objects are not allowed."
-                        ),
-                    }
-                )
-                continue
-
-            effect_id = eff
-            if effect_id not in effect_ids:
-                errors.append(
-                    {
-                        "field": f"cpstars[{c_idx}].effects[{e_idx}]",
-                        "message": (
-                            f"Unknown effect_id '{effect_id}' "
-                            "(not found in effects.json)"
-                        ),
-                    }
-                )
+        errors.extend(check_cpstar_references(star, c_idx, effect_ids))
 
     return errors
 
 
-def validate_data_integrity() -> Dict[str, Any]:
-    skills_data = load_json(DATA_DIR / "skills.json")
-    effects_data = load_json(DATA_DIR / "effects.json")
-    sets_data = load_json(DATA_DIR / "sets.json")
-    cpstars_data = load_json(DATA_DIR / "cp-stars.json")
+def validate_data_integrity(data_dir: Path = DATA_DIR) -> Dict[str, Any]:
+    skills_data = load_json(data_dir / "skills.json")
+    effects_data = load_json(data_dir / "effects.json")
+    sets_data = load_json(data_dir / "sets.json")
+    cpstars_data = load_json(data_dir / "cp-stars.json")
 
     # Unwrap v1 containers.
     skills = (
@@ -309,12 +388,485 @@ def validate_data_integrity() -> Dict[str, Any]:
     }
 
 
-def main(argv: List[str]) -> int:
-    if len(argv) != 1:
-        print("Usage: python tools/validate_data_integrity.py", file=sys.stderr)
-        return 1
+# ---------- Incremental validation ----------
+
+
+EFFECT_PREFIXES = ["buff.", "debuff.", "shield.", "hot."]
+
+# Report name (also the error field prefix), file, container key, ID prefixes,
+# per-record reference slots (None for effects), in report order.
+DATA_FILES: List[Tuple[str, str, str, List[str], Any]] = [
+    ("skills", "skills.json", "skills", ["skill."], skill_reference_slots),
+    ("effects", "effects.json", "effects", EFFECT_PREFIXES, None),
+    ("sets", "sets.json", "sets", ["set."], set_reference_slots),
+    ("cpstars", "cp-stars.json", "cp_stars", ["cp."], cpstar_reference_slots),
+]
+
+_FIRST_RECORD = re.compile(rb"[ \t\r]*\n( *)\{")
+
+
+def _validator_fingerprint() -> str:
+    with open(__file__, "rb") as f:
+        return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
 
-    result = validate_data_integrity()
+def _file_stamp(path: Path) -> List[Any]:
+    stat = path.stat()
+    return [str(path.resolve()), stat.st_size, stat.st_mtime_ns]
+
+
+def _read_cache(path: Path) -> Any:
+    try:
+        return load_json(path)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def _write_cache(path: Path, payload: Any) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # json.dumps (C encoder) rather than json.dump, which encodes in Python.
+    text = json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
+    with atomic_write(path) as f:
+        f.write(text)
+
+
+def record_texts(raw: bytes, key: str) -> Optional[List[bytes]]:
+    """
+    The raw JSON text of each object in the top-level `key` array (or bare
+    array) of a data file, without separators, so records can be hashed
+    and decoded one at a time.
+
+    Relies on the json.dump(indent=N) layout every tool writes: records
+    start on their own line at the array's element indentation, and
+    deeper values are indented further. Returns None for any other layout
+    (or invalid JSON outside the array); callers then parse the whole file.
+    The texts themselves are not decoded here: a text that is not exactly
+    one JSON value (e.g. a non-object element glued to a record) fails to
+    decode later, which callers must also treat as "other layout".
+    """
+    stripped = raw.lstrip()
+    if stripped.startswith(b"["):
+        open_pos = len(raw) - len(stripped)
+        indent = b""
+    else:
+        match = re.search(rb"\n( *)" + re.escape(json.dumps(key).encode("utf-8")) + rb": \[", raw)
+        if match is None:
+            return None
+        open_pos = match.end() - 1
+        indent = match.group(1)
+    # The array normally closes the file (or its container), so look from
+    # the end first; the outer check below rejects a wrong guess.
+    close_marker = b"\n" + indent + b"]"
+    close_pos = raw.rfind(close_marker, open_pos)
+    outer = _outer_json(raw, key, open_pos, close_pos)
+    if outer is None:
+        close_pos = raw.find(close_marker, open_pos)
+        outer = _outer_json(raw, key, open_pos, close_pos)
+        if outer is None:
+            return None
+
+    first = _FIRST_RECORD.match(raw, open_pos + 1)
+    if first is None:
+        return [] if not raw[open_pos + 1 : close_pos].strip() else None
+    # Records are separated by "," and whitespace up to a newline at the
+    # element indentation; string values cannot hold a raw newline, so a
+    # match elsewhere leaves a text that fails to decode.
+    separator = re.compile(rb",[ \t\r\n]*\n" + first.group(1) + rb"\{")
+    parts = separator.split(raw[first.end() : close_pos])
+    parts[-1] = parts[-1].rstrip()
+    return [b"{" + part for part in parts]
+
+
+def _outer_json(raw: bytes, key: str, open_pos: int, close_pos: int) -> Optional[Any]:
+    # Everything outside the array must still be valid JSON, holding the
+    # array under `key` (a later duplicate key would win in json.loads).
+    if close_pos < 0:
+        return None
+    try:
+        outer = json.loads(raw[: open_pos + 1] + raw[close_pos:])
+    except ValueError:
+        return None
+    if outer != [] and not (isinstance(outer, dict) and outer.get(key) == []):
+        return None
+    return outer
+
+
+class IncrementalIntegrity:
+    """
+    One incremental run over data_dir; see the module docstring.
+
+        run = IncrementalIntegrity(DATA_DIR, CACHE_DIR)
+        result = run.validate()     # same dict as validate_data_integrity()
+        run.revalidated             # {"skills": "changed", "sets": "effects", ...}
+        run.rechecked               # {"skills": 1, "sets": 3, ...} records re-checked
+    """
+
+    def __init__(self, data_dir: Path = DATA_DIR, cache_dir: Path = CACHE_DIR) -> None:
+        self.data_dir = data_dir
+        self.cache_dir = cache_dir
+        # Report name -> why it was re-checked: "changed" (file content
+        # changed) or "effects" (effect IDs it references changed); absent =
+        # reused. rechecked counts the records whose checks actually ran.
+        self.revalidated: Dict[str, str] = {}
+        self.rechecked: Dict[str, int] = {}
+        self._fingerprint = _validator_fingerprint()
+        self._effect_ids: Optional[Set[str]] = None
+        self._reverse: Optional[Dict[str, List[str]]] = None
+
+    def _load_index(self) -> Dict[str, Any]:
+        index = _read_cache(self.cache_dir / "index.json")
+        if (
+            not isinstance(index, dict)
+            or index.get("schema_version") != CACHE_SCHEMA_VERSION
+            or index.get("validator") != self._fingerprint
+            # Without the reverse index, effect changes cannot be traced.
+            or not (self.cache_dir / "effect-index.json").exists()
+        ):
+            return {"schema_version": CACHE_SCHEMA_VERSION, "validator": self._fingerprint, "files": {}}
+        return index
+
+    def _changed_files(self, entries: Dict[str, Any]) -> Dict[str, bytes]:
+        """
+        Report name -> file content, for the files whose content hash
+        differs from the cached one. Refreshes the stamps of the rest.
+        """
+        changed: Dict[str, bytes] = {}
+        for name, file_name, _, _, _ in DATA_FILES:
+            path = self.data_dir / file_name
+            stamp = _file_stamp(path)
+            entry = entries.get(name)
+            if entry is not None and entry["stamp"] == stamp:
+                continue
+            raw = path.read_bytes()
+            digest = hashlib.blake2b(raw, digest_size=16).hexdigest()
+            if entry is not None and entry["hash"] == digest:
+                entry["stamp"] = stamp
+                continue
+            changed[name] = raw
+            entries[name] = {"stamp": stamp, "hash": digest, "errors": []}
+        return changed
+
+    def _items(self, raw: bytes, key: str) -> List[Any]:
+        data = json.loads(raw.decode("utf-8"))
+        return data.get(key, data) if isinstance(data, dict) else data
+
+    def _reverse_index(self) -> Dict[str, List[str]]:
+        if self._reverse is None:
+            reverse = _read_cache(self.cache_dir / "effect-index.json")
+            self._reverse = reverse if isinstance(reverse, dict) else {}
+        return self._reverse
+
+    def _cached_effect_ids(self, effects_hash: Optional[str]) -> Optional[Set[str]]:
+        """
+        The cached effect IDs, if they were read from effects.json content
+        with this hash.
+        """
+        cached = _read_cache(self.cache_dir / "effect-ids.json")
+        if not isinstance(cached, dict) or effects_hash is None or cached.get("hash") != effects_hash:
+            return None
+        return set(cached["ids"])
+
+    def _save_effect_ids(self, effects_hash: str) -> None:
+        assert self._effect_ids is not None
+        _write_cache(self.cache_dir / "effect-ids.json", {"hash": effects_hash, "ids": sorted(self._effect_ids)})
+
+    def _effect_id_set(self, entries: Dict[str, Any]) -> Set[str]:
+        if self._effect_ids is None:
+            effects_hash = entries["effects"]["hash"]
+            self._effect_ids = self._cached_effect_ids(effects_hash)
+            if self._effect_ids is None:
+                raw = (self.data_dir / "effects.json").read_bytes()
+                self._effect_ids = set(collect_ids(self._items(raw, "effects"), "id"))
+                self._save_effect_ids(effects_hash)
+        return self._effect_ids
+
+    # ----- per-record cache -----
+    #
+    # <name>.records.json holds, for one data file that record_texts() can
+    # split:
+    #
+    #   order:  the record hashes in file order;
+    #   ids:    hash -> id, for records that have one;
+    #   errors: hash -> reference errors, for records that have any, with
+    #           field paths relative to the record so a record that only
+    #           moved keeps its entry;
+    #   refs:   effect_id -> hashes of the records that reference it (may
+    #           list records that are gone; pruned when records are removed).
+    #
+    # Records are keyed by the blake2b hash of their raw JSON text, so only
+    # records whose text changed are decoded and checked. A record hit by an
+    # effect change is decoded again from the (unchanged) file: it sits at
+    # its hash's position in `order`.
+
+    def _load_records(self, name: str) -> Optional[Dict[str, Any]]:
+        cached = _read_cache(self.cache_dir / f"{name}.records.json")
+        if not isinstance(cached, dict) or not {"order", "ids", "errors", "refs"} <= cached.keys():
+            return None
+        return cached
+
+    def _check_record(
+        self,
+        name: str,
+        text: bytes,
+        slots_of: Any,
+        effect_ids: Set[str],
+    ) -> Tuple[Any, List[Dict[str, Any]], Set[Any]]:
+        """
+        Decode one record text: (record, errors with relative fields,
+        referenced effect IDs). Raises ValueError if the text does not decode.
+        """
+        item = json.loads(text.decode("utf-8"))
+        if slots_of is None:
+            return item, [], set()
+        prefix_len = len(f"{name}[0]")
+        slots: List[Any] = []
+        referenced: Set[Any] = set()
+        for slot in slots_of(item, 0):
+            if isinstance(slot, dict):
+                slots.append(dict(slot, field=slot["field"][prefix_len:]))
+            else:
+                slots.append((slot[0][prefix_len:], slot[1]))
+                referenced.add(slot[1])
+        return item, render_slots(slots, effect_ids), referenced
+
+    def _update_records(
+        self,
+        name: str,
+        texts: List[bytes],
+        slots_of: Any,
+        cache: Optional[Dict[str, Any]],
+        effect_ids: Set[str],
+    ) -> Optional[Dict[str, Any]]:
+        """
+        The record cache for the new texts of a file: unchanged records are
+        reused, new ones decoded and checked. None when a text does not
+        decode (the file does not have the layout record_texts() needs).
+        """
+        if cache is None:
+            cache = {"order": [], "ids": {}, "errors": {}, "refs": {}}
+        ids: Dict[str, Any] = cache["ids"]
+        errors: Dict[str, Any] = cache["errors"]
+        refs: Dict[str, List[str]] = cache["refs"]
+        known = set(cache["order"])
+
+        order = [hashlib.blake2b(text, digest_size=16).hexdigest() for text in texts]
+        current = set(order)
+        if not known <= current:
+            ids = {digest: _id for digest, _id in ids.items() if digest in current}
+            errors = {digest: errs for digest, errs in errors.items() if digest in current}
+            for effect_id in list(refs):
+                holders = [digest for digest in refs[effect_id] if digest in current]
+                if holders:
+                    refs[effect_id] = holders
+                else:
+                    del refs[effect_id]
+
+        added: Set[str] = set()
+        for idx in [idx for idx, digest in enumerate(order) if digest not in known]:
+            digest = order[idx]
+            if digest in added:
+                continue
+            try:
+                item, record_errors, referenced = self._check_record(name, texts[idx], slots_of, effect_ids)
+            except ValueError:
+                return None
+            added.add(digest)
+            if isinstance(item, dict) and "id" in item:
+                ids[digest] = item["id"]
+            if record_errors:
+                errors[digest] = record_errors
+            for effect_id in referenced:
+                refs.setdefault(effect_id, []).append(digest)
+
+        self.rechecked[name] = self.rechecked.get(name, 0) + len(added)
+        return {"order": order, "ids": ids, "errors": errors, "refs": refs}
+
+    def _recheck_references(
+        self,
+        name: str,
+        cache: Dict[str, Any],
+        texts: List[bytes],
+        slots_of: Any,
+        changed_effects: Set[str],
+        effect_ids: Set[str],
+    ) -> None:
+        """
+        Re-check the records that reference one of `changed_effects`;
+        `texts` are the file's record texts, in cache["order"].
+        """
+        stale = {h for effect_id in changed_effects for h in cache["refs"].get(effect_id, ())}
+        position: Dict[str, int] = {}
+        for idx, digest in enumerate(cache["order"]):
+            if digest in stale:
+                position.setdefault(digest, idx)
+        errors = cache["errors"]
+        for digest, idx in position.items():
+            _, record_errors, _ = self._check_record(name, texts[idx], slots_of, effect_ids)
+            if record_errors:
+                errors[digest] = record_errors
+            else:
+                errors.pop(digest, None)
+        self.rechecked[name] = self.rechecked.get(name, 0) + len(position)
+
+    def _report(self, name: str, prefixes: List[str], cache: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        The file's errors in full-run order, from its record cache.
+        """
+        order = cache["order"]
+        id_of = cache["ids"]
+        ids = [id_of[digest] for digest in order if digest in id_of]
+        errors = check_unique_ids(ids, name) + check_namespace_prefix(ids, prefixes, name)
+        record_errors = cache["errors"]
+        if record_errors:
+            for idx, digest in enumerate(order):
+                if digest in record_errors:
+                    prefix = f"{name}[{idx}]"
+                    errors.extend(dict(error, field=prefix + error["field"]) for error in record_errors[digest])
+        return errors
+
+    def _check_whole_file(
+        self,
+        name: str,
+        raw: bytes,
+        key: str,
+        prefixes: List[str],
+        slots_of: Any,
+        effect_ids: Set[str],
+    ) -> Tuple[List[Dict[str, Any]], List[Any], Set[str]]:
+        """
+        Full check of a file record_texts() cannot split: (errors, ids,
+        referenced effect IDs). The file gets no record cache.
+        """
+        items = self._items(raw, key)
+        ids = collect_ids(items, "id")
+        errors = check_unique_ids(ids, name) + check_namespace_prefix(ids, prefixes, name)
+        referenced: Set[str] = set()
+        if slots_of is not None:
+            for idx, item in enumerate(items):
+                slots = list(slots_of(item, idx))
+                referenced.update(slot[1] for slot in slots if not isinstance(slot, dict))
+                errors.extend(render_slots(slots, effect_ids))
+        self.rechecked[name] = self.rechecked.get(name, 0) + len(items)
+        (self.cache_dir / f"{name}.records.json").unlink(missing_ok=True)
+        return errors, ids, referenced
+
+    def validate(self) -> Dict[str, Any]:
+        index = self._load_index()
+        entries: Dict[str, Any] = index["files"]
+        old_effects_hash = entries.get("effects", {}).get("hash")
+        changed = self._changed_files(entries)
+        reverse_dirty = False
+
+        # Effects first: their IDs decide which records to revisit.
+        # None = the previous effect IDs are unknown, so every record is affected.
+        changed_effects: Optional[Set[str]] = set()
+        if "effects" in changed:
+            old_ids = self._cached_effect_ids(old_effects_hash)
+            texts = record_texts(changed["effects"], "effects")
+            cache = None
+            if texts is not None:
+                cache = self._update_records("effects", texts, None, self._load_records("effects"), set())
+            if cache is None:
+                entries["effects"]["errors"], ids, _ = self._check_whole_file(
+                    "effects", changed["effects"], "effects", EFFECT_PREFIXES, None, set()
+                )
+                self._effect_ids = set(ids)
+            else:
+                self._effect_ids = set(cache["ids"].values())
+                entries["effects"]["errors"] = self._report("effects", EFFECT_PREFIXES, cache)
+                _write_cache(self.cache_dir / "effects.records.json", cache)
+            changed_effects = None if old_ids is None else self._effect_ids ^ old_ids
+            self.revalidated["effects"] = "changed"
+            self._save_effect_ids(entries["effects"]["hash"])
+
+        for name, file_name, key, prefixes, slots_of in DATA_FILES:
+            if slots_of is None:
+                continue
+            affected = changed_effects is None or any(
+                name in self._reverse_index().get(effect_id, ()) for effect_id in changed_effects
+            )
+            if name not in changed and not affected:
+                continue
+
+            effect_ids = self._effect_id_set(entries)
+            # Cached results were rendered against unknown effect IDs.
+            cache = self._load_records(name) if changed_effects is not None else None
+            raw = changed.get(name)
+            if raw is None:
+                raw = (self.data_dir / file_name).read_bytes()
+            self.revalidated[name] = "changed" if name in changed else "effects"
+
+            texts = record_texts(raw, key)
+            reverse = self._reverse_index()
+            old_refs = set(cache["refs"]) if cache is not None else set(reverse)
+            if texts is not None and name not in changed and (cache is None or len(texts) != len(cache["order"])):
+                # Record cache lost (or out of step): check the file from scratch.
+                cache = None
+                changed[name] = raw
+            if texts is not None and name in changed:
+                cache = self._update_records(name, texts, slots_of, cache, effect_ids)
+            if texts is not None and cache is not None and changed_effects:
+                self._recheck_references(name, cache, texts, slots_of, changed_effects, effect_ids)
+
+            if texts is None or cache is None:
+                entries[name]["errors"], _, referenced = self._check_whole_file(
+                    name, raw, key, prefixes, slots_of, effect_ids
+                )
+                changed[name] = raw
+                dropped = set(reverse)
+            else:
+                entries[name]["errors"] = self._report(name, prefixes, cache)
+                _write_cache(self.cache_dir / f"{name}.records.json", cache)
+                referenced = set(cache["refs"])
+                dropped = old_refs - referenced
+
+            if name in changed:
+                for effect_id in dropped:
+                    files = reverse.get(effect_id)
+                    if files and name in files and effect_id not in referenced:
+                        files.remove(name)
+                        if not files:
+                            del reverse[effect_id]
+                        reverse_dirty = True
+                for effect_id in referenced:
+                    files = reverse.setdefault(effect_id, [])
+                    if name not in files:
+                        files.append(name)
+                        reverse_dirty = True
+
+        if reverse_dirty or not (self.cache_dir / "effect-index.json").exists():
+            _write_cache(self.cache_dir / "effect-index.json", self._reverse_index())
+        # Written last: until then the previous index marks everything
+        # above as changed, so an interrupted run is redone in full.
+        _write_cache(self.cache_dir / "index.json", index)
+
+        errors: List[Dict[str, Any]] = []
+        for name, _, _, _, _ in DATA_FILES:
+            errors.extend(entries[name]["errors"])
+        return {
+            "status": "OK" if not errors else "ERROR",
+            "error_count": len(errors),
+            "errors": errors,
+        }
+
+
+def validate_data_integrity_incremental(
+    data_dir: Path = DATA_DIR,
+    cache_dir: Path = CACHE_DIR,
+) -> Dict[str, Any]:
+    return IncrementalIntegrity(data_dir, cache_dir).validate()
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description="Validate data/*.json integrity.")
+    parser.add_argument("--full", action="store_true", help="Check everything; do not read or write the cache.")
+    parser.add_argument("--cache-dir", type=str, default=str(CACHE_DIR), help="Incremental cache directory.")
+    args = parser.parse_args(argv[1:])
+
+    if args.full:
+        result = validate_data_integrity()
+    else:
+        result = validate_data_integrity_incremental(DATA_DIR, Path(args.cache_dir))
     print(json.dumps(result, indent=2))
     return 0 if result["status"] == "OK" else 1
 
@@ -2,8 +2,11 @@
 """
 tools/validate_import_preview.py
 
-Lightweight validator for import preview files under raw-imports/,
-primarily for skills.import-preview.json in the current phase.
+Lightweight validator for the import preview files under raw-imports/:
+
+- skills.import-preview.json
+- sets.import-preview.json
+- cp-stars.import-preview.json
 
 Goals:
 - Ensure preview files follow the v1 Data Model shapes closely enough
@@ -11,22 +14,46 @@ Goals:
 - Catch obvious schema issues (bad prefixes, missing required fields,
   wrong types) early.
 
+Previews are validated as they are parsed (tools/import_stream.py), in one
+sequential read and without loading the whole file: each record is checked
+and dropped, and ID uniqueness is tracked as a set of 64-bit string hashes
+rather than the IDs themselves. (Two distinct IDs sharing a hash would be
+reported as a duplicate; at 64 bits that does not happen in practice.)
+
+Each file stops after --max-errors errors (0 = no limit), marked
+"truncated". Several files are validated in parallel worker processes
+(--jobs) once together they are at least PARALLEL_MIN_BYTES; smaller
+previews validate faster in-process than a worker pool starts.
+
+Output: for one preview, its status dict (the shape this tool has always
+printed); for several, {"status": <overall>, "results": [<status dict>, ...]}.
+
 This does NOT mutate any files; it only reads and reports.
+
+Usage:
+
+    python tools/validate_import_preview.py
+    python tools/validate_import_preview.py skills --max-errors 20
 """
 
+import argparse
 import json
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Callable, Dict, List, Optional, Set
 
+from import_stream import SnapshotError, iter_json_array
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
 RAW_IMPORTS_DIR = REPO_ROOT / "raw-imports"
 
+DEFAULT_MAX_ERRORS = 100
 
-def load_json(path: Path) -> Any:
-    with path.open("r", encoding="utf-8") as f:
-        return json.load(f)
+# Total preview size from which --jobs defaults to parallel workers: about
+# 0.3 s of validation, well above the cost of starting a process pool.
+PARALLEL_MIN_BYTES = 16 * 1024 * 1024
 
 
 def validate_skill_record(skill: Dict[str, Any]) -> List[str]:
@@ -122,105 +149,293 @@ def validate_skill_record(skill: Dict[str, Any]) -> List[str]:
     return errors
 
 
-def validate_skills_container(container: Dict[str, Any]) -> Tuple[List[str], List[str]]:
-    """
-    Validate the top-level skills import-preview container.
+def _validate_effects_list(effects: Any, label: str, rid: Any) -> List[str]:
+    if effects is None:
+        return [f"{label}.effects must be present (can be empty list) for id={rid!r}"]
+    if not isinstance(effects, list):
+        return [f"{label}.effects must be a list for id={rid!r}, got {type(effects)!r}"]
+    return []
+
 
-    Returns:
-      (errors, warnings)
+def validate_set_record(set_rec: Dict[str, Any]) -> List[str]:
+    """
+    Validate a single set record from a preview file against the v1 shape
+    we expect for data/sets.json.
     """
     errors: List[str] = []
-    warnings: List[str] = []
 
-    if not isinstance(container, dict):
-        return (["Top-level JSON must be an object."], warnings)
+    sid = set_rec.get("id")
+    if not isinstance(sid, str) or not sid.startswith("set."):
+        errors.append(f"set.id missing or not prefixed with 'set.': {sid!r}")
 
-    meta = container.get("meta", {})
-    if not isinstance(meta, dict):
-        errors.append("meta must be an object.")
-    else:
-        mode = meta.get("mode")
-        if mode != "preview":
-            warnings.append(f"meta.mode is {mode!r}, expected 'preview'.")
-
-    skills = container.get("skills")
-    if not isinstance(skills, list):
-        errors.append("skills must be a list at top level.")
-        return (errors, warnings)
-
-    # ID uniqueness and per-skill validation.
-    seen_ids: set[str] = set()
-    for idx, skill in enumerate(skills):
-        if not isinstance(skill, dict):
-            errors.append(f"skills[{idx}] is not an object.")
+    name = set_rec.get("name")
+    if not isinstance(name, str) or not name.strip():
+        errors.append(f"set.name missing or empty for id={sid!r}")
+
+    set_type = set_rec.get("type")
+    if set_type not in ("armor", "weapon", "jewelry", "unknown"):
+        errors.append(
+            f"set.type must be 'armor'|'weapon'|'jewelry'|'unknown' for id={sid!r}, got {set_type!r}"
+        )
+
+    source = set_rec.get("source")
+    if not isinstance(source, str):
+        errors.append(f"set.source must be a string for id={sid!r}, got {source!r}")
+
+    tags = set_rec.get("tags")
+    if not isinstance(tags, list) or not all(isinstance(tag, str) for tag in tags):
+        errors.append(f"set.tags must be a list of strings for id={sid!r}, got {tags!r}")
+
+    external_set_id = set_rec.get("set_id")
+    if external_set_id is not None and not isinstance(external_set_id, (int, float)):
+        errors.append(f"set.set_id must be number or null for id={sid!r}, got {external_set_id!r}")
+
+    bonuses = set_rec.get("bonuses")
+    if not isinstance(bonuses, list):
+        errors.append(f"set.bonuses must be a list for id={sid!r}, got {type(bonuses)!r}")
+        return errors
+
+    seen_pieces: Set[int] = set()
+    for b_idx, bonus in enumerate(bonuses):
+        if not isinstance(bonus, dict):
+            errors.append(f"set.bonuses[{b_idx}] is not an object for id={sid!r}")
             continue
+        pieces = bonus.get("pieces")
+        if not isinstance(pieces, int) or isinstance(pieces, bool) or pieces < 1:
+            errors.append(f"set.bonuses[{b_idx}].pieces must be a positive int for id={sid!r}, got {pieces!r}")
+        elif pieces in seen_pieces:
+            errors.append(f"set.bonuses[{b_idx}].pieces {pieces} repeated for id={sid!r}")
+        else:
+            seen_pieces.add(pieces)
+        tooltip = bonus.get("tooltip_raw")
+        if tooltip is not None and not isinstance(tooltip, str):
+            errors.append(f"set.bonuses[{b_idx}].tooltip_raw must be string or null for id={sid!r}")
+        errors.extend(_validate_effects_list(bonus.get("effects"), f"set.bonuses[{b_idx}]", sid))
 
-        sid = skill.get("id")
-        if isinstance(sid, str):
-            if sid in seen_ids:
-                errors.append(f"Duplicate skill.id found: {sid!r}")
-            else:
-                seen_ids.add(sid)
+    return errors
 
-        per_skill_errors = validate_skill_record(skill)
-        errors.extend(per_skill_errors)
 
-    return (errors, warnings)
+def validate_cp_star_record(star: Dict[str, Any]) -> List[str]:
+    """
+    Validate a single CP star record from a preview file against the v1
+    shape we expect for data/cp-stars.json.
+    """
+    errors: List[str] = []
 
+    cid = star.get("id")
+    if not isinstance(cid, str) or not cid.startswith("cp."):
+        errors.append(f"cp.id missing or not prefixed with 'cp.': {cid!r}")
 
-def validate_skills_preview(path: Path) -> Dict[str, Any]:
+    name = star.get("name")
+    if not isinstance(name, str) or not name.strip():
+        errors.append(f"cp.name missing or empty for id={cid!r}")
+
+    tree = star.get("tree")
+    if tree not in ("warfare", "fitness", "craft", "unknown"):
+        errors.append(
+            f"cp.tree must be 'warfare'|'fitness'|'craft'|'unknown' for id={cid!r}, got {tree!r}"
+        )
+
+    slot_type = star.get("slot_type")
+    if slot_type not in ("slottable", "passive", "unknown"):
+        errors.append(
+            f"cp.slot_type must be 'slottable'|'passive'|'unknown' for id={cid!r}, got {slot_type!r}"
+        )
+
+    tooltip = star.get("tooltip_raw")
+    if tooltip is not None and not isinstance(tooltip, str):
+        errors.append(f"cp.tooltip_raw must be string or null for id={cid!r}, got {tooltip!r}")
+
+    external_ids = star.get("external_ids")
+    if external_ids is not None and not isinstance(external_ids, dict):
+        errors.append(f"cp.external_ids must be object or null for id={cid!r}, got {external_ids!r}")
+
+    errors.extend(_validate_effects_list(star.get("effects"), "cp", cid))
+    return errors
+
+
+# Preview kind -> file, top-level array key, record label, record validator.
+PREVIEWS: Dict[str, Dict[str, Any]] = {
+    "skills": {
+        "file": "skills.import-preview.json",
+        "key": "skills",
+        "label": "skill",
+        "validate_record": validate_skill_record,
+    },
+    "sets": {
+        "file": "sets.import-preview.json",
+        "key": "sets",
+        "label": "set",
+        "validate_record": validate_set_record,
+    },
+    "cp-stars": {
+        "file": "cp-stars.import-preview.json",
+        "key": "cp_stars",
+        "label": "cp",
+        "validate_record": validate_cp_star_record,
+    },
+}
+
+
+class _ErrorBudget(Exception):
     """
-    Validate raw-imports/skills.import-preview.json and return a status dict.
+    Raised inside validate_preview() once max_errors errors are collected.
+    """
+
+
+def validate_preview(path: Path, kind: str, max_errors: int = 0) -> Dict[str, Any]:
     """
+    Stream-validate one preview file and return a status dict.
+    """
+    spec = PREVIEWS[kind]
+    key = spec["key"]
+    validate_record: Callable[[Dict[str, Any]], List[str]] = spec["validate_record"]
+
     status: Dict[str, Any] = {
+        "kind": kind,
         "file": str(path),
         "status": "OK",
+        "record_count": 0,
         "error_count": 0,
         "warning_count": 0,
+        "truncated": False,
         "errors": [],
         "warnings": [],
     }
+    errors: List[str] = status["errors"]
+    warnings: List[str] = status["warnings"]
 
-    if not path.exists():
-        status["status"] = "ERROR"
-        status["error_count"] = 1
-        status["errors"] = [f"File not found: {path}"]
-        return status
+    def add_errors(new_errors: List[str]) -> None:
+        errors.extend(new_errors)
+        if max_errors and len(errors) >= max_errors:
+            del errors[max_errors:]
+            raise _ErrorBudget()
 
-    try:
-        container = load_json(path)
-    except Exception as exc:  # noqa: BLE001
-        status["status"] = "ERROR"
-        status["error_count"] = 1
-        status["errors"] = [f"Failed to read JSON: {exc!r}"]
-        return status
-
-    errors, warnings = validate_skills_container(container)
+    if not path.exists():
+        errors.append(f"File not found: {path}")
+    else:
+        others: Dict[str, Any] = {}
+        seen_keys: List[str] = []
+        seen_hashes: Set[int] = set()
+        try:
+            with path.open("r", encoding="utf-8") as f:
+                for idx, record in enumerate(iter_json_array(f, key, others, seen_keys=seen_keys)):
+                    status["record_count"] += 1
+                    if not isinstance(record, dict):
+                        add_errors([f"{key}[{idx}] is not an object."])
+                        continue
+
+                    rid = record.get("id")
+                    if isinstance(rid, str):
+                        digest = hash(rid)
+                        if digest in seen_hashes:
+                            add_errors([f"Duplicate {spec['label']}.id found: {rid!r}"])
+                        else:
+                            seen_hashes.add(digest)
+
+                    add_errors(validate_record(record))
+
+            if key not in seen_keys:
+                add_errors([f"{key} must be a list at top level."])
+            meta = others.get("meta", {})
+            if not isinstance(meta, dict):
+                add_errors(["meta must be an object."])
+            elif meta.get("mode") != "preview":
+                warnings.append(f"meta.mode is {meta.get('mode')!r}, expected 'preview'.")
+        except _ErrorBudget:
+            status["truncated"] = True
+        except (OSError, UnicodeDecodeError, SnapshotError) as exc:
+            errors.append(f"Failed to read JSON: {exc}")
 
-    status["errors"] = errors
-    status["warnings"] = warnings
     status["error_count"] = len(errors)
     status["warning_count"] = len(warnings)
-
     if errors:
         status["status"] = "ERROR"
     elif warnings:
         status["status"] = "WARN"
-    else:
-        status["status"] = "OK"
-
     return status
 
 
-def main(argv: list[str]) -> int:
-    # For now, we only validate skills.import-preview.json; later we can
-    # extend this to sets/CP previews as needed.
-    preview_path = RAW_IMPORTS_DIR / "skills.import-preview.json"
-    result = validate_skills_preview(preview_path)
-    json.dump(result, sys.stdout, indent=2)
+def validate_skills_preview(path: Path) -> Dict[str, Any]:
+    """
+    Validate raw-imports/skills.import-preview.json and return a status dict.
+    """
+    return validate_preview(path, "skills")
+
+
+def _validate_kind(kind: str, max_errors: int) -> Dict[str, Any]:
+    return validate_preview(RAW_IMPORTS_DIR / PREVIEWS[kind]["file"], kind, max_errors)
+
+
+def default_jobs(kinds: List[str]) -> int:
+    """
+    Worker processes for `kinds` when --jobs is not given: 1 (in-process)
+    below PARALLEL_MIN_BYTES in total, else one per file up to the CPU count.
+    """
+    total = 0
+    for kind in kinds:
+        path = RAW_IMPORTS_DIR / PREVIEWS[kind]["file"]
+        if path.exists():
+            total += path.stat().st_size
+    if len(kinds) < 2 or total < PARALLEL_MIN_BYTES:
+        return 1
+    return min(len(kinds), os.cpu_count() or 1)
+
+
+def validate_previews(kinds: List[str], max_errors: int = 0, jobs: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Validate several previews, in parallel when jobs > 1 (default:
+    default_jobs(kinds)).
+    """
+    if jobs is None:
+        jobs = default_jobs(kinds)
+    if jobs > 1 and len(kinds) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(kinds))) as pool:
+            results = list(pool.map(_validate_kind, kinds, [max_errors] * len(kinds)))
+    else:
+        results = [_validate_kind(kind, max_errors) for kind in kinds]
+
+    statuses = {result["status"] for result in results}
+    overall = "ERROR" if "ERROR" in statuses else "WARN" if "WARN" in statuses else "OK"
+    return {"status": overall, "results": results}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Validate import preview files under raw-imports/.")
+    parser.add_argument(
+        "kinds",
+        nargs="*",
+        metavar="kind",
+        help=f"Previews to validate: {', '.join(PREVIEWS)} (default: all).",
+    )
+    parser.add_argument(
+        "--max-errors",
+        type=int,
+        default=DEFAULT_MAX_ERRORS,
+        help="Stop validating a file after this many errors (default: %(default)s; 0 = no limit).",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help=(
+            "Files to validate at once (default: 1 below "
+            f"{PARALLEL_MIN_BYTES // (1024 * 1024)} MiB of previews in total, else one per file up to the CPU count)."
+        ),
+    )
+    args = parser.parse_args(argv)
+
+    unknown = [kind for kind in args.kinds if kind not in PREVIEWS]
+    if unknown:
+        parser.error(f"unknown preview kind(s): {', '.join(unknown)}")
+
+    kinds = args.kinds or list(PREVIEWS)
+    result = validate_previews(kinds, args.max_errors, args.jobs)
+    # A single preview prints its own status dict, as before multi-file support.
+    json.dump(result["results"][0] if len(kinds) == 1 else result, sys.stdout, indent=2)
     print()
     return 0 if result["status"] == "OK" else 1
 
 
 if __name__ == "__main__":
-    raise SystemExit(main(sys.argv))
+    raise SystemExit(main())